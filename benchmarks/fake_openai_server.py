@@ -0,0 +1,199 @@
+"""
+A local stand-in for the OpenAI chat completions and embeddings APIs, used by the benchmarks.
+
+It answers summarization, classification (single and batched) and introduction
+prompts with deterministic text, embeds texts as hashed bags of words, after a configurable latency, and fails a
+configurable share of the requests with 429 or 500 errors.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+TOPICS_PATTERN = re.compile(r"into one of the topics: (.*?)\.\n")
+ARTICLE_PATTERN = re.compile(r"^Article (\d+)$", re.MULTILINE)
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering `POST /v1/chat/completions` and `POST /v1/embeddings`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, seed=0):
+        """
+        Args:
+            address (tuple): (host, port) to listen on; port 0 picks a free one.
+            latency (float): Mean response latency, in seconds.
+            jitter (float): Uniform jitter added to or removed from the latency, in seconds.
+            error_rate (float): Share of requests answered with a 500 error.
+            rate_limit_rate (float): Share of requests answered with a 429 error.
+            seed (int): Seed of the random generator deciding latencies and errors.
+        """
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """
+        Serve requests on a background thread.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def draw(self):
+        """
+        Decide the latency and the outcome of a request.
+
+        Returns:
+            tuple: (latency in seconds, HTTP status code).
+        """
+        with self.lock:
+            self.stats["requests"] += 1
+            latency = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return latency, 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return latency, 500
+            return latency, 200
+
+def _pick(options, key):
+    return options[int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16) % len(options)]
+
+def fake_answer(request):
+    """
+    Build a deterministic answer for a chat completion request.
+
+    Args:
+        request (dict): The decoded request body.
+
+    Returns:
+        str: The assistant message content.
+    """
+    prompt = request["messages"][-1]["content"]
+    topics_match = TOPICS_PATTERN.search(prompt)
+    topics = topics_match.group(1).split(", ") if topics_match else ["AI", "Technology", "Business"]
+
+    if (request.get("response_format") or {}).get("type") == "json_object":
+        count = len(ARTICLE_PATTERN.findall(prompt))
+        return json.dumps({
+            "classifications": [{"id": index, "topic": _pick(topics, f"{prompt}{index}")} for index in range(1, count + 1)]
+        })
+    if prompt.startswith("Classify"):
+        return _pick(topics, prompt)
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+    return f"A short synthetic summary of {len(prompt)} characters ({digest})."
+
+EMBEDDING_DIMENSIONS = 64
+
+def fake_embedding(text):
+    """
+    Embed a text as a hashed bag of words, so texts sharing words are close.
+    """
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for word in re.findall(r"\w+", text.lower()):
+        vector[int(hashlib.sha256(word.encode("utf-8")).hexdigest(), 16) % EMBEDDING_DIMENSIONS] += 1.0
+    return vector
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=()):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith(("/chat/completions", "/embeddings")):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+            return
+
+        latency, status = self.server.draw()
+        time.sleep(latency)
+        if status == 429:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}}, [("retry-after", "0.05")])
+            return
+        if status != 200:
+            self._send_json(status, {"error": {"message": "Internal server error", "type": "server_error"}})
+            return
+
+        if self.path.endswith("/embeddings"):
+            texts = request["input"] if isinstance(request["input"], list) else [request["input"]]
+            prompt_tokens = sum(len(text) for text in texts) // 4
+            self._send_json(200, {
+                "object": "list",
+                "model": request.get("model", "fake"),
+                "data": [{"object": "embedding", "index": index, "embedding": fake_embedding(text)} for index, text in enumerate(texts)],
+                "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+            })
+            return
+
+        content = fake_answer(request)
+        prompt_tokens = sum(len(message["content"]) for message in request["messages"]) // 4
+        self._send_json(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4,
+            },
+        })
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the OpenAI chat completions API.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765).")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean latency in seconds (default: 0.5).")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter in seconds (default: 0.2).")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Share of 500 responses (default: 0).")
+    parser.add_argument("--rate_limit_rate", type=float, default=0.0, help="Share of 429 responses (default: 0).")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(("127.0.0.1", args.port), args.latency, args.jitter, args.error_rate, args.rate_limit_rate)
+    print(f"Serving on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+End-to-end benchmark of generate_link_post.py against the local OpenAI stand-in.
+
+Generates a synthetic vault, runs the full pipeline in a subprocess pointed at
+the fake server and reports files/sec, wall time per stage and peak RSS.
+
+    python -m benchmarks.run_benchmark --files 1000 --latency 0.3 --rate_limit_rate 0.05 -- --concurrency 16
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.vault import generate_vault
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_benchmark(files, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, nested=False, pipeline_args=(), workdir=None):
+    """
+    Run the pipeline once over a fresh synthetic vault.
+
+    Args:
+        files (int): Number of notes in the vault.
+        latency (float): Mean latency of the fake API, in seconds.
+        jitter (float): Latency jitter of the fake API, in seconds.
+        error_rate (float): Share of 500 responses.
+        rate_limit_rate (float): Share of 429 responses.
+        nested (bool): Spread notes over nested folders (pass --recursive in `pipeline_args`).
+        pipeline_args (list): Extra arguments for generate_link_post.py.
+        workdir (str): Directory for the vault and outputs; a temporary one by default.
+
+    Returns:
+        dict: Benchmark results.
+    """
+    with tempfile.TemporaryDirectory() if workdir is None else contextlib.nullcontext(workdir) as workdir:
+        vault = os.path.join(workdir, "vault")
+        output_dir = os.path.join(workdir, "output")
+        report_path = os.path.join(workdir, "run_report.json")
+        generate_vault(vault, files, nested=nested)
+
+        server = FakeOpenAIServer(latency=latency, jitter=jitter, error_rate=error_rate, rate_limit_rate=rate_limit_rate).start()
+        env = dict(os.environ, OPENAI_API_KEY="benchmark", OPENAI_BASE_URL=server.base_url)
+        command = [
+            sys.executable,
+            os.path.join(REPO_ROOT, "generate_link_post.py"),
+            vault,
+            "--output_dir", output_dir,
+            "--cache_dir", os.path.join(workdir, "cache"),
+            "--report", report_path,
+            *pipeline_args,
+        ]
+        # The log goes to a file rather than a pipe, so the child can be reaped
+        # with wait4, which reports the resource usage of that child alone
+        with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as log:
+            start = time.perf_counter()
+            try:
+                process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+                _, status, usage = os.wait4(process.pid, 0)
+                process.returncode = os.waitstatus_to_exitcode(status)
+            finally:
+                server.stop()
+            wall_seconds = time.perf_counter() - start
+            if process.returncode != 0:
+                log.seek(0)
+                raise RuntimeError(f"Pipeline failed:\n{log.read()[-2000:]}")
+
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        outputs = sorted(os.listdir(output_dir)) if os.path.isdir(output_dir) else []
+        post = ""
+        if outputs:
+            with open(os.path.join(output_dir, outputs[0]), "r", encoding="utf-8") as f:
+                post = f.read()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+    return {
+        "files": files,
+        "wall_seconds": wall_seconds,
+        "files_per_second": files / wall_seconds if wall_seconds else None,
+        "stages": {stage: values["seconds"] for stage, values in report["stages"].items()},
+        "requests": {stage: values["count"] for stage, values in report["requests"].items()},
+        "server": server.stats,
+        "peak_rss_mb": peak_rss_mb,
+        "summary_errors": post.count("Error summarizing content"),
+        "post": post,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against a local OpenAI stand-in.")
+    parser.add_argument("--files", type=int, default=100, help="Number of notes in the vault (default: 100).")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean API latency in seconds (default: 0.2).")
+    parser.add_argument("--jitter", type=float, default=0.1, help="API latency jitter in seconds (default: 0.1).")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Share of 500 responses (default: 0).")
+    parser.add_argument("--rate_limit_rate", type=float, default=0.0, help="Share of 429 responses (default: 0).")
+    parser.add_argument("--nested", action="store_true", help="Spread notes over nested folders (adds --recursive).")
+    parser.add_argument("--output", type=str, help="Also write the results to this JSON file.")
+    parser.add_argument("pipeline_args", nargs=argparse.REMAINDER, help="Extra arguments for generate_link_post.py, after '--'.")
+    args = parser.parse_args()
+
+    pipeline_args = [arg for arg in args.pipeline_args if arg != "--"]
+    if args.nested:
+        pipeline_args.append("--recursive")
+    results = run_benchmark(
+        args.files, args.latency, args.jitter, args.error_rate, args.rate_limit_rate, args.nested, pipeline_args
+    )
+    results.pop("post")
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
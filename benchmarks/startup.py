@@ -0,0 +1,102 @@
+"""
+Startup benchmark of generate_link_post.py.
+
+Runs the CLI in fresh interpreters with `python -X importtime` and reports the
+wall time of each scenario and the modules that take the longest to import.
+
+    python -m benchmarks.startup --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_importtime(stderr, top_level_only=False):
+    """
+    Parse the output of `python -X importtime`.
+
+    Args:
+        stderr (str): Standard error of the interpreter.
+        top_level_only (bool): Skip modules imported by other modules, whose
+            time is already included in their parent's cumulative time.
+
+    Returns:
+        dict: Cumulative import time in microseconds by module name.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if top_level_only and module.startswith("  "):
+            continue
+        times[module.strip()] = int(cumulative)
+    return times
+
+def measure(arguments, repeat=5, env=None):
+    """
+    Run `generate_link_post.py` with `arguments` `repeat` times.
+
+    Returns:
+        dict: Median wall time, median cumulative import time of the top-level
+            modules and the slowest imports of the last run.
+    """
+    wall_times, import_times, imports = [], [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.join(REPO_ROOT, "generate_link_post.py"), *arguments],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall_times.append(time.perf_counter() - start)
+        imports = parse_importtime(completed.stderr)
+        import_times.append(sum(parse_importtime(completed.stderr, top_level_only=True).values()))
+    slowest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "wall_seconds": statistics.median(wall_times),
+        "import_seconds": statistics.median(import_times) / 1e6,
+        "heavy_sdks_imported": sorted(name for name in ("openai", "numpy", "yaml", "dotenv", "tiktoken") if name in imports),
+        "slowest_imports": {module: cumulative / 1e6 for module, cumulative in slowest},
+    }
+
+def run_startup_benchmark(repeat=5):
+    """
+    Measure `--help`, a dry run and a run that finds no files.
+
+    Returns:
+        dict: Results by scenario.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+        cache_dir = os.path.join(directory, "cache")
+        results = {
+            "help": measure(["--help"], repeat, env),
+            "dry_run": measure([directory, "--dry-run", "--cache_dir", cache_dir], repeat, env),
+        }
+        env["OPENAI_API_KEY"] = "startup-benchmark"
+        results["no_files"] = measure([directory, "--cache_dir", cache_dir, "--output_dir", directory], repeat, env)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of generate_link_post.py.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (default: 5).")
+    parser.add_argument("--output", type=str, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run_startup_benchmark(args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Generate synthetic Readwise-style vaults for the benchmarks.
+"""
+import argparse
+import os
+import random
+
+WORDS = (
+    "model data agent market product team language vision network growth pricing platform "
+    "inference training latency research strategy economics philosophy design system user "
+    "reading knowledge attention memory business software engineering marketplace housing"
+).split()
+
+def _sentence(rng, length):
+    words = [rng.choice(WORDS) for _ in range(length)]
+    return " ".join(words).capitalize() + "."
+
+def generate_note(rng, index, highlights):
+    """
+    Build the content of one synthetic note.
+
+    Args:
+        rng (random.Random): Random generator.
+        index (int): Number of the note, used in its title and URL.
+        highlights (int): Number of highlights in the note.
+
+    Returns:
+        str: The note content.
+    """
+    title = f"{_sentence(rng, 5)[:-1]} {index}"
+    lines = [
+        "---",
+        f'title: "{title}"',
+        f"tags: [{rng.choice(WORDS)}, {rng.choice(WORDS)}]",
+        "---",
+        f"# {title}",
+        "",
+        "## Metadata",
+        f"- Author: {rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()}",
+        f"- URL: https://example.com/articles/{index}?utm_source=reader",
+        "",
+        "## Highlights",
+    ]
+    for _ in range(highlights):
+        lines.append(f"- {_sentence(rng, rng.randint(12, 60))}")
+        if rng.random() < 0.2:
+            lines.append(f"    - Note: {_sentence(rng, rng.randint(5, 20))}")
+    return "\n".join(lines) + "\n"
+
+def generate_vault(directory, files, min_highlights=3, max_highlights=40, nested=False, seed=0):
+    """
+    Write `files` synthetic notes into `directory`.
+
+    About one note in a hundred is a large export with up to ten times
+    `max_highlights` highlights, like a whole book.
+
+    Args:
+        directory (str): Directory to create the notes in.
+        files (int): Number of notes.
+        min_highlights (int): Minimum number of highlights per note.
+        max_highlights (int): Maximum number of highlights per note.
+        nested (bool): Spread notes over nested folders.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        list: Paths of the generated notes.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for index in range(files):
+        folder = os.path.join(directory, f"folder{index % 10}") if nested else directory
+        os.makedirs(folder, exist_ok=True)
+        highlights = rng.randint(min_highlights, max_highlights)
+        if rng.random() < 0.01:
+            highlights *= 10
+        path = os.path.join(folder, f"note_{index:05d}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate_note(rng, index, highlights))
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Readwise-style vault.")
+    parser.add_argument("directory", type=str, help="Directory to create the notes in.")
+    parser.add_argument("--files", type=int, default=100, help="Number of notes (default: 100).")
+    parser.add_argument("--min_highlights", type=int, default=3, help="Minimum highlights per note (default: 3).")
+    parser.add_argument("--max_highlights", type=int, default=40, help="Maximum highlights per note (default: 40).")
+    parser.add_argument("--nested", action="store_true", help="Spread notes over nested folders.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+    args = parser.parse_args()
+    generate_vault(args.directory, args.files, args.min_highlights, args.max_highlights, args.nested, args.seed)
+
+if __name__ == "__main__":
+    main()
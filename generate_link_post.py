@@ -1,12 +1,22 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-from collections import defaultdict
 import os
 import argparse
-from link_blogger.file_parser import get_recent_files, parse_metadata
-from link_blogger.summarizer import summarize_with_chatgpt
-from link_blogger.classifier import classify_article_with_chatgpt, load_topics
-from link_blogger.markdown_writer import save_to_markdown, generate_introduction_with_chatgpt
+from link_blogger.cache import DEFAULT_CACHE_DIR, ResponseCache
+from link_blogger.file_parser import FileIndex, get_recent_files, read_metadata
+from link_blogger import instrumentation, llm, routing
+from link_blogger.instrumentation import timed
+from link_blogger.journal import Journal, journal_key
+from link_blogger.classifier import CLASSIFIER_ENGINES, LocalTopicClassifier
+from link_blogger.config import ConfigLoader, load_config
+from link_blogger.dedup import SIMHASH_BANDS, DedupIndex, deduplicate_files
+from link_blogger.pipeline import process_files
+from link_blogger.records import group_by_topic
+from link_blogger.summarizer import is_failed_summary
+from link_blogger.batch import BATCH_BACKENDS, create_batch_backend, process_files_in_batch
+from link_blogger.preprocess import fingerprints_from_records, preprocess_files
+from link_blogger.planner import BUDGET_POLICIES, apply_budget, log_plan, plan_run
+from link_blogger.markdown_writer import MarkdownStreamWriter, generate_introduction_with_chatgpt, post_date, save_to_markdown
+from link_blogger.feed_writer import OUTPUT_FORMATS, save_feeds
+from link_blogger.watch import DirectoryWatcher, DraftBuilder, watch
 import logging
 
 # Logging setup
@@ -24,8 +34,101 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def dedup_distance(value):
+    """
+    Parse --dedup_distance; SimHash bands only find near duplicates closer than their number.
+    """
+    distance = int(value)
+    if not 0 <= distance < SIMHASH_BANDS:
+        raise argparse.ArgumentTypeError(f"must be between 0 and {SIMHASH_BANDS - 1}")
+    return distance
+
+def build_parser():
+    """
+    Build the command-line argument parser.
+    """
+    parser = argparse.ArgumentParser(description="Review and summarize recent reading files.")
+    parser.add_argument("directory", type=str, help="Directory containing your reading files.")
+    parser.add_argument("--days", type=int, default=7, help="Number of days to review (default: 7).")
+    parser.add_argument("--output_dir", type=str, default=".", help="Directory to save the Markdown file.")
+    parser.add_argument("--exclude", nargs="*", help="Patterns of files to exclude.")
+    parser.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=["markdown"], help="Output formats (default: markdown).")
+    parser.add_argument("--recursive", action="store_true", help="Also scan nested folders of the directory.")
+    parser.add_argument("--changed_only", action="store_true", help="Only process files that are new or changed since the last run.")
+    parser.add_argument("--watch", action="store_true", help="Keep running, processing new and changed files into a rolling draft post.")
+    parser.add_argument("--poll_interval", type=float, default=30.0, help="Seconds between two scans of the directory in watch mode (default: 30).")
+    parser.add_argument("--batch", action="store_true", help="Send summaries and classifications through a batch API instead of real-time requests.")
+    parser.add_argument("--batch_backend", choices=BATCH_BACKENDS, default="openai", help="Batch backend (default: openai; local runs the batch in-process).")
+    parser.add_argument("--batch_poll_interval", type=float, default=60.0, help="Seconds between two batch status checks (default: 60).")
+    parser.add_argument("--no_dedup", action="store_true", help="Process every file, even copies of the same article.")
+    parser.add_argument("--dedup_distance", type=dedup_distance, default=3, help=f"Maximum SimHash distance between near-duplicate notes, below {SIMHASH_BANDS} (default: 3).")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to hash, parse and fingerprint files on large vaults (default: 1).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of files processed in parallel (default: 4).")
+    parser.add_argument("--max_input_tokens", type=int, default=12000, help="Token budget of a summarization request; longer files are summarized in chunks (default: 12000, 0 disables).")
+    parser.add_argument("--intro_max_tokens", type=int, default=8000, help="Token budget of the introduction prompt; larger weeks are condensed into per-topic digests first (default: 8000, 0 disables).")
+    parser.add_argument("--classify_batch_size", type=int, default=0, help="Classify this many articles per request (default: one request per article).")
+    parser.add_argument("--classifier", choices=CLASSIFIER_ENGINES, default="llm", help="Topic classifier engine (default: llm).")
+    parser.add_argument("--classifier_threshold", type=float, default=0.2, help="Minimum local score before the hybrid classifier falls back to the LLM (default: 0.2).")
+    parser.add_argument("--embeddings", action="store_true", help="Keep an embedding index of past articles for related readings and neighbor topics.")
+    parser.add_argument("--related_readings", type=int, default=3, help="Related past readings listed under each article with --embeddings (default: 3, 0 disables).")
+    parser.add_argument("--max_tokens", type=int, help="Token budget of the whole run, checked before any request (default: unlimited).")
+    parser.add_argument("--max_cost", type=float, help="Estimated cost budget of the whole run, in USD (default: unlimited).")
+    parser.add_argument("--budget_policy", choices=BUDGET_POLICIES, default="truncate", help="How to fit a run over budget: truncate or chunk the largest files, or skip them (default: truncate).")
+    parser.add_argument("--requests_per_minute", type=int, help="Maximum OpenAI requests per minute (default: unlimited).")
+    parser.add_argument("--tokens_per_minute", type=int, help="Maximum OpenAI tokens per minute (default: unlimited).")
+    parser.add_argument("--max_retries", type=int, default=5, help="Retries on rate limits, server and connection errors (default: 5).")
+    parser.add_argument("--cache_dir", type=str, default=DEFAULT_CACHE_DIR, help=f"Directory for cached responses (default: {DEFAULT_CACHE_DIR}).")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write cached responses.")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached responses and overwrite them with fresh ones.")
+    parser.add_argument("--resume", action="store_true", help="Resume an interrupted run, reusing the articles it already finished.")
+    parser.add_argument("--report", type=str, help="Path of the JSON run report (default: <cache_dir>/run_report.json).")
+    parser.add_argument("--profile", action="store_true", help="Also profile the run with cProfile, saved next to the report.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the files that would be processed, with their metadata; no API key needed.")
+    return parser
+
+def unsupported_batch_options(args):
+    """
+    Return the options set in `args` that batch mode does not honour.
+    """
+    unsupported = {
+        f"--classifier {args.classifier}": args.classifier != "llm",
+        "--classify_batch_size": args.classify_batch_size > 0,
+        "--embeddings": args.embeddings,
+        "--resume": args.resume,
+        "--watch": args.watch,
+    }
+    return [option for option, is_set in unsupported.items() if is_set]
+
+def unsupported_watch_options(args):
+    """
+    Return the options set in `args` that watch mode does not honour.
+    """
+    unsupported = {
+        "--classify_batch_size": args.classify_batch_size > 0,
+        f"--formats {' '.join(args.formats)}": args.formats != ["markdown"],
+        "--embeddings": args.embeddings,
+        "--max_tokens": args.max_tokens is not None,
+        "--max_cost": args.max_cost is not None,
+        "--changed_only": args.changed_only,
+        "--workers": args.workers > 1,
+        "--resume": args.resume,
+    }
+    return [option for option, is_set in unsupported.items() if is_set]
+
 def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.batch and unsupported_batch_options(args):
+        parser.error(f"--batch cannot be combined with {', '.join(unsupported_batch_options(args))}.")
+    if args.watch and unsupported_watch_options(args):
+        parser.error(f"--watch cannot be combined with {', '.join(unsupported_watch_options(args))}.")
+    if args.dry_run:
+        dry_run(args)
+        return
+
     # Load environment variables
+    from dotenv import load_dotenv
+
     load_dotenv(dotenv_path=".conf/openai.conf")
 
     # Set OpenAI API key
@@ -34,64 +137,409 @@ def main():
         logger.error("OpenAI API key is not set. Please define it in the .conf/openai.conf file.")
         raise ValueError("OpenAI API key is not set.")
 
-    # Initialize OpenAI client
-    openai_client = OpenAI(api_key=api_key)
+    # The OpenAI client shared by every request, created on the first one
+    openai_client = llm.LazyOpenAIClient(api_key)
 
-    parser = argparse.ArgumentParser(description="Review and summarize recent reading files.")
-    parser.add_argument("directory", type=str, help="Directory containing your reading files.")
-    parser.add_argument("--days", type=int, default=7, help="Number of days to review (default: 7).")
-    parser.add_argument("--output_dir", type=str, default=".", help="Directory to save the Markdown file.")
-    parser.add_argument("--exclude", nargs="*", help="Patterns of files to exclude.")
-    args = parser.parse_args()
+    report = instrumentation.start_run()
+    report_path = args.report or os.path.join(args.cache_dir, "run_report.json")
+    profile_path = os.path.splitext(report_path)[0] + ".prof"
+    try:
+        if args.profile:
+            instrumentation.run_profiled(profile_path, run, args, openai_client)
+        else:
+            run(args, openai_client)
+    finally:
+        report.write(report_path)
+        logger.info(f"Run report saved to {report_path}.")
+        if args.profile:
+            logger.info(f"Profile saved to {profile_path}, inspect it with 'python -m pstats {profile_path}'.")
+
+def dry_run(args):
+    """
+    List the files a run would process, with their title and URL, without any request.
+    """
+    exclude_patterns = args.exclude or ["^000", r"\.pdf$"]
+    recent_files = get_recent_files(args.directory, args.days, exclude_patterns, recursive=args.recursive)
+    # Only stat the files against the index: nothing is hashed and the index is not saved
+    stale_files = FileIndex(os.path.join(args.cache_dir, "file_index.json")).stale(recent_files)
+    if args.changed_only:
+        stale = set(stale_files)
+        recent_files = [file for file in recent_files if file in stale]
+    logger.info(f"Dry run: {len(recent_files)} file(s) modified in the last {args.days} days, {len(stale_files)} new or modified since the last run.")
+    for file in recent_files:
+        metadata = read_metadata(file)
+        print(f"{file}\t{metadata['title']}\t{metadata['url']}")
+    # Estimating reads and tokenizes every file, so only do it for a budget
+    if recent_files and (args.max_tokens or args.max_cost):
+        config = load_config()
+        routing.configure(config.routes)
+        plan = plan_run(
+            recent_files,
+            config,
+            max_input_tokens=args.max_input_tokens or None,
+            intro_max_tokens=args.intro_max_tokens or None,
+            classifier=args.classifier,
+            workers=args.workers,
+        )
+        apply_budget(plan, args.max_tokens, args.max_cost, args.budget_policy)
+        log_plan(plan)
 
+def run(args, openai_client):
+    """
+    Generate the post for the parsed command-line arguments.
+    """
     directory = args.directory
     days = args.days
     output_dir = args.output_dir
     exclude_patterns = args.exclude or ["^000", r"\.pdf$"]
+    concurrency = max(1, args.concurrency)
+    llm.configure(
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        max_retries=args.max_retries,
+    )
 
-    # Load topics
-    try:
-        topics = load_topics()
+    if args.watch:
+        run_watch(args, openai_client, exclude_patterns, concurrency)
+        return
+
+    # Load prompts and topics once for the whole run
+    config = load_config()
+    routing.configure(config.routes)
+    topics = config.topics
+    if topics:
         logger.info("Topics loaded successfully.")
-    except FileNotFoundError:
+    else:
         logger.warning("No topics file found. Allowing GPT to classify freely.")
-        topics = None
+
+    embedder = embedding_index = None
+    if args.embeddings:
+        from link_blogger.embeddings import EmbeddingIndex, Embedder
+
+        embedder = Embedder(openai_client)
+        embedding_index = EmbeddingIndex(os.path.join(args.cache_dir, "embeddings"))
+        logger.info(f"Embedding index holds {len(embedding_index)} past article(s).")
+
+    classifier, local_classifier = create_local_classifier(args.classifier, topics, output_dir, embedding_index, embedder)
 
     # Fetch recent files
     logger.info(f"Searching for files in '{directory}' modified in the last {days} days...")
-    recent_files = get_recent_files(directory, days, exclude_patterns)
+    with timed("scan"):
+        recent_files = get_recent_files(directory, days, exclude_patterns, recursive=args.recursive)
+
+    # Hash, parse and fingerprint the new and changed files on several processes
+    file_index = FileIndex(os.path.join(args.cache_dir, "file_index.json"))
+    records = []
+    if args.workers > 1:
+        with timed("preprocess"):
+            records = preprocess_files(file_index.stale(recent_files), workers=args.workers, model=config.summarization.model)
+    file_records = {record.path: record for record in records}
+    with timed("scan"):
+        new_files, changed_files, _ = file_index.update(recent_files, hashes={path: record.hash for path, record in file_records.items()})
+    logger.info(f"{len(new_files)} new and {len(changed_files)} changed file(s) since the last run.")
+    if args.changed_only:
+        updated = set(new_files) | set(changed_files)
+        recent_files = [file for file in recent_files if file in updated]
 
     if not recent_files:
         logger.warning("No files found.")
         return
 
+    # Only summarize one copy of each article
+    duplicate_files = []
+    if not args.no_dedup:
+        with timed("dedup"):
+            dedup_index = DedupIndex(os.path.join(args.cache_dir, "dedup_index.json"))
+            content_hashes = {file: file_index.content_hash(file) for file in recent_files}
+            for file, (url, fingerprint) in fingerprints_from_records(records).items():
+                # Records cover every scanned file, --changed_only may have left some out
+                if file in content_hashes:
+                    dedup_index.record(file, content_hashes[file], url, fingerprint)
+            recent_files, duplicates = deduplicate_files(recent_files, dedup_index, content_hashes, args.dedup_distance)
+            dedup_index.save()
+        duplicate_files = [copy for copies in duplicates.values() for copy in copies]
+        skipped = len(duplicate_files)
+        instrumentation.increment("duplicates", skipped)
+        logger.info(f"Skipped {skipped} duplicate file(s).")
+
+    # Estimate the run locally and fit it into the budget before any request
+    content_limits = {}
+    if args.max_tokens or args.max_cost:
+        with timed("plan"):
+            plan = plan_run(
+                recent_files,
+                config,
+                max_input_tokens=args.max_input_tokens or None,
+                intro_max_tokens=args.intro_max_tokens or None,
+                classifier=classifier,
+                workers=args.workers,
+                file_records=file_records,
+            )
+            apply_budget(plan, args.max_tokens, args.max_cost, args.budget_policy)
+        log_plan(plan)
+        skipped = set(plan.skipped())
+        recent_files = [file for file in recent_files if file not in skipped]
+        content_limits = plan.content_limits()
+        instrumentation.increment("budget_skipped", len(skipped))
+        instrumentation.increment("budget_limited", len(content_limits))
+        if not recent_files:
+            logger.warning("No file fits the budget.")
+            return
+
+    instrumentation.increment("files", len(recent_files))
     logger.info(f"Found {len(recent_files)} file(s):")
     for file in recent_files:
         logger.info(f" - {file}")
 
+    if args.batch:
+        run_batch_mode(args, openai_client, recent_files, config, file_index, content_limits, duplicate_files)
+        return
+
+    # Replay the articles an interrupted run already finished
+    journal = Journal(os.path.join(args.cache_dir, "journal.jsonl"))
+    completed = journal.load() if args.resume else {}
+    keys = {file: journal_key(file, file_index.content_hash(file)) for file in recent_files}
+    pending_files = [file for file in recent_files if keys[file] not in completed]
+    if args.resume:
+        logger.info(f"Resuming: {len(recent_files) - len(pending_files)} article(s) replayed from the journal.")
+
+    # Sections are streamed to disk as articles finish, in input order; with related
+    # readings, articles are written once they are all embedded together
+    positions = {file: index for index, file in enumerate(recent_files)}
+    writer = MarkdownStreamWriter(output_dir) if "markdown" in args.formats else None
+    related_readings = embedding_index is not None and args.related_readings > 0
+    streaming = writer is not None and not related_readings
+
+    def on_complete(file, article):
+        article.content_hash = file_index.content_hash(file)
+        # Failed summaries are not journaled, so --resume retries them
+        if not is_failed_summary(article.summary):
+            journal.append(keys[file], article)
+        if streaming:
+            writer.add(positions[file], article)
+
+    if streaming:
+        for file in recent_files:
+            if keys[file] in completed:
+                writer.add(positions[file], completed[keys[file]])
+
     # Process files: summarize and classify
-    logger.info("Generating summaries and classifications...")
-    grouped_summaries = defaultdict(list)
-    article_details = []
-    for file in recent_files:
-        with open(file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            metadata = parse_metadata(content)
-            title = metadata["title"]
-            url = metadata["url"]
-            summary = summarize_with_chatgpt(content, openai_client)
-            topic = classify_article_with_chatgpt(title, summary, topics, openai_client)
-            grouped_summaries[topic].append(f"- [{title}]({url}): {summary}")
-            article_details.append({"title": title, "url": url, "summary": summary, "topic": topic})
+    logger.info(f"Generating summaries and classifications (concurrency: {concurrency})...")
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(os.path.join(args.cache_dir, "responses.sqlite3"), refresh=args.refresh)
+    journal.open(resume=args.resume)
+    try:
+        with timed("process"):
+            processed = process_files(
+                pending_files,
+                topics,
+                openai_client,
+                concurrency=concurrency,
+                cache=cache,
+                classify_batch_size=args.classify_batch_size,
+                classifier=classifier,
+                local_classifier=local_classifier,
+                classifier_threshold=args.classifier_threshold,
+                max_input_tokens=args.max_input_tokens or None,
+                summarization_config=config.summarization,
+                on_complete=on_complete,
+                content_limits=content_limits,
+                file_records=file_records,
+            )
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        raise
+    finally:
+        journal.close()
+        if cache is not None:
+            logger.info(f"Cache: {cache.hits} hit(s), {cache.misses} miss(es).")
+            instrumentation.record_cache(cache.hits, cache.misses)
+            cache.close()
+    processed = iter(processed)
+    article_details = [completed[keys[file]] if keys[file] in completed else next(processed) for file in recent_files]
+    if related_readings:
+        add_related_readings(embedding_index, embedder, article_details, args.related_readings)
+        if writer is not None:
+            for position, article in enumerate(article_details):
+                writer.add(position, article)
 
     # Generate introduction
     logger.info("Generating introduction...")
-    introduction = generate_introduction_with_chatgpt(article_details, openai_client)
+    with timed("intro"):
+        introduction = generate_introduction_with_chatgpt(
+            article_details,
+            openai_client,
+            config=config.introduction,
+            max_prompt_tokens=args.intro_max_tokens or None,
+            concurrency=concurrency,
+        )
+
+    # Save the post in every requested format
+    logger.info(f"Saving the post ({', '.join(args.formats)})...")
+    with timed("write"):
+        if writer is not None:
+            writer.finalize(introduction)
+        save_feeds(article_details, introduction, output_dir, args.formats)
+    logger.info("Post saved successfully.")
+
+    # Only remember the files once the post has been written, leaving out the
+    # ones skipped by the budget or whose summary failed
+    file_index.save(summarized_files(article_details) + duplicate_files)
+    journal.discard()
+    if embedding_index is not None:
+        index_articles(embedding_index, embedder, article_details)
+
+def summarized_files(article_details):
+    """
+    List the paths of the articles whose summary succeeded.
+    """
+    return [article.path for article in article_details if not is_failed_summary(article.summary)]
+
+def create_local_classifier(classifier, topics, output_dir, embedding_index=None, embedder=None):
+    """
+    Build the local classifier of the "local" and "hybrid" engines.
+
+    Returns:
+        tuple: (engine, local classifier); the engine falls back to "llm" without a topics file.
+    """
+    if classifier == "llm":
+        return classifier, None
+    if not topics:
+        logger.warning("The local classifier needs a topics file. Falling back to the LLM classifier.")
+        return "llm", None
+    # Trained on previous posts; also the fallback of the neighbor classifier
+    local_classifier = LocalTopicClassifier.from_posts(output_dir, topics)
+    if embedding_index is not None:
+        from link_blogger.embeddings import NeighborTopicClassifier
+
+        neighbor_classifier = NeighborTopicClassifier(embedding_index, embedder, topics, fallback=local_classifier)
+        if neighbor_classifier.example_count:
+            logger.info(f"Local classifier using the {neighbor_classifier.example_count} labeled article(s) of the embedding index.")
+            return classifier, neighbor_classifier
+    logger.info(f"Local classifier trained on {local_classifier.example_count} article(s) from previous posts.")
+    return classifier, local_classifier
+
+def add_related_readings(embedding_index, embedder, article_details, k):
+    """
+    List the related past readings of each article, embedding the articles together.
+    """
+    from link_blogger.embeddings import article_id, article_text, find_related
+
+    try:
+        with timed("embed"):
+            vectors = embedder.embed([article_text(article.title, article.summary) for article in article_details])
+            related = find_related(embedding_index, vectors, k, exclude_ids={article_id(article) for article in article_details})
+    except Exception as e:
+        logger.warning(f"Could not find related readings: {e}")
+        return
+    for article, items in zip(article_details, related):
+        article.related = tuple((item["title"], item["url"]) for item in items)
+
+def index_articles(embedding_index, embedder, article_details):
+    """
+    Append the articles of the post to the embedding index.
+    """
+    from link_blogger.embeddings import article_id, article_text
+
+    article_details = [article for article in article_details if not is_failed_summary(article.summary)]
+    try:
+        with timed("embed"):
+            vectors = embedder.embed([article_text(article.title, article.summary) for article in article_details])
+            today = post_date()
+            records = [
+                {"id": article_id(article), "title": article.title, "url": article.url, "topic": article.topic, "date": today}
+                for article in article_details
+            ]
+            added = embedding_index.add(records, vectors)
+        logger.info(f"Indexed {added} new article(s), {len(embedding_index)} in total.")
+    except Exception as e:
+        logger.warning(f"Could not update the embedding index: {e}")
+
+def run_batch_mode(args, openai_client, recent_files, config, file_index, content_limits=None, duplicate_files=()):
+    """
+    Generate the post with summaries and classifications sent as batches.
+    """
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(os.path.join(args.cache_dir, "responses.sqlite3"), refresh=args.refresh)
+    backend = create_batch_backend(args.batch_backend, openai_client)
+    logger.info(f"Generating summaries and classifications in batch mode ({args.batch_backend})...")
+    try:
+        with timed("process"):
+            article_details = process_files_in_batch(
+                recent_files,
+                config.topics,
+                backend,
+                args.cache_dir,
+                cache=cache,
+                max_input_tokens=args.max_input_tokens or None,
+                summarization_config=config.summarization,
+                poll_interval=args.batch_poll_interval,
+                content_limits=content_limits,
+            )
+    finally:
+        if cache is not None:
+            instrumentation.record_cache(cache.hits, cache.misses)
+            cache.close()
+    for article in article_details:
+        article.content_hash = file_index.content_hash(article.path)
+
+    logger.info("Generating introduction...")
+    with timed("intro"):
+        introduction = generate_introduction_with_chatgpt(
+            article_details,
+            openai_client,
+            config=config.introduction,
+            max_prompt_tokens=args.intro_max_tokens or None,
+            concurrency=max(1, args.concurrency),
+        )
 
-    # Save to Markdown
-    logger.info("Saving to Markdown file...")
-    save_to_markdown(grouped_summaries, introduction, output_dir)
-    logger.info("Markdown file saved successfully.")
+    with timed("write"):
+        if "markdown" in args.formats:
+            save_to_markdown(group_by_topic(article_details), introduction, args.output_dir)
+        save_feeds(article_details, introduction, args.output_dir, args.formats)
+    logger.info("Post saved successfully.")
+    file_index.save(summarized_files(article_details) + list(duplicate_files))
+
+def run_watch(args, openai_client, exclude_patterns, concurrency):
+    """
+    Watch the directory and keep a draft post up to date until interrupted.
+
+    Responses are cached, so generating the post afterwards only sends the introduction request.
+    """
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(os.path.join(args.cache_dir, "responses.sqlite3"), refresh=args.refresh)
+    dedup_index = None
+    if not args.no_dedup:
+        dedup_index = DedupIndex(os.path.join(args.cache_dir, "dedup_index.json"))
+    config_loader = ConfigLoader()
+    classifier, local_classifier = create_local_classifier(args.classifier, config_loader.get().topics, args.output_dir)
+    watcher = DirectoryWatcher(args.directory, args.days, exclude_patterns, recursive=args.recursive)
+    builder = DraftBuilder(
+        openai_client,
+        args.output_dir,
+        config_loader,
+        cache=cache,
+        workers=concurrency,
+        max_input_tokens=args.max_input_tokens or None,
+        classifier=classifier,
+        local_classifier=local_classifier,
+        classifier_threshold=args.classifier_threshold,
+        dedup_index=dedup_index,
+        dedup_distance=args.dedup_distance,
+    )
+    logger.info(f"Watching '{args.directory}' every {args.poll_interval:g}s, press Ctrl+C to stop.")
+    try:
+        watch(watcher, builder, poll_interval=args.poll_interval)
+    finally:
+        if dedup_index is not None:
+            dedup_index.save()
+        if cache is not None:
+            instrumentation.record_cache(cache.hits, cache.misses)
+            cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
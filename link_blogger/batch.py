@@ -0,0 +1,348 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from link_blogger import instrumentation
+from link_blogger.classifier import (
+    CLASSIFIER_MODEL,
+    CLASSIFIER_SYSTEM_MESSAGE,
+    _classification_cache_key,
+    _validate_label,
+    build_classification_prompt,
+)
+from link_blogger.config import DEFAULT_SUMMARIZATION_PROMPT, SUMMARIZATION_FIELDS, PromptConfig
+from link_blogger.file_parser import read_metadata
+from link_blogger.llm import chat_completion
+from link_blogger.planner import fit_content
+from link_blogger.records import ArticleRecord
+from link_blogger.routing import route_for
+from link_blogger.summarizer import SUMMARY_ERROR_PREFIX, _summary_cache_key, is_failed_summary
+from link_blogger.tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+BATCH_BACKENDS = ("openai", "local")
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+class OpenAIBatchBackend:
+    """
+    Submits request files to the OpenAI Batch API, at half the real-time price.
+    """
+
+    def __init__(self, openai_client, completion_window="24h"):
+        """
+        Args:
+            openai_client: OpenAI client for making API calls.
+            completion_window (str): Time the provider has to complete the batch.
+        """
+        self.openai_client = openai_client
+        self.completion_window = completion_window
+
+    def submit(self, requests_path):
+        """
+        Upload a JSONL request file and start a batch.
+
+        Returns:
+            str: The batch id.
+        """
+        with open(requests_path, "rb") as f:
+            input_file = self.openai_client.files.create(file=f, purpose="batch")
+        batch = self.openai_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        """
+        Return the status of a batch, e.g. "in_progress" or "completed".
+        """
+        return self.openai_client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id):
+        """
+        Return the output lines of a completed batch.
+        """
+        batch = self.openai_client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(self.openai_client.files.content(file_id).text.splitlines())
+        return lines
+
+class LocalBatchBackend:
+    """
+    Stand-in for a batch API: runs the requests of a file through `chat_completion`
+    when it is submitted and keeps the output in the same format.
+
+    Useful to test batch mode offline, e.g. against the benchmark's fake server.
+    """
+
+    def __init__(self, openai_client):
+        """
+        Args:
+            openai_client: OpenAI client the requests are sent with.
+        """
+        self.openai_client = openai_client
+        self._outputs = {}
+
+    def submit(self, requests_path):
+        batch_id = f"local_batch_{len(self._outputs) + 1}"
+        lines = []
+        with open(requests_path, "r", encoding="utf-8") as f:
+            for line in f:
+                request = json.loads(line)
+                body = dict(request["body"])
+                try:
+                    completion = chat_completion(self.openai_client, body.pop("model"), body.pop("messages"), stage="batch", **body)
+                    usage = getattr(completion, "usage", None)
+                    response = {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"message": {"role": "assistant", "content": completion.choices[0].message.content}}],
+                            "usage": {
+                                "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+                                "completion_tokens": getattr(usage, "completion_tokens", 0),
+                            },
+                        },
+                    }
+                    error = None
+                except Exception as e:
+                    response, error = None, {"message": str(e)}
+                lines.append(json.dumps({"custom_id": request["custom_id"], "response": response, "error": error}))
+        self._outputs[batch_id] = lines
+        return batch_id
+
+    def status(self, batch_id):
+        # Batches of an earlier process are gone
+        return "completed" if batch_id in self._outputs else "expired"
+
+    def results(self, batch_id):
+        return self._outputs[batch_id]
+
+def create_batch_backend(name, openai_client):
+    """
+    Create the batch backend called `name` (see `BATCH_BACKENDS`).
+    """
+    if name == "openai":
+        return OpenAIBatchBackend(openai_client)
+    if name == "local":
+        return LocalBatchBackend(openai_client)
+    raise ValueError(f"Unknown batch backend '{name}'.")
+
+def _int_or_zero(value):
+    return value if isinstance(value, int) else 0
+
+def parse_batch_output(lines):
+    """
+    Parse the output lines of a batch.
+
+    Returns:
+        dict: (answer text or None, usage dict) by custom id.
+    """
+    answers = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        body = response.get("body") or {}
+        if response.get("status_code") != 200 or not body.get("choices"):
+            logger.warning(f"Batch request {entry.get('custom_id')} failed: {entry.get('error') or body.get('error')}")
+            answers[entry.get("custom_id")] = (None, {"requests": 1, "prompt_tokens": 0, "completion_tokens": 0})
+            continue
+        usage = body.get("usage") or {}
+        answers[entry["custom_id"]] = (
+            (body["choices"][0]["message"].get("content") or "").strip(),
+            {
+                "requests": 1,
+                "prompt_tokens": _int_or_zero(usage.get("prompt_tokens")),
+                "completion_tokens": _int_or_zero(usage.get("completion_tokens")),
+            },
+        )
+    return answers
+
+def _state_path(path):
+    return os.path.splitext(path)[0] + ".batch.json"
+
+def _load_batch_id(state_path, digest):
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state.get("batch_id") if state.get("digest") == digest else None
+
+def run_batch(requests, backend, path, poll_interval=60.0, timeout=None, sleep=time.sleep):
+    """
+    Write requests to a JSONL file, submit it and wait for the results.
+
+    The id of the submitted batch is saved next to the request file until the
+    batch ends, so an interrupted run polls the same batch again instead of
+    paying for a new one, as long as it sends the same requests.
+
+    Args:
+        requests (list): Batch request lines, each with a unique "custom_id".
+        backend: Batch backend with `submit`, `status` and `results`.
+        path (str): Path of the JSONL request file.
+        poll_interval (float): Seconds between two status checks.
+        timeout (float): Seconds to wait before giving up, None to wait for the provider.
+        sleep (callable): Function used to wait, in seconds.
+
+    Returns:
+        dict: (answer text or None, usage dict) by custom id.
+
+    Raises:
+        RuntimeError: If the batch did not complete.
+    """
+    if not requests:
+        return {}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    content = "".join(json.dumps(request, ensure_ascii=False) + "\n" for request in requests)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    state_path = _state_path(path)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    batch_id = _load_batch_id(state_path, digest)
+    if batch_id is not None:
+        status = backend.status(batch_id)
+        if status in FINAL_STATUSES and status != "completed":
+            logger.warning(f"Batch {batch_id} of an interrupted run ended with status '{status}', submitting the requests again.")
+            batch_id = None
+        else:
+            logger.info(f"Resuming batch {batch_id} ({status}) with {len(requests)} request(s).")
+    if batch_id is None:
+        batch_id = backend.submit(path)
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch_id, "digest": digest}, f)
+        logger.info(f"Submitted batch {batch_id} with {len(requests)} request(s).")
+        instrumentation.increment("batch_requests", len(requests))
+
+    started = time.monotonic()
+    while True:
+        status = backend.status(batch_id)
+        if status in FINAL_STATUSES:
+            break
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise RuntimeError(f"Batch {batch_id} did not complete within {timeout:g}s (status: {status}).")
+        logger.info(f"Batch {batch_id} is {status}, checking again in {poll_interval:g}s.")
+        sleep(poll_interval)
+    if status != "completed":
+        os.remove(state_path)
+        raise RuntimeError(f"Batch {batch_id} ended with status '{status}'.")
+    answers = parse_batch_output(backend.results(batch_id))
+    os.remove(state_path)
+    return answers
+
+def _chat_request(custom_id, model, system_message, user_message):
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": user_message},
+            ],
+        },
+    }
+
+def process_files_in_batch(
+    filepaths,
+    topics,
+    backend,
+    workdir,
+    cache=None,
+    max_input_tokens=None,
+    summarization_config=None,
+    poll_interval=60.0,
+    timeout=None,
+    content_limits=None,
+):
+    """
+    Summarize and classify reading files with two batches: one of summaries,
+    then one classifying those summaries.
+
+    Cached answers are reused and never resubmitted. Batch requests use the first
+    model tier of each stage, without escalation, and content over
+    `max_input_tokens` is truncated instead of summarized in chunks. Articles
+    whose summary failed are not sent for classification.
+
+    Args:
+        filepaths (list): Paths to the reading files.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+        backend: Batch backend with `submit`, `status` and `results`.
+        workdir (str): Directory of the JSONL request files.
+        cache (ResponseCache): Optional cache of previous model responses.
+        max_input_tokens (int): Token budget of a single summarization request.
+        summarization_config (PromptConfig): Summarization prompt of the run.
+        poll_interval (float): Seconds between two status checks.
+        timeout (float): Seconds to wait for each batch, None to wait for the provider.
+        content_limits (dict): (policy, max tokens) by path for the files the budget guard cut down.
+
+    Returns:
+        list: One ArticleRecord per file, as returned by `process_files`.
+    """
+    config = summarization_config or PromptConfig.from_dict(DEFAULT_SUMMARIZATION_PROMPT, SUMMARIZATION_FIELDS)
+    summary_model = route_for("summarize", config.model).models[0]
+    articles, requests, keys = [], [], {}
+    for index, filepath in enumerate(filepaths):
+        metadata = read_metadata(filepath)
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        if content_limits and filepath in content_limits:
+            policy, max_tokens = content_limits[filepath]
+            content = fit_content(content, policy, max_tokens, config.model)
+        user_message = config.render(content=content)
+        if max_input_tokens and count_tokens(user_message, config.model) > max_input_tokens:
+            budget = max(1, max_input_tokens - count_tokens(config.render(content=""), config.model))
+            user_message = config.render(content=truncate_to_tokens(content, budget, config.model))
+        articles.append(ArticleRecord(filepath, title=metadata["title"], url=metadata["url"]))
+        keys[index] = _summary_cache_key(user_message, config)
+        cached = cache.get(keys[index]) if cache is not None else None
+        if cached is not None:
+            articles[index].summary = cached
+        else:
+            requests.append(_chat_request(f"summary-{index}", summary_model, config.system_message, user_message))
+
+    answers = run_batch(requests, backend, os.path.join(workdir, "batch_summaries.jsonl"), poll_interval, timeout)
+    for custom_id, (answer, usage) in answers.items():
+        index = int(custom_id.split("-", 1)[1])
+        articles[index].set_usage(usage)
+        if answer:
+            articles[index].summary = answer
+            if cache is not None:
+                cache.set(keys[index], "summary", answer)
+    for article in articles:
+        if article.summary is None:
+            article.summary = f"{SUMMARY_ERROR_PREFIX}: missing batch result"
+
+    classify_model = route_for("classify", CLASSIFIER_MODEL).models[0]
+    requests = []
+    for index, article in enumerate(articles):
+        if is_failed_summary(article.summary):
+            continue  # Left as "Others" below
+        cached = cache.get(_classification_cache_key(article.title, article.summary, topics)) if cache is not None else None
+        if cached is not None:
+            article.topic = cached
+        else:
+            prompt = build_classification_prompt(article.title, article.summary, topics)
+            requests.append(_chat_request(f"classify-{index}", classify_model, CLASSIFIER_SYSTEM_MESSAGE, prompt))
+
+    answers = run_batch(requests, backend, os.path.join(workdir, "batch_classifications.jsonl"), poll_interval, timeout)
+    for custom_id, (answer, _) in answers.items():
+        article = articles[int(custom_id.split("-", 1)[1])]
+        article.topic = _validate_label(answer, topics)
+        if answer and cache is not None:
+            cache.set(_classification_cache_key(article.title, article.summary, topics), "classification", article.topic)
+    for article in articles:
+        if article.topic is None:
+            article.topic = "Others"
+    return articles
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "link_blogger")
+
+def make_cache_key(kind, *parts):
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        kind (str): Kind of cached value, e.g. 'summary' or 'classification'.
+        *parts: Everything the value depends on (model, prompts, content...).
+
+    Returns:
+        str: Hex SHA-256 digest identifying the request.
+    """
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+class ResponseCache:
+    """
+    SQLite-backed cache of model responses, safe to share between threads.
+
+    Entries older than `max_age_days` are dropped, and the least recently used
+    entries are evicted once the stored values exceed `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, max_age_days=90, refresh=False):
+        """
+        Args:
+            path (str): Path to the SQLite database file.
+            max_bytes (int): Maximum total size of the cached values.
+            max_age_days (int): Maximum age of an entry before it expires.
+            refresh (bool): Ignore existing entries and overwrite them with fresh results.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, key):
+        """
+        Look up a cached value.
+
+        Args:
+            key (str): Key built with `make_cache_key`.
+
+        Returns:
+            str: The cached value, or None on a miss (always None when refreshing).
+        """
+        now = time.time()
+        with self._lock:
+            if self.refresh:
+                self.misses += 1
+                return None
+            row = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_days * 86400:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+        return row[0]
+
+    def set(self, key, kind, value):
+        """
+        Store a value in the cache.
+
+        Args:
+            key (str): Key built with `make_cache_key`.
+            kind (str): Kind of cached value.
+            value (str): Value to store.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, value, len(value.encode("utf-8")), now, now),
+            )
+            self._connection.commit()
+
+    def evict(self):
+        """
+        Remove expired entries, then the least recently used ones above the size limit.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._lock:
+            removed = self._connection.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,)).rowcount
+            total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+                stale = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((key,))
+                    total -= size
+                self._connection.executemany("DELETE FROM responses WHERE key = ?", stale)
+                removed += len(stale)
+            self._connection.commit()
+        return removed
+
+    def close(self):
+        """
+        Evict stale entries and close the database.
+        """
+        self.evict()
+        with self._lock:
+            self._connection.close()
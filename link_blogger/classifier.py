@@ -1,18 +1,73 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import json
+import logging
 import os
+import re
+
+from link_blogger.cache import make_cache_key
+from link_blogger.config import CONF_DIR, TOPICS_FILE, load_topics_file
+from link_blogger.routing import route_for, routed_completion
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_ENGINES = ("llm", "local", "hybrid")
 
 def load_topics():
     """
-    Load the list of topics from a configuration file.
+    Load the list of topics from a configuration file, see `config.load_topics_file`.
+
+    Raises:
+        FileNotFoundError: If the topics file does not exist.
     """
-    topics_file = os.path.join(".conf", "topics.conf")
+    topics_file = os.path.join(CONF_DIR, TOPICS_FILE)
     if not os.path.exists(topics_file):
         raise FileNotFoundError(f"Topics configuration file not found at {topics_file}.")
-    
-    with open(topics_file, 'r', encoding='utf-8') as f:
-        topics = [line.strip() for line in f if line.strip()]
-    return topics
+    return list(load_topics_file(topics_file) or ())
+
+CLASSIFIER_MODEL = "gpt-4o"
+CLASSIFIER_SYSTEM_MESSAGE = "You are an AI classifier that categorizes articles into topics."
+
+def build_classification_prompt(title, summary, topics):
+    """
+    Build the prompt used to classify a single article.
+
+    Args:
+        title (str): The title of the article.
+        summary (str): The summary of the article.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+
+    Returns:
+        str: The user prompt.
+    """
+    if topics:
+        return (
+            f"Classify the following article into one of the topics: {', '.join(topics)}.\n\n"
+            f"Title: {title}\n\n"
+            f"Summary: {summary}"
+        )
+    return (
+        "Classify the following article into a broad category like AI, Technology, Business, "
+        "Health, Science, Philosophy, or similar. Suggest a category if none fit.\n\n"
+        f"Title: {title}\n\n"
+        f"Summary: {summary}"
+    )
+
+def _classification_cache_key(title, summary, topics):
+    prompt = build_classification_prompt(title, summary, topics)
+    models = route_for("classify", CLASSIFIER_MODEL).models
+    return make_cache_key("classification", *models, CLASSIFIER_SYSTEM_MESSAGE, prompt)
+
+def _validate_label(label, topics):
+    if not isinstance(label, str) or not label.strip():
+        return "Others"
+    label = label.strip()
+    if topics and label not in topics:
+        return "Others"
+    return label
 
-def classify_article_with_chatgpt(title, summary, topics, openai_client):
+def classify_article_with_chatgpt(title, summary, topics, openai_client, cache=None):
     """
     Classify the article into topics using OpenAI.
 
@@ -21,37 +76,378 @@ def classify_article_with_chatgpt(title, summary, topics, openai_client):
         summary (str): The summary of the article.
         topics (list): Predefined list of topics. If None, GPT classifies freely.
         openai_client: OpenAI client for making API calls.
+        cache (ResponseCache): Optional cache of previous classifications.
 
     Returns:
         str: A topic classification.
     """
+    prompt = build_classification_prompt(title, summary, topics)
+
+    cache_key = None
+    if cache is not None:
+        cache_key = _classification_cache_key(title, summary, topics)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
-        if topics:
-            prompt = (
-                f"Classify the following article into one of the topics: {', '.join(topics)}.\n\n"
-                f"Title: {title}\n\n"
-                f"Summary: {summary}"
-            )
-        else:
-            prompt = (
-                "Classify the following article into a broad category like AI, Technology, Business, "
-                "Health, Science, Philosophy, or similar. Suggest a category if none fit.\n\n"
-                f"Title: {title}\n\n"
-                f"Summary: {summary}"
-            )
-        
-        completion = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an AI classifier that categorizes articles into topics."},
+        # Escalate to the next model tier on labels outside the topics
+        classification = routed_completion(
+            openai_client,
+            "classify",
+            CLASSIFIER_MODEL,
+            [
+                {"role": "system", "content": CLASSIFIER_SYSTEM_MESSAGE},
                 {"role": "user", "content": prompt},
             ],
+            validate=lambda label: not topics or label in topics,
+        )
+    except Exception as e:
+        logger.error(f"Error classifying '{title}': {e}")
+        return "Others"
+
+    classification = _validate_label(classification, topics)
+    if cache_key is not None:
+        cache.set(cache_key, "classification", classification)
+    return classification
+
+def build_batch_classification_prompt(articles, topics):
+    """
+    Build the prompt used to classify several articles in one request.
+
+    Args:
+        articles (list): (title, summary) pairs.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+
+    Returns:
+        str: The user prompt, asking for a JSON object with one label per article id.
+    """
+    if topics:
+        instructions = f"Classify each of the following articles into one of the topics: {', '.join(topics)}."
+    else:
+        instructions = (
+            "Classify each of the following articles into a broad category like AI, Technology, Business, "
+            "Health, Science, Philosophy, or similar. Suggest a category if none fit."
+        )
+    listing = "\n\n".join(
+        f"Article {index}\nTitle: {title}\nSummary: {summary}"
+        for index, (title, summary) in enumerate(articles, start=1)
+    )
+    return (
+        f"{instructions}\n"
+        'Answer with a JSON object of the form {"classifications": [{"id": 1, "topic": "..."}]}, '
+        "with exactly one entry per article.\n\n"
+        f"{listing}"
+    )
+
+def _parse_batch_labels(content, count, topics):
+    labels = [None] * count
+    try:
+        entries = json.loads(content).get("classifications", [])
+    except (ValueError, AttributeError):
+        return labels
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("id")
+        if isinstance(index, int) and 1 <= index <= count:
+            labels[index - 1] = _validate_label(entry.get("topic"), topics)
+    return labels
+
+def classify_batch_with_chatgpt(articles, topics, openai_client):
+    """
+    Classify several articles with a single structured-output request.
+
+    Args:
+        articles (list): (title, summary) pairs.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+        openai_client: OpenAI client for making API calls.
+
+    Returns:
+        list: One topic per article, "Others" for labels outside `topics` and
+            None for articles the model did not answer.
+        None: If the request itself failed.
+    """
+    def is_valid(content):
+        labels = _parse_batch_labels(content, len(articles), topics)
+        return all(label is not None and (label != "Others" or not topics or "Others" in topics) for label in labels)
+
+    try:
+        content = routed_completion(
+            openai_client,
+            "classify",
+            CLASSIFIER_MODEL,
+            [
+                {"role": "system", "content": CLASSIFIER_SYSTEM_MESSAGE},
+                {"role": "user", "content": build_batch_classification_prompt(articles, topics)},
+            ],
+            validate=is_valid,
+            response_format={"type": "json_object"},
+        )
+    except Exception as e:
+        logger.error(f"Error classifying a batch of {len(articles)} article(s): {e}")
+        return None
+    return _parse_batch_labels(content, len(articles), topics)
+
+def classify_articles_in_batches(articles, topics, openai_client, batch_size=20, cache=None, concurrency=1):
+    """
+    Classify many articles, sending `batch_size` of them per request.
+
+    Cached classifications are reused per article and only the remaining ones are
+    sent to the model. Labels not in `topics` fall back to "Others" per article.
+
+    Args:
+        articles (list): (title, summary) pairs.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+        openai_client: OpenAI client for making API calls.
+        batch_size (int): Maximum number of articles per request.
+        cache (ResponseCache): Optional cache of previous classifications.
+        concurrency (int): Maximum number of batch requests in flight.
+
+    Returns:
+        list: One topic per article, in the same order as `articles`.
+    """
+    labels = [None] * len(articles)
+    pending = []
+    for index, (title, summary) in enumerate(articles):
+        if cache is not None:
+            labels[index] = cache.get(_classification_cache_key(title, summary, topics))
+        if labels[index] is None:
+            pending.append(index)
+
+    batch_size = max(1, batch_size)
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+
+    def classify_batch(batch):
+        return classify_batch_with_chatgpt([articles[index] for index in batch], topics, openai_client)
+
+    if concurrency > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(classify_batch, batches))
+    else:
+        results = [classify_batch(batch) for batch in batches]
+
+    for batch, batch_labels in zip(batches, results):
+        for position, index in enumerate(batch):
+            label = batch_labels[position] if batch_labels is not None else None
+            if label is None:
+                labels[index] = "Others"
+                continue
+            labels[index] = label
+            if cache is not None:
+                title, summary = articles[index]
+                cache.set(_classification_cache_key(title, summary, topics), "classification", labels[index])
+    return labels
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#-]*")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how in into is it its of on or that the their this "
+    "to was were what when which who why will with you your about article discusses explores".split()
+)
+POST_ENTRY_PATTERN = re.compile(r"^- \[(?P<title>.*?)\]\((?P<url>.*?)\):\s*(?P<summary>.*)$")
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens, dropping stopwords.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Tokens in order of appearance.
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def load_labeled_articles(directory, topics=None):
+    """
+    Collect labeled examples from previously generated `wrapped_up_readings_*.md` posts.
+
+    Every `- [title](url): summary` entry is labeled with the `## Topic` heading above it.
+
+    Args:
+        directory (str): Directory containing previous posts.
+        topics (list): If given, only keep examples labeled with one of these topics.
+
+    Returns:
+        list: (text, topic) pairs.
+    """
+    examples = []
+    for filepath in sorted(glob.glob(os.path.join(directory, "wrapped_up_readings_*.md"))):
+        topic = None
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("## "):
+                    topic = line[3:].strip()
+                    continue
+                match = POST_ENTRY_PATTERN.match(line)
+                if match and topic and (not topics or topic in topics):
+                    examples.append((f"{match.group('title')} {match.group('summary')}", topic))
+    return examples
+
+class LocalTopicClassifier:
+    """
+    Offline topic classifier using TF-IDF vectors and cosine similarity.
+
+    Each topic is represented by the centroid of its labeled examples plus its own
+    name, so it can classify (with low confidence) even without any examples.
+    """
+
+    def __init__(self, topics, examples=()):
+        """
+        Args:
+            topics (list): Topics the classifier can predict.
+            examples (iterable): (text, topic) pairs used as training data.
+        """
+        import numpy as np
+
+        self.topics = list(topics)
+        documents = [(topic, topic) for topic in self.topics]
+        documents.extend((text, topic) for text, topic in examples if topic in self.topics)
+
+        counts = [Counter(tokenize(text)) for text, _ in documents]
+        self.vocabulary = {}
+        for counter in counts:
+            for token in counter:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        term_frequencies = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, counter in enumerate(counts):
+            for token, count in counter.items():
+                term_frequencies[row, self.vocabulary[token]] = count
+        document_frequency = np.count_nonzero(term_frequencies, axis=0)
+        self.idf = (np.log((1 + len(documents)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        vectors = self._normalize(np.log1p(term_frequencies) * self.idf)
+        labels = np.array([self.topics.index(topic) for _, topic in documents])
+        centroids = np.zeros((len(self.topics), len(self.vocabulary)), dtype=np.float32)
+        np.add.at(centroids, labels, vectors)
+        self.centroids = self._normalize(centroids)
+        self.example_count = len(documents) - len(self.topics)
+
+    @staticmethod
+    def _normalize(matrix):
+        import numpy as np
+
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    @classmethod
+    def from_posts(cls, directory, topics):
+        """
+        Build a classifier bootstrapped from previously generated posts.
+
+        Args:
+            directory (str): Directory containing previous `wrapped_up_readings_*.md` posts.
+            topics (list): Topics the classifier can predict.
+
+        Returns:
+            LocalTopicClassifier: The trained classifier.
+        """
+        return cls(topics, load_labeled_articles(directory, topics))
+
+    def vectorize(self, texts):
+        """
+        Turn texts into normalized TF-IDF vectors over the training vocabulary.
+
+        Args:
+            texts (list): Texts to vectorize.
+
+        Returns:
+            numpy.ndarray: One row per text.
+        """
+        import numpy as np
+
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token, count in Counter(tokenize(text)).items():
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    matrix[row, column] = count
+        return self._normalize(np.log1p(matrix) * self.idf)
+
+    def predict(self, texts):
+        """
+        Predict the closest topic for each text.
+
+        Args:
+            texts (list): Texts to classify.
+
+        Returns:
+            list: (topic, score) pairs, where score is the cosine similarity in [0, 1].
+        """
+        if not texts:
+            return []
+        scores = self.vectorize(texts) @ self.centroids.T
+        best = scores.argmax(axis=1)
+        return [(self.topics[index], float(scores[row, index])) for row, index in enumerate(best)]
+
+def classify_articles(
+    articles,
+    topics,
+    openai_client,
+    engine="llm",
+    local_classifier=None,
+    threshold=0.2,
+    batch_size=0,
+    cache=None,
+    concurrency=1,
+):
+    """
+    Classify articles with the selected engine.
+
+    - "llm": every article is classified by the model.
+    - "local": every article is classified by `local_classifier`, no API calls.
+    - "hybrid": the local prediction is kept when its score reaches `threshold`;
+      the remaining articles are sent to the model.
+
+    Args:
+        articles (list): (title, summary) pairs.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+        openai_client: OpenAI client for making API calls.
+        engine (str): One of CLASSIFIER_ENGINES.
+        local_classifier (LocalTopicClassifier): Required for the "local" and "hybrid" engines.
+        threshold (float): Minimum local score accepted by the "hybrid" engine.
+        batch_size (int): When greater than 1, send this many articles per model request.
+        cache (ResponseCache): Optional cache of previous classifications.
+        concurrency (int): Maximum number of model requests in flight.
+
+    Returns:
+        list: One topic per article, in the same order as `articles`.
+    """
+    if engine not in CLASSIFIER_ENGINES:
+        raise ValueError(f"Unknown classifier engine '{engine}'. Choose one of: {', '.join(CLASSIFIER_ENGINES)}.")
+
+    labels = [None] * len(articles)
+    if engine in ("local", "hybrid"):
+        if local_classifier is None:
+            raise ValueError(f"The '{engine}' classifier engine requires a local classifier.")
+        predictions = local_classifier.predict([f"{title} {summary}" for title, summary in articles])
+        for index, (label, score) in enumerate(predictions):
+            # A None label means the classifier could not tell; leave it to the model
+            if engine == "local" or score >= threshold:
+                labels[index] = label
+
+    pending = [index for index, label in enumerate(labels) if label is None]
+    if not pending:
+        return labels
+
+    pending_articles = [articles[index] for index in pending]
+    if batch_size > 1:
+        results = classify_articles_in_batches(
+            pending_articles, topics, openai_client, batch_size=batch_size, cache=cache, concurrency=concurrency
         )
-        classification = completion.choices[0].message.content.strip()
+    else:
+        def classify_one(article):
+            title, summary = article
+            return classify_article_with_chatgpt(title, summary, topics, openai_client, cache=cache)
 
-        if classification in topics:
-            return classification
+        if concurrency > 1 and len(pending_articles) > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(classify_one, pending_articles))
         else:
-            return "Others"
-    except Exception:
-        return "Others"
\ No newline at end of file
+            results = [classify_one(article) for article in pending_articles]
+
+    for index, label in zip(pending, results):
+        labels[index] = label
+    return labels
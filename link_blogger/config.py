@@ -0,0 +1,267 @@
+from dataclasses import dataclass
+import logging
+import os
+import string
+import threading
+
+from link_blogger.file_parser import load_yaml_config
+
+logger = logging.getLogger(__name__)
+
+CONF_DIR = ".conf"
+SUMMARIZATION_PROMPT_FILE = "summarization_prompt.yaml"
+INTRODUCTION_PROMPT_FILE = "introduction_prompt.yaml"
+TOPICS_FILE = "topics.conf"
+MODELS_FILE = "models.yaml"
+
+ROUTED_STAGES = ("summarize", "classify", "intro")
+
+DEFAULT_SUMMARIZATION_PROMPT = {
+    "model": "gpt-4o",
+    "system_message": "You are a helpful assistant.",
+    "user_message": (
+        "Summarize the following text in one paragraph, using less than 500 chars. "
+        "Provide the summary in English:\n\n{content}"
+    ),
+}
+
+DEFAULT_INTRODUCTION_PROMPT = {
+    "model": "gpt-4o",
+    "system_message": "You are a creative assistant that writes introductions for blog posts. \
+                      You are really able to get to the core of the content and provide a concise summary.",
+    "user_message": (
+        "Every week you write an update post of recent readings. Write a concise and engaging introduction for a blog post summarizing recent readings. "
+        "Provide a two sentences long introduction. Try to be really concise, consider the {topics} and the provided highlights of articles:\n\n{article_context}"
+    ),
+}
+
+SUMMARIZATION_FIELDS = frozenset({"content"})
+INTRODUCTION_FIELDS = frozenset({"topics", "article_context"})
+
+class ConfigError(ValueError):
+    """
+    Raised when a configuration file is present but not usable.
+    """
+
+@dataclass(frozen=True)
+class PromptConfig:
+    """
+    A validated prompt configuration with a pre-compiled user message template.
+    """
+
+    model: str
+    system_message: str
+    user_message: str
+    parts: tuple
+
+    @classmethod
+    def from_dict(cls, config, allowed_fields, source="<default>"):
+        """
+        Validate a prompt configuration and compile its user message template.
+
+        Args:
+            config (dict): Mapping with 'model', 'system_message' and 'user_message'.
+            allowed_fields (frozenset): Placeholders the template may use.
+            source (str): Where the configuration comes from, for error messages.
+
+        Returns:
+            PromptConfig: The compiled configuration.
+
+        Raises:
+            ConfigError: If a key is missing or the template is invalid.
+        """
+        if not isinstance(config, dict):
+            raise ConfigError(f"{source}: expected a mapping with model, system_message and user_message.")
+        missing = [key for key in ("model", "system_message", "user_message") if not config.get(key)]
+        if missing:
+            raise ConfigError(f"{source}: missing {', '.join(missing)}.")
+
+        parts = []
+        try:
+            for literal, field, format_spec, conversion in string.Formatter().parse(str(config["user_message"])):
+                if field is not None and (field not in allowed_fields or format_spec or conversion):
+                    raise ConfigError(
+                        f"{source}: unknown placeholder '{{{field}}}'. Available: "
+                        + ", ".join(f"{{{name}}}" for name in sorted(allowed_fields))
+                    )
+                parts.append((literal, field))
+        except ValueError as e:
+            if isinstance(e, ConfigError):
+                raise
+            raise ConfigError(f"{source}: invalid user_message template ({e}).") from e
+
+        return cls(
+            model=str(config["model"]),
+            system_message=str(config["system_message"]),
+            user_message=str(config["user_message"]),
+            parts=tuple(parts),
+        )
+
+    def render(self, **values):
+        """
+        Render the user message, replacing placeholders with `values`.
+
+        Args:
+            **values: Values of the template placeholders.
+
+        Returns:
+            str: The rendered user message.
+        """
+        return "".join(literal + (str(values[field]) if field is not None else "") for literal, field in self.parts)
+
+def load_prompt_config(file_path, default_config, allowed_fields):
+    """
+    Load and compile a prompt configuration, falling back to `default_config` when the file is missing.
+
+    Args:
+        file_path (str): Path to the YAML file.
+        default_config (dict): Fallback configuration.
+        allowed_fields (frozenset): Placeholders the template may use.
+
+    Returns:
+        PromptConfig: The compiled configuration.
+    """
+    config = load_yaml_config(file_path, default_config)
+    return PromptConfig.from_dict(config, allowed_fields, source=file_path)
+
+def load_topics_file(file_path):
+    """
+    Load the topic list, one topic per line.
+
+    Returns:
+        tuple: The topics, or None if the file is missing or empty.
+    """
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "r", encoding="utf-8") as f:
+        topics = tuple(line.strip() for line in f if line.strip())
+    return topics or None
+
+@dataclass(frozen=True)
+class StageRoute:
+    """
+    Model tiers of a pipeline stage, cheapest first.
+
+    The next tier is only used when a model's answer is invalid: empty, longer
+    than `max_output_tokens`, or rejected by the stage (e.g. a label outside the topics).
+    """
+
+    models: tuple
+    max_output_tokens: int = None
+
+    @classmethod
+    def from_dict(cls, config, source="<default>"):
+        """
+        Validate a stage entry of the models file.
+
+        Raises:
+            ConfigError: If the entry is not usable.
+        """
+        if isinstance(config, str):
+            config = {"models": [config]}
+        if not isinstance(config, dict):
+            raise ConfigError(f"{source}: each stage must map to a model or a mapping with 'models'.")
+        models = config.get("models")
+        if isinstance(models, str):
+            models = [models]
+        if not models or not all(isinstance(model, str) and model for model in models):
+            raise ConfigError(f"{source}: 'models' must be a non-empty list of model names.")
+        max_output_tokens = config.get("max_output_tokens")
+        if max_output_tokens is not None and (not isinstance(max_output_tokens, int) or max_output_tokens <= 0):
+            raise ConfigError(f"{source}: 'max_output_tokens' must be a positive integer.")
+        return cls(models=tuple(models), max_output_tokens=max_output_tokens)
+
+def load_model_routes(file_path):
+    """
+    Load the model tiers of each stage.
+
+    Returns:
+        dict: StageRoute by stage name, or None if the file is missing.
+
+    Raises:
+        ConfigError: If the file is present but not usable.
+    """
+    config = load_yaml_config(file_path, None)
+    if config is None:
+        return None
+    if not isinstance(config, dict):
+        raise ConfigError(f"{file_path}: expected a mapping of stage names to model tiers.")
+    unknown = set(config) - set(ROUTED_STAGES)
+    if unknown:
+        raise ConfigError(f"{file_path}: unknown stage(s) {', '.join(sorted(unknown))}; expected {', '.join(ROUTED_STAGES)}.")
+    return {stage: StageRoute.from_dict(entry, source=f"{file_path} ({stage})") for stage, entry in config.items()}
+
+@dataclass(frozen=True)
+class AppConfig:
+    """
+    Immutable configuration of a run, loaded once from the `.conf` directory.
+    """
+
+    summarization: PromptConfig
+    introduction: PromptConfig
+    topics: tuple = None
+    routes: dict = None
+
+def load_config(conf_dir=CONF_DIR):
+    """
+    Load, validate and compile every configuration file of `conf_dir`.
+
+    Args:
+        conf_dir (str): Configuration directory.
+
+    Returns:
+        AppConfig: The run configuration.
+
+    Raises:
+        ConfigError: If a prompt or models file is present but not usable.
+    """
+    return AppConfig(
+        summarization=load_prompt_config(
+            os.path.join(conf_dir, SUMMARIZATION_PROMPT_FILE), DEFAULT_SUMMARIZATION_PROMPT, SUMMARIZATION_FIELDS
+        ),
+        introduction=load_prompt_config(
+            os.path.join(conf_dir, INTRODUCTION_PROMPT_FILE), DEFAULT_INTRODUCTION_PROMPT, INTRODUCTION_FIELDS
+        ),
+        topics=load_topics_file(os.path.join(conf_dir, TOPICS_FILE)),
+        routes=load_model_routes(os.path.join(conf_dir, MODELS_FILE)),
+    )
+
+class ConfigLoader:
+    """
+    Keeps the current `AppConfig` and reloads it when a configuration file changes.
+
+    Meant for long-running modes; one-shot runs can call `load_config` directly.
+    If a changed file is invalid, the previous configuration is kept.
+    """
+
+    FILES = (SUMMARIZATION_PROMPT_FILE, INTRODUCTION_PROMPT_FILE, TOPICS_FILE, MODELS_FILE)
+
+    def __init__(self, conf_dir=CONF_DIR):
+        self.conf_dir = conf_dir
+        self._lock = threading.Lock()
+        self._mtimes = self._read_mtimes()
+        self._config = load_config(conf_dir)
+
+    def _read_mtimes(self):
+        mtimes = []
+        for name in self.FILES:
+            path = os.path.join(self.conf_dir, name)
+            mtimes.append(os.path.getmtime(path) if os.path.exists(path) else None)
+        return tuple(mtimes)
+
+    def get(self):
+        """
+        Return the current configuration, reloading it first if a file changed.
+
+        Returns:
+            AppConfig: The current configuration.
+        """
+        with self._lock:
+            mtimes = self._read_mtimes()
+            if mtimes != self._mtimes:
+                self._mtimes = mtimes
+                try:
+                    self._config = load_config(self.conf_dir)
+                except ConfigError as e:
+                    logger.warning(f"{e} Keeping the previous configuration.")
+            return self._config
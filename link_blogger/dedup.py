@@ -0,0 +1,225 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from link_blogger.file_parser import iter_content, read_metadata
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMETERS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "si",
+    "ref", "ref_src", "ref_url", "source", "_hsenc", "_hsmi", "mkt_tok",
+})
+WORD_PATTERN = re.compile(r"\w+")
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+
+def canonicalize_url(url):
+    """
+    Normalize a URL so that copies of the same article compare equal.
+
+    The scheme and host are lowercased, `www.`, fragments, tracking parameters
+    (`utm_*`, `fbclid`...) and trailing slashes are dropped, and the remaining
+    query parameters are sorted.
+
+    Args:
+        url (str): URL to normalize.
+
+    Returns:
+        str: The canonical URL, or None if there is no usable URL.
+    """
+    if not url or url == "#":
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMETERS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme.lower() in ("http", "https") else parts.scheme.lower(), host, path, urlencode(query), ""))
+
+def simhash(text, shingle_size=3):
+    """
+    Compute a 64-bit SimHash of a text over word shingles.
+
+    Near-duplicate texts get fingerprints with a small Hamming distance.
+
+    Args:
+        text (str): Text to fingerprint.
+        shingle_size (int): Number of words per shingle.
+
+    Returns:
+        int: The fingerprint.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def hamming_distance(first, second):
+    return bin(first ^ second).count("1")
+
+class DedupIndex:
+    """
+    Persisted fingerprints (canonical URL and SimHash) of reading files, keyed by
+    path and content hash, so unchanged files are not read again on later runs.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the JSON file storing the index.
+        """
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                self.entries = {}
+
+    def fingerprint(self, filepath, content_hash=None):
+        """
+        Return the (canonical URL, SimHash) of a file, computing it if needed.
+
+        Args:
+            filepath (str): Path to the reading file.
+            content_hash (str): Hash of its content; without it the fingerprint is always recomputed.
+
+        Returns:
+            tuple: (canonical URL or None, SimHash).
+        """
+        key = os.path.abspath(filepath)
+        entry = self.entries.get(key)
+        if entry is not None and content_hash is not None and entry["hash"] == content_hash:
+            return entry["url"], entry["simhash"]
+        url = canonicalize_url(read_metadata(filepath)["url"])
+        fingerprint = simhash("".join(iter_content(filepath, skip_frontmatter=True)))
+        self.entries[key] = {"hash": content_hash, "url": url, "simhash": fingerprint}
+        return url, fingerprint
+
+    def record(self, filepath, content_hash, url, fingerprint):
+        """
+        Store a fingerprint computed elsewhere (e.g. by the pre-processing workers).
+
+        Args:
+            filepath (str): Path to the reading file.
+            content_hash (str): Hash of its content.
+            url (str): Canonical URL, or None.
+            fingerprint (int): SimHash of its content.
+        """
+        self.entries[os.path.abspath(filepath)] = {"hash": content_hash, "url": url, "simhash": fingerprint}
+
+    def save(self):
+        """
+        Write the index to disk atomically.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(temporary_path, self.path)
+
+def find_duplicate_clusters(fingerprints, max_distance=3):
+    """
+    Cluster items sharing a canonical URL or with SimHashes at most `max_distance` bits apart.
+
+    Candidate pairs are found by splitting fingerprints into bands: with
+    `max_distance` below the number of bands, near duplicates always share a band.
+
+    Args:
+        fingerprints (list): (canonical URL or None, SimHash) per item.
+        max_distance (int): Maximum Hamming distance of near duplicates.
+
+    Returns:
+        list: Clusters as lists of item positions, in input order; singletons included.
+
+    Raises:
+        ValueError: If `max_distance` is not below `SIMHASH_BANDS`.
+    """
+    if not 0 <= max_distance < SIMHASH_BANDS:
+        raise ValueError(f"max_distance must be between 0 and {SIMHASH_BANDS - 1}, got {max_distance}")
+    parent = list(range(len(fingerprints)))
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(first, second):
+        first, second = find(first), find(second)
+        if first != second:
+            parent[max(first, second)] = min(first, second)
+
+    by_url = {}
+    buckets = {}
+    band_bits = SIMHASH_BITS // SIMHASH_BANDS
+    for position, (url, fingerprint) in enumerate(fingerprints):
+        if url is not None:
+            if url in by_url:
+                union(by_url[url], position)
+            else:
+                by_url[url] = position
+        if fingerprint == 0:
+            continue  # Empty content
+        for band in range(SIMHASH_BANDS):
+            bucket = (band, fingerprint >> (band * band_bits) & ((1 << band_bits) - 1))
+            for other in buckets.get(bucket, ()):
+                if find(other) != find(position) and hamming_distance(fingerprint, fingerprints[other][1]) <= max_distance:
+                    union(other, position)
+            buckets.setdefault(bucket, []).append(position)
+
+    clusters = {}
+    for position in range(len(fingerprints)):
+        clusters.setdefault(find(position), []).append(position)
+    return list(clusters.values())
+
+def deduplicate_files(filepaths, index, content_hashes=None, max_distance=3):
+    """
+    Keep one representative file per cluster of duplicates.
+
+    The representative is the most recently modified copy (the one with the
+    latest highlights); it takes the position of the first copy in the list.
+
+    Args:
+        filepaths (list): Paths to the reading files.
+        index (DedupIndex): Fingerprint index.
+        content_hashes (dict): Content hash by path, used to reuse indexed fingerprints.
+        max_distance (int): Maximum SimHash Hamming distance of near duplicates.
+
+    Returns:
+        tuple: (representative paths, {representative: [dropped duplicates]}).
+    """
+    content_hashes = content_hashes or {}
+    fingerprints = [index.fingerprint(filepath, content_hashes.get(filepath)) for filepath in filepaths]
+    clusters = find_duplicate_clusters(fingerprints, max_distance)
+    representatives = {}
+    duplicates = {}
+    for cluster in clusters:
+        paths = [filepaths[position] for position in cluster]
+        representative = max(paths, key=lambda path: (os.path.getmtime(path), -paths.index(path)))
+        representatives[cluster[0]] = representative
+        if len(paths) > 1:
+            duplicates[representative] = [path for path in paths if path != representative]
+            logger.info(f"Keeping {representative}, skipping {len(paths) - 1} duplicate(s): {duplicates[representative]}")
+    return [representatives[position] for position in sorted(representatives)], duplicates
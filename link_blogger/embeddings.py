@@ -0,0 +1,321 @@
+from collections import defaultdict
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from link_blogger.dedup import canonicalize_url
+from link_blogger.llm import create_embeddings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 256
+SEARCH_BLOCK_ROWS = 65536
+
+def article_text(title, summary):
+    """
+    Text embedded for an article; the same text the local classifiers see.
+    """
+    return f"{title} {summary}"
+
+def article_id(article):
+    """
+    Identify an article across weeks by its canonical URL, or its title when it has none.
+    """
+    return canonicalize_url(article.url) or f"title:{article.title}"
+
+class Embedder:
+    """
+    Embeds texts with the OpenAI embeddings API, in batches, remembering the
+    vectors of the run so the same text is only sent once.
+    """
+
+    def __init__(self, openai_client, model=EMBEDDING_MODEL, batch_size=EMBEDDING_BATCH_SIZE):
+        """
+        Args:
+            openai_client: OpenAI client for making API calls.
+            model (str): Embedding model name.
+            batch_size (int): Maximum number of texts per request.
+        """
+        self.openai_client = openai_client
+        self.model = model
+        self.batch_size = batch_size
+        self._vectors = {}
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        """
+        Embed texts.
+
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            numpy.ndarray: One L2-normalized float32 row per text.
+        """
+        with self._lock:
+            missing = list(dict.fromkeys(text for text in texts if text not in self._vectors))
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            vectors = _normalize(np.asarray(create_embeddings(self.openai_client, self.model, batch), dtype=np.float32))
+            with self._lock:
+                self._vectors.update(zip(batch, vectors))
+        with self._lock:
+            return np.stack([self._vectors[text] for text in texts]) if texts else np.zeros((0, 0), dtype=np.float32)
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+def _truncate(path, size):
+    if os.path.getsize(path) > size:
+        logger.warning(f"Dropping the end of {path}, left by an interrupted update of the embedding index.")
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+class EmbeddingIndex:
+    """
+    Persistent index of article embeddings: a raw float32 matrix read through
+    `numpy.memmap` and a JSON-lines table of the articles, one line per row.
+
+    New articles are appended to both files, so indexing a week costs
+    O(new articles). Vectors are normalized, so dot products are cosine similarities.
+    """
+
+    VECTORS_FILE = "embeddings.f32"
+    RECORDS_FILE = "embeddings.jsonl"
+    META_FILE = "embeddings.json"
+
+    def __init__(self, directory, model=EMBEDDING_MODEL):
+        """
+        Args:
+            directory (str): Directory of the index files.
+            model (str): Embedding model; an index built with another model is not reused.
+        """
+        self.directory = directory
+        self.model = model
+        self.dimensions = None
+        self.records = []
+        self._ids = set()
+        self._vectors = None
+        meta_path = os.path.join(directory, self.META_FILE)
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model") != model:
+            logger.warning(f"Embedding index built with {meta.get('model')}, not {model}; starting a new one.")
+            return
+        self.dimensions = meta["dimensions"]
+        records_path = os.path.join(directory, self.RECORDS_FILE)
+        vectors_path = os.path.join(directory, self.VECTORS_FILE)
+        offsets = [0]
+        with open(records_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("truncated line")
+                    self.records.append(json.loads(line))
+                except ValueError:
+                    break  # Interrupted append
+                offsets.append(offsets[-1] + len(line))
+        # Cut both files back to the rows that have a vector and a record, so
+        # later appends stay aligned after an interrupted one
+        row_bytes = 4 * self.dimensions
+        rows = min(len(self.records), os.path.getsize(vectors_path) // row_bytes)
+        self.records = self.records[:rows]
+        _truncate(vectors_path, rows * row_bytes)
+        _truncate(records_path, offsets[rows])
+        self._ids = {record["id"] for record in self.records}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, article_id):
+        return article_id in self._ids
+
+    @property
+    def vectors(self):
+        """
+        Memory-mapped matrix of the indexed vectors, one row per record.
+        """
+        if self._vectors is None or len(self._vectors) != len(self.records):
+            if not self.records:
+                return np.zeros((0, self.dimensions or 0), dtype=np.float32)
+            self._vectors = np.memmap(
+                os.path.join(self.directory, self.VECTORS_FILE),
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self.records), self.dimensions),
+            )
+        return self._vectors
+
+    def add(self, records, vectors):
+        """
+        Append articles that are not indexed yet.
+
+        Args:
+            records (list): Dictionaries with at least an 'id', e.g. title, url, topic and date.
+            vectors (numpy.ndarray): One normalized row per record.
+
+        Returns:
+            int: Number of articles appended.
+        """
+        keep = []
+        for position, record in enumerate(records):
+            if record["id"] not in self._ids:
+                self._ids.add(record["id"])
+                keep.append(position)
+        if not keep:
+            return 0
+        vectors = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32)[keep])
+        if self.dimensions is None:
+            self.dimensions = vectors.shape[1]
+            os.makedirs(self.directory, exist_ok=True)
+            for name in (self.VECTORS_FILE, self.RECORDS_FILE):
+                open(os.path.join(self.directory, name), "wb").close()
+            with open(os.path.join(self.directory, self.META_FILE), "w", encoding="utf-8") as f:
+                json.dump({"model": self.model, "dimensions": self.dimensions}, f)
+        # Vectors are synced before their records, see the reconciliation in `__init__`
+        with open(os.path.join(self.directory, self.VECTORS_FILE), "ab") as f:
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(os.path.join(self.directory, self.RECORDS_FILE), "a", encoding="utf-8") as f:
+            for position in keep:
+                f.write(json.dumps(records[position], ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records.extend(records[position] for position in keep)
+        self._vectors = None
+        return len(keep)
+
+    def search(self, queries, k=5, where=None):
+        """
+        Find the nearest indexed articles of each query vector.
+
+        The matrix is scanned in blocks, so memory use does not grow with the index.
+
+        Args:
+            queries (numpy.ndarray): Normalized query vectors, one per row.
+            k (int): Number of neighbors per query.
+            where (callable): Optional filter on records; others are never returned.
+
+        Returns:
+            list: For each query, (record, score) pairs by decreasing cosine similarity.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        if not len(self.records) or not len(queries):
+            return [[] for _ in range(len(queries))]
+        allowed = None
+        if where is not None:
+            allowed = np.array([bool(where(record)) for record in self.records])
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        vectors = self.vectors
+        for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+            scores = queries @ np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS]).T
+            if allowed is not None:
+                scores[:, ~allowed[start:start + SEARCH_BLOCK_ROWS]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+            if best_scores.shape[1] > k:
+                top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+                best_rows = np.take_along_axis(best_rows, top, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        results = []
+        for query in range(len(queries)):
+            results.append([
+                (self.records[best_rows[query, column]], float(best_scores[query, column]))
+                for column in order[query]
+                if np.isfinite(best_scores[query, column])
+            ])
+        return results
+
+class NeighborTopicClassifier:
+    """
+    Assigns topics by a similarity-weighted vote of the nearest labeled articles
+    of the embedding index, without any chat request.
+
+    Has the same `predict` interface as `LocalTopicClassifier`. When the articles
+    cannot be embedded, the prediction is left to `fallback`, or to the model
+    through `classify_articles` when there is none.
+    """
+
+    def __init__(self, index, embedder, topics, k=5, fallback=None):
+        """
+        Args:
+            index (EmbeddingIndex): Index of previously classified articles.
+            embedder (Embedder): Embedder of the new articles.
+            topics (list): Topics the classifier can predict.
+            k (int): Number of neighbors voting.
+            fallback (LocalTopicClassifier): Optional classifier used when embedding fails.
+        """
+        self.index = index
+        self.embedder = embedder
+        self.topics = list(topics)
+        self.k = k
+        self.fallback = fallback
+        self.example_count = sum(record.get("topic") in self.topics for record in index.records)
+
+    def predict(self, texts):
+        """
+        Predict the topic of each text.
+
+        Args:
+            texts (list): Texts to classify, see `article_text`.
+
+        Returns:
+            list: (topic, score) pairs, where score is the summed similarity of the
+                winning topic's neighbors divided by `k`. Without a fallback, the
+                topic is None for every text when embedding fails.
+        """
+        if not texts:
+            return []
+        try:
+            vectors = self.embedder.embed(texts)
+        except Exception as e:
+            if self.fallback is not None:
+                logger.warning(f"Could not embed the articles to classify, using the fallback classifier: {e}")
+                return self.fallback.predict(texts)
+            logger.warning(f"Could not embed the articles to classify, leaving them to the model: {e}")
+            return [(None, 0.0)] * len(texts)
+        topics = set(self.topics)
+        neighbors = self.index.search(vectors, self.k, where=lambda record: record.get("topic") in topics)
+        predictions = []
+        for matches in neighbors:
+            votes = defaultdict(float)
+            for record, score in matches:
+                votes[record["topic"]] += max(score, 0.0)
+            if not votes:
+                predictions.append(("Others" if "Others" in topics else self.topics[0], 0.0))
+                continue
+            topic = max(votes, key=votes.get)
+            predictions.append((topic, votes[topic] / self.k))
+        return predictions
+
+def find_related(index, vectors, k=3, min_score=0.5, exclude_ids=()):
+    """
+    Find past articles related to each new one.
+
+    Args:
+        index (EmbeddingIndex): Index of previous articles.
+        vectors (numpy.ndarray): Normalized vectors of the new articles.
+        k (int): Maximum number of related articles each.
+        min_score (float): Minimum cosine similarity.
+        exclude_ids (iterable): Ids never returned, e.g. the new articles themselves.
+
+    Returns:
+        list: For each article, a list of {'title', 'url'} dictionaries.
+    """
+    exclude_ids = set(exclude_ids)
+    neighbors = index.search(vectors, k, where=lambda record: record["id"] not in exclude_ids)
+    return [
+        [{"title": record["title"], "url": record["url"]} for record, score in matches if score >= min_score]
+        for matches in neighbors
+    ]
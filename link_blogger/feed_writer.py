@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+import html
+import json
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+from link_blogger.markdown_writer import post_date, write_file_atomically
+from link_blogger.records import group_by_topic
+
+OUTPUT_FORMATS = ("markdown", "json", "rss", "atom", "html")
+FEED_EXTENSIONS = {"json": "json", "rss": "rss.xml", "atom": "atom.xml", "html": "html"}
+
+def _link(article):
+    return article.url if article.url != "#" else None
+
+def render_json_feed(article_details, introduction, title, published):
+    """
+    Render the articles as a JSON Feed 1.1 document.
+    """
+    items = []
+    for index, article in enumerate(article_details):
+        item = {
+            "id": _link(article) or f"{published.date().isoformat()}-{index}",
+            "title": article.title,
+            "content_text": article.summary,
+            "tags": [article.topic],
+            "date_published": published.isoformat(),
+        }
+        if _link(article):
+            item["url"] = article.url
+        items.append(item)
+    return json.dumps(
+        {"version": "https://jsonfeed.org/version/1.1", "title": title, "description": introduction, "items": items},
+        ensure_ascii=False,
+        indent=2,
+    ) + "\n"
+
+def render_rss(article_details, introduction, title, published):
+    """
+    Render the articles as an RSS 2.0 document.
+    """
+    date = format_datetime(published)
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<rss version="2.0">',
+        "<channel>",
+        f"<title>{escape(title)}</title>",
+        f"<description>{escape(introduction)}</description>",
+        f"<pubDate>{date}</pubDate>",
+    ]
+    for article in article_details:
+        lines.append("<item>")
+        lines.append(f"<title>{escape(article.title)}</title>")
+        if _link(article):
+            lines.append(f"<link>{escape(article.url)}</link>")
+            lines.append(f'<guid isPermaLink="true">{escape(article.url)}</guid>')
+        lines.append(f"<description>{escape(article.summary)}</description>")
+        lines.append(f"<category>{escape(article.topic)}</category>")
+        lines.append(f"<pubDate>{date}</pubDate>")
+        lines.append("</item>")
+    lines.extend(["</channel>", "</rss>"])
+    return "\n".join(lines) + "\n"
+
+def render_atom(article_details, introduction, title, published):
+    """
+    Render the articles as an Atom document.
+    """
+    updated = published.isoformat()
+    feed_id = f"tag:link-blogger,{published.date().isoformat()}:wrapped-up-readings"
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"<id>{feed_id}</id>",
+        f"<title>{escape(title)}</title>",
+        f"<subtitle>{escape(introduction)}</subtitle>",
+        f"<updated>{updated}</updated>",
+    ]
+    for index, article in enumerate(article_details):
+        lines.append("<entry>")
+        lines.append(f"<id>{escape(_link(article) or f'{feed_id}:{index}')}</id>")
+        lines.append(f"<title>{escape(article.title)}</title>")
+        if _link(article):
+            lines.append(f"<link href={quoteattr(article.url)}/>")
+        lines.append(f"<summary>{escape(article.summary)}</summary>")
+        lines.append(f"<category term={quoteattr(article.topic)}/>")
+        lines.append(f"<updated>{updated}</updated>")
+        lines.append("</entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+def render_html(article_details, introduction, title, published):
+    """
+    Render the articles as a standalone HTML page, grouped by topic.
+    """
+    lines = [
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        "<head>",
+        '<meta charset="utf-8">',
+        f"<title>{html.escape(title)}</title>",
+        "</head>",
+        "<body>",
+        f"<h1>{html.escape(title)}</h1>",
+        f'<p><time datetime="{published.date().isoformat()}">{published.date().isoformat()}</time></p>',
+        f"<p>{html.escape(introduction)}</p>",
+    ]
+    for topic, articles in group_by_topic(article_details).items():
+        lines.append(f"<h2>{html.escape(topic)}</h2>")
+        lines.append("<ul>")
+        for article in articles:
+            link = html.escape(article.url)
+            lines.append(f'<li><a href="{link}">{html.escape(article.title)}</a>: {html.escape(article.summary)}</li>')
+        lines.append("</ul>")
+    lines.extend(["</body>", "</html>"])
+    return "\n".join(lines) + "\n"
+
+RENDERERS = {"json": render_json_feed, "rss": render_rss, "atom": render_atom, "html": render_html}
+
+def save_feeds(article_details, introduction, output_dir, formats):
+    """
+    Render the same articles in several output formats and save them next to the Markdown post.
+
+    Files are named `wrapped_up_readings_<date>.<extension>` and written atomically.
+
+    Args:
+        article_details (list): ArticleRecords, in post order.
+        introduction (str): Introduction text.
+        output_dir (str): Directory to save the files.
+        formats (iterable): Any of "json", "rss", "atom" and "html"; "markdown" is ignored.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    today = post_date()
+    title = f"Wrapped-up Readings {today}"
+    published = datetime.now(timezone.utc).replace(microsecond=0)
+    # Same order as the Markdown post: grouped by topic, in first-seen topic order
+    article_details = [article for articles in group_by_topic(article_details).values() for article in articles]
+    paths = []
+    for output_format in formats:
+        if output_format == "markdown":
+            continue
+        filepath = os.path.join(output_dir, f"wrapped_up_readings_{today}.{FEED_EXTENSIONS[output_format]}")
+        write_file_atomically(filepath, RENDERERS[output_format](article_details, introduction, title, published))
+        paths.append(filepath)
+    return paths
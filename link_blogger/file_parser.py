@@ -1,9 +1,56 @@
+import hashlib
+import io
+import json
 import os
 import re
-import yaml
 from datetime import datetime, timedelta
 
-def get_recent_files(directory, days=7, exclude_patterns=None):
+def compile_exclude_patterns(exclude_patterns):
+    """
+    Combine exclude patterns into a single compiled regex.
+
+    Args:
+        exclude_patterns (list): List of regex patterns to exclude files.
+
+    Returns:
+        re.Pattern: A regex matching any of the patterns, or None if there are none.
+    """
+    if not exclude_patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in exclude_patterns))
+
+def scan_directory(directory, exclude_patterns=None, recursive=False):
+    """
+    Walk a directory with `os.scandir`, yielding the files that are not excluded.
+
+    Hidden directories (such as `.obsidian` or `.trash`) and symlinked
+    directories are skipped when scanning recursively.
+
+    Args:
+        directory (str): Path to the directory to scan.
+        exclude_patterns (list): List of regex patterns matched against file names.
+        recursive (bool): Also scan nested folders.
+
+    Yields:
+        os.DirEntry: Entries of the matching files.
+    """
+    exclude = compile_exclude_patterns(exclude_patterns)
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                # Symlinked folders are not followed, so a link cycle cannot loop forever
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not entry.name.startswith("."):
+                        pending.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+                if exclude is not None and exclude.search(entry.name):
+                    continue
+                yield entry
+
+def get_recent_files(directory, days=7, exclude_patterns=None, recursive=False):
     """
     Get files modified within the last `days` days.
 
@@ -11,57 +58,258 @@ def get_recent_files(directory, days=7, exclude_patterns=None):
         directory (str): Path to the directory to scan.
         days (int): Number of days to look back.
         exclude_patterns (list): List of regex patterns to exclude files.
+        recursive (bool): Also scan nested folders.
 
     Returns:
         list: List of file paths.
     """
-    recent_files = []
-    now = datetime.now()
-    cutoff_date = now - timedelta(days=days)
-    exclude_patterns = exclude_patterns or []
+    cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+    return [
+        entry.path
+        for entry in scan_directory(directory, exclude_patterns, recursive)
+        if entry.stat().st_mtime >= cutoff
+    ]
+
+def hash_file(filepath, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 digest of a file without loading it whole.
 
-    for filename in os.listdir(directory):
-        filepath = os.path.join(directory, filename)
-        if os.path.isfile(filepath):  # Ensure it's a file
-            if any(re.search(pattern, filename) for pattern in exclude_patterns):
+    Args:
+        filepath (str): Path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FileIndex:
+    """
+    Persisted index of (path, mtime, size, content hash) used to detect changed files.
+
+    Files whose mtime and size did not change are not read again; the others are
+    hashed, and only a different hash counts as a change.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the JSON file storing the index.
+        """
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                self.entries = {}
+        self.saved_entries = dict(self.entries)
+
+    def update(self, filepaths, hashes=None):
+        """
+        Stat the given files against the index and record their current state.
+
+        Args:
+            filepaths (list): Paths to check.
+            hashes (dict): Content hashes already computed by path, used instead of reading those files.
+
+        Returns:
+            tuple: (new, changed, unchanged) lists of file paths.
+        """
+        new, changed, unchanged = [], [], []
+        for filepath in filepaths:
+            key = os.path.abspath(filepath)
+            stat = os.stat(filepath)
+            entry = self.entries.get(key)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                unchanged.append(filepath)
                 continue
-            modification_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-            if modification_time >= cutoff_date:
-                recent_files.append(filepath)
-    
-    return recent_files
+            content_hash = hashes.get(filepath) if hashes else None
+            content_hash = content_hash or hash_file(filepath)
+            if entry is None:
+                new.append(filepath)
+            elif entry["hash"] != content_hash:
+                changed.append(filepath)
+            else:
+                unchanged.append(filepath)
+            self.entries[key] = {"mtime": stat.st_mtime, "size": stat.st_size, "hash": content_hash}
+        return new, changed, unchanged
 
-def parse_metadata(file_content):
+    def stale(self, filepaths):
+        """
+        Return the files whose mtime or size differ from the index, without reading any of them.
+
+        Args:
+            filepaths (list): Paths to check.
+
+        Returns:
+            list: Paths of the new or possibly changed files, in input order.
+        """
+        stale = []
+        for filepath in filepaths:
+            stat = os.stat(filepath)
+            entry = self.entries.get(os.path.abspath(filepath))
+            if not entry or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+                stale.append(filepath)
+        return stale
+
+    def content_hash(self, filepath):
+        """
+        Return the indexed content hash of a file, or None if it is not indexed.
+        """
+        entry = self.entries.get(os.path.abspath(filepath))
+        return entry["hash"] if entry else None
+
+    def save(self, filepaths=None):
+        """
+        Write the index to disk atomically.
+
+        Args:
+            filepaths (list): When given, only the current state of these files is
+                written; the other files keep the state they had when last saved, so
+                they are reported again by the next `update`.
+        """
+        if filepaths is None:
+            entries = dict(self.entries)
+        else:
+            entries = dict(self.saved_entries)
+            for filepath in filepaths:
+                key = os.path.abspath(filepath)
+                if key in self.entries:
+                    entries[key] = self.entries[key]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(temporary_path, self.path)
+        self.saved_entries = entries
+
+URL_PATTERN = re.compile(r"- URL:\s*(https?://\S+)", re.IGNORECASE)
+
+def _parse_frontmatter(block):
     """
-    Extract metadata from file content.
+    Parse a frontmatter block as YAML, falling back to naive `key: value` lines
+    when the block is not valid YAML (e.g. unquoted titles containing colons).
+    """
+    import yaml
+
+    try:
+        data = yaml.safe_load(block)
+    except yaml.YAMLError:
+        data = None
+    if isinstance(data, dict):
+        return {str(key).strip().lower(): value for key, value in data.items()}
+
+    metadata = {}
+    for line in block.splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            metadata[key.strip().lower()] = value.strip().strip('"')
+    return metadata
+
+def read_metadata(file, max_lines=None):
+    """
+    Extract metadata by streaming a file, reading only as far as needed.
+
+    The YAML frontmatter is parsed if the file starts with one, and the body is
+    scanned line by line until the first `- URL:` line (Readwise format).
 
     Args:
-        file_content (str): Content of the file.
+        file: An open text file handle, or a path to open.
+        max_lines (int): Stop looking for the URL after this many lines. None scans the whole file.
 
     Returns:
         dict: Metadata dictionary with keys like 'title', 'url', etc.
     """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "r", encoding="utf-8") as f:
+            return read_metadata(f, max_lines)
+
     metadata = {}
-    metadata_pattern = re.compile(r"---(.*?)---", re.DOTALL)
-    match = metadata_pattern.search(file_content)
-    if match:
-        metadata_block = match.group(1)
-        for line in metadata_block.splitlines():
-            if ":" in line:
-                key, value = line.split(":", 1)
-                metadata[key.strip().lower()] = value.strip().strip('"')
-    
-    url_pattern = re.compile(r"- URL:\s*(https?://\S+)", re.IGNORECASE)
-    url_match = url_pattern.search(file_content)
-    if url_match:
-        metadata["url"] = url_match.group(1)
-    
+    frontmatter = None
+    in_frontmatter = False
+    for line_number, line in enumerate(file):
+        stripped = line.strip()
+        if frontmatter is None and not in_frontmatter:
+            if stripped == "---":
+                in_frontmatter = True
+                frontmatter = []
+                continue
+            if stripped:
+                frontmatter = []
+        elif in_frontmatter:
+            if stripped == "---":
+                in_frontmatter = False
+                metadata.update(_parse_frontmatter("\n".join(frontmatter)))
+            else:
+                frontmatter.append(line.rstrip("\n"))
+            continue
+
+        url_match = URL_PATTERN.search(line)
+        if url_match:
+            metadata["url"] = url_match.group(1)
+            break
+        if max_lines is not None and line_number + 1 >= max_lines:
+            break
+
     # Default values for missing metadata
-    metadata["title"] = metadata.get("title", "Untitled Article")
-    metadata["url"] = metadata.get("url", "#")
-    
+    metadata["title"] = str(metadata.get("title") or "Untitled Article")
+    metadata["url"] = str(metadata.get("url") or "#")
+
     return metadata
 
+def parse_metadata(file_content):
+    """
+    Extract metadata from file content.
+
+    Args:
+        file_content (str): Content of the file.
+
+    Returns:
+        dict: Metadata dictionary with keys like 'title', 'url', etc.
+    """
+    return read_metadata(io.StringIO(file_content))
+
+def iter_content(file, skip_frontmatter=False):
+    """
+    Lazily iterate over the lines of a reading file.
+
+    Args:
+        file: An open text file handle, or a path to open.
+        skip_frontmatter (bool): Do not yield the leading YAML frontmatter block.
+
+    Yields:
+        str: Lines of the file, including their line endings.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "r", encoding="utf-8") as f:
+            yield from iter_content(f, skip_frontmatter)
+        return
+
+    if not skip_frontmatter:
+        yield from file
+        return
+    lines = iter(file)
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped == "---":
+            for line in lines:
+                if line.strip() == "---":
+                    break
+        else:
+            yield line
+        break
+    yield from lines
+
 def load_yaml_config(file_path, default_config):
     """
     Load configuration from a YAML file. Fallback to default_config if the file is missing or invalid.
@@ -74,6 +322,8 @@ def load_yaml_config(file_path, default_config):
         dict: Loaded configuration or the fallback.
     """
     if os.path.exists(file_path):
+        import yaml
+
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 return yaml.safe_load(f)
@@ -0,0 +1,256 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import sys
+import threading
+import time
+
+from link_blogger.tokens import estimate_cost
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class RunReport:
+    """
+    Thread-safe collector of stage timings, request latencies, token counts and cache hits.
+
+    Stage times are cumulative: a stage running in several threads at once adds up
+    the time spent in each of them. `wall_seconds` is the elapsed time of the run.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages = defaultdict(lambda: {"seconds": 0.0, "calls": 0})
+        self._latencies = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._tokens = defaultdict(lambda: {"prompt_tokens": 0, "completion_tokens": 0})
+        self._cache = {"hits": 0, "misses": 0}
+        self._counters = defaultdict(int)
+        self._models = defaultdict(
+            lambda: defaultdict(lambda: {"count": 0, "errors": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+        )
+
+    def add_stage_time(self, stage, seconds):
+        with self._lock:
+            self._stages[stage]["seconds"] += seconds
+            self._stages[stage]["calls"] += 1
+
+    @contextmanager
+    def stage(self, stage):
+        """
+        Time a block of code as part of `stage`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.perf_counter() - start)
+
+    def record_request(self, stage, latency, completion=None, error=None, model=None):
+        """
+        Record one model request.
+
+        Args:
+            stage (str): Pipeline stage that sent the request.
+            latency (float): Request latency, in seconds.
+            completion: The response, whose `usage` holds the token counts.
+            error (Exception): The error, if the request failed.
+            model (str): Model the request was sent to.
+        """
+        usage = getattr(completion, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0)
+        completion_tokens = getattr(usage, "completion_tokens", 0)
+        prompt_tokens = prompt_tokens if isinstance(prompt_tokens, int) else 0
+        completion_tokens = completion_tokens if isinstance(completion_tokens, int) else 0
+        with self._lock:
+            self._latencies[stage].append(latency)
+            if error is not None:
+                self._errors[stage] += 1
+            self._tokens[stage]["prompt_tokens"] += prompt_tokens
+            self._tokens[stage]["completion_tokens"] += completion_tokens
+            if model is not None:
+                stats = self._models[stage][model]
+                stats["count"] += 1
+                stats["errors"] += error is not None
+                stats["seconds"] += latency
+                stats["prompt_tokens"] += prompt_tokens
+                stats["completion_tokens"] += completion_tokens
+
+    def record_cache(self, hits, misses):
+        with self._lock:
+            self._cache["hits"] += hits
+            self._cache["misses"] += misses
+
+    def increment(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def to_dict(self):
+        """
+        Summarize everything recorded so far.
+
+        Returns:
+            dict: JSON-serializable report.
+        """
+        with self._lock:
+            requests = {}
+            for stage, latencies in self._latencies.items():
+                ordered = sorted(latencies)
+                histogram = {f"<={bucket}s": 0 for bucket in LATENCY_BUCKETS}
+                histogram[f">{LATENCY_BUCKETS[-1]}s"] = 0
+                for latency in ordered:
+                    bucket = next((bucket for bucket in LATENCY_BUCKETS if latency <= bucket), None)
+                    histogram[f"<={bucket}s" if bucket is not None else f">{LATENCY_BUCKETS[-1]}s"] += 1
+                requests[stage] = {
+                    "count": len(ordered),
+                    "errors": self._errors[stage],
+                    "mean_seconds": sum(ordered) / len(ordered),
+                    "p50_seconds": _percentile(ordered, 0.5),
+                    "p90_seconds": _percentile(ordered, 0.9),
+                    "p99_seconds": _percentile(ordered, 0.99),
+                    "max_seconds": ordered[-1],
+                    "histogram": histogram,
+                    **self._tokens[stage],
+                }
+                models = {}
+                for model, stats in self._models[stage].items():
+                    models[model] = {
+                        "count": stats["count"],
+                        "errors": stats["errors"],
+                        "mean_seconds": stats["seconds"] / stats["count"],
+                        "prompt_tokens": stats["prompt_tokens"],
+                        "completion_tokens": stats["completion_tokens"],
+                        "cost_usd": estimate_cost(model, stats["prompt_tokens"], stats["completion_tokens"]),
+                    }
+                if models:
+                    requests[stage]["models"] = models
+                    requests[stage]["cost_usd"] = sum(model["cost_usd"] or 0.0 for model in models.values())
+            lookups = self._cache["hits"] + self._cache["misses"]
+            return {
+                "started_at": self.started_at,
+                "wall_seconds": time.perf_counter() - self._start,
+                "stages": {stage: dict(values) for stage, values in self._stages.items()},
+                "requests": requests,
+                "tokens": {
+                    "prompt_tokens": sum(tokens["prompt_tokens"] for tokens in self._tokens.values()),
+                    "completion_tokens": sum(tokens["completion_tokens"] for tokens in self._tokens.values()),
+                },
+                "cost_usd": sum(stage.get("cost_usd", 0.0) for stage in requests.values()),
+                "cache": {**self._cache, "hit_rate": self._cache["hits"] / lookups if lookups else None},
+                "counters": dict(self._counters),
+            }
+
+    def write(self, path):
+        """
+        Write the report as JSON.
+
+        Args:
+            path (str): Destination file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+_current = None
+
+def start_run():
+    """
+    Start collecting a new run report; instrumented code records into it.
+
+    Returns:
+        RunReport: The new report.
+    """
+    global _current
+    _current = RunReport()
+    return _current
+
+def current_report():
+    """
+    Return the report of the current run, or None if no run was started.
+    """
+    return _current
+
+@contextmanager
+def timed(stage):
+    """
+    Time a block of code into the current run report, if there is one.
+    """
+    report = _current
+    if report is None:
+        yield
+        return
+    with report.stage(stage):
+        yield
+
+def record_request(stage, latency, completion=None, error=None, model=None):
+    """
+    Record a model request into the current run report, if there is one.
+    """
+    if _current is not None:
+        _current.record_request(stage, latency, completion, error, model)
+
+def increment(counter, amount=1):
+    """
+    Increment a counter of the current run report, if there is one.
+    """
+    if _current is not None:
+        _current.increment(counter, amount)
+
+def record_cache(hits, misses):
+    """
+    Record cache lookups into the current run report, if there is one.
+    """
+    if _current is not None:
+        _current.record_cache(hits, misses)
+
+def run_profiled(path, function, *args, **kwargs):
+    """
+    Call `function` under cProfile and save the stats to `path`.
+
+    Threads started during the call (e.g. the request pools) get their own
+    profiler, merged with the main thread's when the call returns.
+
+    Returns:
+        The result of `function`.
+    """
+    import cProfile
+    import pstats
+
+    profilers = []
+    lock = threading.Lock()
+
+    def profile_thread(frame, event, arg):
+        # First event of a new thread: replace this hook with a profiler of its own
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # Python 3.12+, where the main profiler already sees every thread
+        with lock:
+            profilers.append(profiler)
+
+    main_profiler = cProfile.Profile()
+    threading.setprofile(profile_thread)
+    try:
+        return main_profiler.runcall(function, *args, **kwargs)
+    finally:
+        threading.setprofile(None)
+        stats = pstats.Stats(main_profiler)
+        with lock:
+            for profiler in profilers:
+                stats.add(profiler)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stats.dump_stats(path)
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import threading
+
+from link_blogger.records import ArticleRecord
+
+logger = logging.getLogger(__name__)
+
+def journal_key(filepath, content_hash):
+    """
+    Identify a processed file by its path and content, so edited files are processed again.
+
+    Args:
+        filepath (str): Path to the reading file.
+        content_hash (str): Hash of its content.
+
+    Returns:
+        str: The journal key.
+    """
+    return f"{os.path.abspath(filepath)}:{content_hash}"
+
+class Journal:
+    """
+    Append-only JSONL journal of the articles finished during a run.
+
+    Each finished article is written as one line holding the row form of its
+    record, and flushed immediately; the file is fsync'd every `fsync_every`
+    entries and when the journal is closed, so at most one batch is lost if the
+    machine crashes. A truncated last line is ignored when the journal is loaded.
+    """
+
+    def __init__(self, path, fsync_every=10):
+        """
+        Args:
+            path (str): Path to the journal file.
+            fsync_every (int): Number of entries between two fsync calls.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+
+    def load(self):
+        """
+        Read the entries of a previous run.
+
+        Returns:
+            dict: ArticleRecords by journal key.
+        """
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    entry = json.loads(line)
+                    entries[entry["key"]] = ArticleRecord.from_row(entry["record"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Ignoring incomplete journal entry at {self.path}:{line_number}.")
+        return entries
+
+    def open(self, resume=False):
+        """
+        Open the journal for appending.
+
+        Args:
+            resume (bool): Keep the entries of a previous run instead of starting over.
+        """
+        if resume and os.path.exists(self.path):
+            self._drop_partial_line()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def _drop_partial_line(self):
+        # A crash mid-write leaves a line without its newline; appending to it would corrupt the next entry
+        with open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            position = size
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < size:
+                f.truncate(position)
+
+    def append(self, key, article):
+        """
+        Record a finished article.
+
+        Args:
+            key (str): Key built with `journal_key`.
+            article (ArticleRecord): The finished article.
+        """
+        line = json.dumps({"key": key, "record": article.to_row()}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def close(self):
+        """
+        Sync and close the journal file.
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._unsynced = 0
+
+    def discard(self):
+        """
+        Close and delete the journal once the run has completed.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
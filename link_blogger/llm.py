@@ -0,0 +1,252 @@
+import logging
+import random
+import threading
+import time
+
+from link_blogger import instrumentation
+from link_blogger.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+DEFAULT_COMPLETION_TOKENS = 500
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute.
+
+    Both buckets start full and refill continuously; `acquire` blocks until the
+    request fits in both. A limit of None disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            requests_per_minute (int): Maximum number of requests per minute.
+            tokens_per_minute (int): Maximum number of tokens per minute.
+            clock (callable): Monotonic clock, in seconds.
+            sleep (callable): Function used to wait, in seconds.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._request_allowance = float(requests_per_minute or 0)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._updated_at = clock()
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                self.requests_per_minute, self._request_allowance + elapsed * self.requests_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                self.tokens_per_minute, self._token_allowance + elapsed * self.tokens_per_minute / 60
+            )
+
+    def acquire(self, tokens=0):
+        """
+        Wait until one request of `tokens` tokens is allowed, then consume it.
+
+        Requests larger than the whole token bucket are let through once the bucket is full.
+
+        Args:
+            tokens (int): Estimated tokens of the request.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                wait = 0.0
+                if self.requests_per_minute and self._request_allowance < 1:
+                    wait = (1 - self._request_allowance) * 60 / self.requests_per_minute
+                if self.tokens_per_minute:
+                    needed = min(tokens, self.tokens_per_minute)
+                    if self._token_allowance < needed:
+                        wait = max(wait, (needed - self._token_allowance) * 60 / self.tokens_per_minute)
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self._request_allowance -= 1
+                    if self.tokens_per_minute:
+                        self._token_allowance -= tokens
+                    return
+            self._sleep(wait)
+
+class RequestSettings:
+    """
+    Rate limits and retry policy shared by every model request of a run.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_retries=5, base_delay=1.0, max_delay=60.0):
+        """
+        Args:
+            requests_per_minute (int): Maximum number of requests per minute.
+            tokens_per_minute (int): Maximum number of tokens per minute.
+            max_retries (int): Number of retries on rate limits, server and connection errors.
+            base_delay (float): Delay before the first retry, in seconds.
+            max_delay (float): Maximum delay between retries, in seconds.
+        """
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+_settings = RequestSettings()
+
+def configure(requests_per_minute=None, tokens_per_minute=None, max_retries=5, base_delay=1.0, max_delay=60.0):
+    """
+    Set the rate limits and retry policy used by `chat_completion`.
+
+    Args:
+        requests_per_minute (int): Maximum number of requests per minute. None for no limit.
+        tokens_per_minute (int): Maximum number of tokens per minute. None for no limit.
+        max_retries (int): Number of retries on rate limits, server and connection errors.
+        base_delay (float): Delay before the first retry, in seconds.
+        max_delay (float): Maximum delay between retries, in seconds.
+    """
+    global _settings
+    _settings = RequestSettings(requests_per_minute, tokens_per_minute, max_retries, base_delay, max_delay)
+
+def create_openai_client(api_key, timeout=120.0):
+    """
+    Create the OpenAI client shared by every request of a run.
+
+    The client owns one HTTP connection pool reused by every request. Its built-in
+    retries are disabled because `chat_completion` retries with its own backoff.
+
+    Args:
+        api_key (str): OpenAI API key.
+        timeout (float): Request timeout, in seconds.
+
+    Returns:
+        OpenAI: The client.
+    """
+    import openai  # Imported on first use, it takes most of the startup time
+
+    return openai.OpenAI(api_key=api_key, max_retries=0, timeout=timeout)
+
+class LazyOpenAIClient:
+    """
+    Stand-in for the OpenAI client that only imports the SDK and creates the
+    client on first use, so runs that send no request (no files found) skip both.
+    """
+
+    def __init__(self, api_key, timeout=120.0):
+        """
+        Args:
+            api_key (str): OpenAI API key.
+            timeout (float): Request timeout, in seconds.
+        """
+        self._api_key = api_key
+        self._timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        with self._lock:
+            if self._client is None:
+                self._client = create_openai_client(self._api_key, self._timeout)
+        return getattr(self._client, name)
+
+def is_retryable(error):
+    """
+    Tell whether a failed request is worth retrying (rate limits, server and connection errors).
+    """
+    import openai
+
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (status_code in RETRYABLE_STATUS_CODES or status_code >= 500)
+
+def _retry_delay(error, attempt, settings):
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), settings.max_delay)
+    except (TypeError, ValueError):
+        pass
+    # Full jitter exponential backoff
+    return random.uniform(0, min(settings.max_delay, settings.base_delay * 2 ** attempt))
+
+def estimate_request_tokens(model, messages, max_completion_tokens=DEFAULT_COMPLETION_TOKENS):
+    """
+    Estimate the tokens a chat request will count against the tokens-per-minute limit.
+    """
+    return sum(count_tokens(str(message.get("content", "")), model) for message in messages) + max_completion_tokens
+
+def _send(stage, model, tokens, send):
+    """
+    Send a request through the shared rate limiter, retrying on rate limits (429),
+    server errors (5xx) and connection errors with jittered exponential backoff.
+    """
+    settings = _settings
+    attempt = 0
+    while True:
+        settings.limiter.acquire(tokens)
+        start = time.perf_counter()
+        try:
+            response = send()
+        except Exception as e:
+            instrumentation.record_request(stage, time.perf_counter() - start, error=e, model=model)
+            if attempt >= settings.max_retries or not is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt, settings)
+            attempt += 1
+            instrumentation.increment(f"{stage}_retries")
+            logger.warning(f"Request failed ({e}), retry {attempt}/{settings.max_retries} in {delay:.1f}s.")
+            time.sleep(delay)
+            continue
+        instrumentation.record_request(stage, time.perf_counter() - start, response, model=model)
+        return response
+
+def chat_completion(openai_client, model, messages, stage="other", **kwargs):
+    """
+    Send a chat completion request through the shared rate limiter, retrying on
+    rate limits (429), server errors (5xx) and connection errors with jittered
+    exponential backoff.
+
+    Args:
+        openai_client: OpenAI client for making API calls.
+        model (str): Model name.
+        messages (list): Chat messages.
+        stage (str): Pipeline stage sending the request, for the run report.
+        **kwargs: Extra arguments for `chat.completions.create`.
+
+    Returns:
+        The chat completion response.
+
+    Raises:
+        Exception: The last error once retries are exhausted, or any non-retryable error.
+    """
+    return _send(
+        stage,
+        model,
+        estimate_request_tokens(model, messages),
+        lambda: openai_client.chat.completions.create(model=model, messages=messages, **kwargs),
+    )
+
+def create_embeddings(openai_client, model, texts, stage="embed"):
+    """
+    Embed texts with a single request, with the same rate limiting and retries as `chat_completion`.
+
+    Args:
+        openai_client: OpenAI client for making API calls.
+        model (str): Embedding model name.
+        texts (list): Texts to embed.
+        stage (str): Pipeline stage sending the request, for the run report.
+
+    Returns:
+        list: One embedding (list of floats) per text.
+
+    Raises:
+        Exception: The last error once retries are exhausted, or any non-retryable error.
+    """
+    tokens = sum(count_tokens(text, model) for text in texts)
+    response = _send(stage, model, tokens, lambda: openai_client.embeddings.create(model=model, input=texts))
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
@@ -1,62 +1,185 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import os
+import shutil
+import tempfile
+import threading
 from datetime import datetime, timedelta
 
-from link_blogger.file_parser import load_yaml_config
+from link_blogger.config import DEFAULT_INTRODUCTION_PROMPT, INTRODUCTION_FIELDS, load_prompt_config
+from link_blogger.routing import routed_completion
+from link_blogger.tokens import count_tokens, truncate_to_tokens
 
-def generate_introduction_with_chatgpt(article_details, openai_client):
+logger = logging.getLogger(__name__)
+
+DIGEST_SYSTEM_MESSAGE = "You condense reading notes into short, faithful digests."
+DIGEST_USER_MESSAGE = (
+    "These are summaries of articles I read this week about {topic}. "
+    "Write a digest of their main themes in at most three sentences:\n\n{summaries}"
+)
+
+def _article_line(article):
+    return f"Title: {article.title}, Topic: {article.topic}, Summary: {article.summary}"
+
+def build_topic_digests(article_details, openai_client, config, max_prompt_tokens, concurrency=4):
+    """
+    Condense the articles of each topic into a short digest, one request per topic.
+
+    Each digest prompt holds as many of the topic's summaries as fit in `max_prompt_tokens`.
+
+    Args:
+        article_details (list): ArticleRecords with a title, topic and summary.
+        openai_client: OpenAI client for making API calls.
+        config (PromptConfig): Introduction prompt; its model is used for the digests.
+        max_prompt_tokens (int): Token budget of each digest prompt.
+        concurrency (int): Maximum number of digest requests in flight.
+
+    Returns:
+        dict: Digest text by topic, in first-seen topic order.
+    """
+    articles_by_topic = defaultdict(list)
+    for article in article_details:
+        articles_by_topic[article.topic].append(article)
+
+    def digest(item):
+        topic, articles = item
+        budget = max_prompt_tokens - count_tokens(DIGEST_SYSTEM_MESSAGE + DIGEST_USER_MESSAGE, config.model)
+        lines = []
+        for article in articles:
+            line = f"- {article.title}: {article.summary}"
+            tokens = count_tokens(line, config.model) + 1
+            if tokens > budget:
+                break
+            lines.append(line)
+            budget -= tokens
+        if len(lines) < len(articles):
+            lines.append(f"- ...and {len(articles) - len(lines)} more article(s).")
+        summaries = "\n".join(lines)
+        try:
+            return routed_completion(
+                openai_client,
+                "intro",
+                config.model,
+                [
+                    {"role": "system", "content": DIGEST_SYSTEM_MESSAGE},
+                    {"role": "user", "content": DIGEST_USER_MESSAGE.format(topic=topic, summaries=summaries)},
+                ],
+            )
+        except Exception as e:
+            logger.error(f"Error building the {topic} digest: {e}")
+            return truncate_to_tokens(summaries, max(1, max_prompt_tokens // max(1, len(articles_by_topic))), config.model)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(articles_by_topic)))) as executor:
+        digests = list(executor.map(digest, articles_by_topic.items()))
+    return dict(zip(articles_by_topic, digests))
+
+def generate_introduction_with_chatgpt(article_details, openai_client, config=None, max_prompt_tokens=None, concurrency=4):
     """
     Generate an engaging introduction for the blog post using OpenAI.
 
+    When the article context does not fit in `max_prompt_tokens`, the articles are
+    first condensed into one digest per topic (concurrently) and the introduction is
+    written from the digests, so the prompt size does not grow with the number of articles.
+
     Args:
-        article_details (list): List of dictionaries with article information (title, topic, summary).
+        article_details (list): ArticleRecords with a title, topic and summary.
         openai_client: OpenAI client for making API calls.
+        config (PromptConfig): Introduction prompt, loaded from
+            `.conf/introduction_prompt.yaml` when not given.
+        max_prompt_tokens (int): Token budget of the introduction prompt. None disables digests.
+        concurrency (int): Maximum number of digest requests in flight.
 
     Returns:
         str: Generated introduction text.
     """
-    # Default configuration
-    default_config = {
-        "model": "gpt-4o",
-        "system_message": "You are a creative assistant that writes introductions for blog posts. \
-                          You are really able to get to the core of the content and provide a concise summary.",
-        "user_message": (
-            "Every week you write an update post of recent readings. Write a concise and engaging introduction for a blog post summarizing recent readings. "
-            "Provide a two sentences long introduction. Try to be really concise, consider the {topics} and the provided highlights of articles:\n\n{details}"
-        ),
-    }
-
-    # Load configuration
-    config_file = os.path.join(".conf", "introduction_prompt.yaml")
-    config = load_yaml_config(config_file, default_config)
+    if config is None:
+        config_file = os.path.join(".conf", "introduction_prompt.yaml")
+        config = load_prompt_config(config_file, DEFAULT_INTRODUCTION_PROMPT, INTRODUCTION_FIELDS)
 
     # Prepare prompt
-    topics = ", ".join({article['topic'] for article in article_details})
-    article_context = "\n".join(
-        f"Title: {article['title']}, Topic: {article['topic']}, Summary: {article['summary']}"
-        for article in article_details
-    )
-    user_message = config["user_message"].format(topics=topics, article_context=article_context)
+    topics = ", ".join({article.topic for article in article_details})
+    article_context = "\n".join(_article_line(article) for article in article_details)
+    user_message = config.render(topics=topics, article_context=article_context)
+
+    if max_prompt_tokens and count_tokens(config.system_message + user_message, config.model) > max_prompt_tokens:
+        logger.info(f"Introduction prompt exceeds {max_prompt_tokens} tokens, writing it from per-topic digests.")
+        digests = build_topic_digests(article_details, openai_client, config, max_prompt_tokens, concurrency)
+        article_context = "\n".join(f"Topic: {topic}, Digest: {digest}" for topic, digest in digests.items())
+        context_budget = max_prompt_tokens - count_tokens(
+            config.system_message + config.render(topics=topics, article_context=""), config.model
+        )
+        article_context = truncate_to_tokens(article_context, max(1, context_budget), config.model)
+        user_message = config.render(topics=topics, article_context=article_context)
 
     try:
-        completion = openai_client.chat.completions.create(
-            model=config["model"],
-            messages=[
-                {"role": "system", "content": config["system_message"]},
+        return routed_completion(
+            openai_client,
+            "intro",
+            config.model,
+            [
+                {"role": "system", "content": config.system_message},
                 {"role": "user", "content": user_message},
             ],
         )
-        return completion.choices[0].message.content.strip()
-    except Exception:
+    except Exception as e:
+        logger.error(f"Error generating introduction: {e}")
         return "This post summarizes my recent readings on various topics, providing insights and key takeaways."
 
-def save_to_markdown(grouped_summaries, introduction, output_dir):
+def post_date():
+    """
+    Return today's date as used in post file names and frontmatter.
+    """
+    return datetime.now().strftime("%Y-%m-%d")
+
+def render_frontmatter(today):
+    """
+    Render the frontmatter block of a post.
+    """
+    return f"""---
+title: Wrapped-up Readings {today}
+date: {today}
+tags:
+  - link-blog
+---
+
+"""
+
+def format_entry(article):
+    """
+    Render an article as a Markdown list item, followed by its related past readings if any.
+    """
+    entry = f"- [{article.title}]({article.url}): {article.summary}"
+    if article.related:
+        links = ", ".join(f"[{title}]({url})" for title, url in article.related)
+        entry += f"\n  - Related past readings: {links}"
+    return entry
+
+def write_file_atomically(filepath, content):
+    """
+    Write a file next to its destination, fsync it and rename it into place,
+    so a crash never leaves a partial file.
+
+    Args:
+        filepath (str): Destination path.
+        content (str): File content.
+    """
+    temporary_path = f"{filepath}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, filepath)
+
+def save_to_markdown(grouped_summaries, introduction, output_dir, filename=None):
     """
     Save summaries and introduction to a Markdown file.
 
     Args:
-        grouped_summaries (dict): Summaries grouped by topic.
+        grouped_summaries (dict): ArticleRecords grouped by topic, or Markdown list items already rendered.
         introduction (str): Introduction text.
         output_dir (str): Directory to save the file.
+        filename (str): File name, `wrapped_up_readings_<date>.md` by default.
 
     Returns:
         None
@@ -64,23 +187,98 @@ def save_to_markdown(grouped_summaries, introduction, output_dir):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    filename = f"wrapped_up_readings_{today}.md"
+    today = post_date()
+    filename = filename or f"wrapped_up_readings_{today}.md"
     filepath = os.path.join(output_dir, filename)
 
-    frontmatter = f"""---
-title: Wrapped-up Readings {today}
-date: {today}
-tags:
-  - link-blog
----
+    parts = [render_frontmatter(today), introduction + "\n\n"]
+    for topic, summaries in grouped_summaries.items():
+        parts.append(f"## {topic}\n\n")
+        parts.extend((summary if isinstance(summary, str) else format_entry(summary)) + "\n" for summary in summaries)
+    write_file_atomically(filepath, "".join(parts))
 
-"""
+class MarkdownStreamWriter:
+    """
+    Writes the post incrementally while articles are being processed.
+
+    Finished articles are appended to one spool file per topic as soon as every
+    earlier article has arrived, so the sections keep the input order whatever
+    order the articles finish in. `finalize` writes the frontmatter and the
+    introduction, appends the sections in first-seen topic order and renames
+    the result into place. The output matches `save_to_markdown`.
+    """
+
+    def __init__(self, output_dir):
+        """
+        Args:
+            output_dir (str): Directory to save the file.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.today = post_date()
+        self.filepath = os.path.join(output_dir, f"wrapped_up_readings_{self.today}.md")
+        self.spool_dir = tempfile.mkdtemp(prefix=".wrapped_up_readings_", dir=output_dir)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next_index = 0
+        self._spools = {}
+
+    def add(self, index, article):
+        """
+        Add a finished article.
+
+        Args:
+            index (int): Position of the article in the post, starting at 0.
+            article (ArticleRecord): The classified article.
+        """
+        with self._lock:
+            self._pending[index] = article
+            while self._next_index in self._pending:
+                self._write(self._pending.pop(self._next_index))
+                self._next_index += 1
+
+    def _write(self, article):
+        spool = self._spools.get(article.topic)
+        if spool is None:
+            spool = open(os.path.join(self.spool_dir, f"{len(self._spools)}.md"), "w+", encoding="utf-8")
+            self._spools[article.topic] = spool
+        spool.write(format_entry(article) + "\n")
+        spool.flush()
+
+    def finalize(self, introduction):
+        """
+        Assemble the post and move it into place.
+
+        Args:
+            introduction (str): Introduction text.
+
+        Returns:
+            str: Path of the written post.
+
+        Raises:
+            RuntimeError: If an article before the last added one is still missing.
+        """
+        with self._lock:
+            if self._pending:
+                raise RuntimeError(f"Article {self._next_index} was never added to the post.")
+            temporary_path = f"{self.filepath}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                f.write(render_frontmatter(self.today))
+                f.write(introduction + "\n\n")
+                for topic, spool in self._spools.items():
+                    f.write(f"## {topic}\n\n")
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self.filepath)
+        self.close()
+        return self.filepath
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(frontmatter)
-        f.write(introduction + "\n\n")
-        for topic, summaries in grouped_summaries.items():
-            f.write(f"## {topic}\n\n")
-            for summary in summaries:
-                f.write(summary + "\n")
\ No newline at end of file
+    def close(self):
+        """
+        Remove the spool files.
+        """
+        for spool in self._spools.values():
+            spool.close()
+        self._spools = {}
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
@@ -0,0 +1,231 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+from link_blogger.file_parser import read_metadata
+from link_blogger.instrumentation import timed
+from link_blogger.summarizer import summarize_with_chatgpt
+from link_blogger.planner import fit_content
+from link_blogger.records import ArticleRecord
+from link_blogger.tokens import TokenUsage
+from link_blogger.classifier import classify_article_with_chatgpt, classify_articles
+
+logger = logging.getLogger(__name__)
+
+def _ordered_map(function, items, concurrency):
+    """
+    Apply `function` to every item, on a bounded thread pool when `concurrency` > 1.
+
+    Results keep the order of `items`.
+    """
+    if concurrency <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(function, items))
+
+def summarize_file(
+    filepath, openai_client, cache=None, max_input_tokens=None, summarization_config=None, content_limit=None, file_record=None
+):
+    """
+    Read and summarize a single reading file.
+
+    Args:
+        filepath (str): Path to the reading file.
+        openai_client: OpenAI client for making API calls.
+        cache (ResponseCache): Optional cache of previous model responses.
+        max_input_tokens (int): Token budget of a single summarization request.
+        summarization_config (PromptConfig): Summarization prompt of the run.
+        content_limit (tuple): (policy, max tokens) set by the budget guard, see `fit_content`.
+        file_record (FileRecord): Pre-processing record of the file, whose metadata and hash are reused.
+
+    Returns:
+        ArticleRecord: The article, with its summary, token usage and timings.
+    """
+    start = time.perf_counter()
+    with timed("parse"):
+        if file_record is not None:
+            metadata = {"title": file_record.title, "url": file_record.url}
+        else:
+            metadata = read_metadata(filepath)
+        # Only the worker holds the content, and only while it is being summarized
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if content_limit is not None:
+            policy, max_tokens = content_limit
+            content = fit_content(content, policy, max_tokens, summarization_config.model if summarization_config else "gpt-4o")
+    article = ArticleRecord(filepath, file_record.hash if file_record else None, metadata["title"], metadata["url"])
+    article.parse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    usage = TokenUsage()
+    with timed("summarize"):
+        summary = summarize_with_chatgpt(
+            content,
+            openai_client,
+            cache=cache,
+            max_input_tokens=max_input_tokens,
+            usage=usage,
+            config=summarization_config,
+        )
+    article.summarize_seconds = time.perf_counter() - start
+    article.summary = summary
+    article.set_usage(usage)
+    logger.info(
+        f"Summarized '{metadata['title']}' with {usage.requests} request(s): "
+        f"{usage.prompt_tokens} prompt and {usage.completion_tokens} completion tokens."
+    )
+    return article
+
+def process_file(
+    filepath,
+    topics,
+    openai_client,
+    cache=None,
+    max_input_tokens=None,
+    summarization_config=None,
+    content_limit=None,
+    file_record=None,
+    classifier="llm",
+    local_classifier=None,
+    classifier_threshold=0.2,
+):
+    """
+    Read, summarize and classify a single reading file.
+
+    Args:
+        filepath (str): Path to the reading file.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+        openai_client: OpenAI client for making API calls.
+        cache (ResponseCache): Optional cache of previous model responses.
+        max_input_tokens (int): Token budget of a single summarization request.
+        summarization_config (PromptConfig): Summarization prompt of the run.
+        content_limit (tuple): (policy, max tokens) set by the budget guard.
+        file_record (FileRecord): Pre-processing record of the file.
+        classifier (str): Classifier engine, one of "llm", "local" or "hybrid".
+        local_classifier (LocalTopicClassifier): Local engine for "local" and "hybrid".
+        classifier_threshold (float): Minimum local score accepted by the "hybrid" engine.
+
+    Returns:
+        ArticleRecord: The article, with its topic.
+    """
+    article = summarize_file(filepath, openai_client, cache, max_input_tokens, summarization_config, content_limit, file_record)
+    start = time.perf_counter()
+    with timed("classify"):
+        if classifier == "llm":
+            article.topic = classify_article_with_chatgpt(article.title, article.summary, topics, openai_client, cache=cache)
+        else:
+            article.topic = classify_articles(
+                [(article.title, article.summary)],
+                topics,
+                openai_client,
+                engine=classifier,
+                local_classifier=local_classifier,
+                threshold=classifier_threshold,
+                cache=cache,
+            )[0]
+    article.classify_seconds = time.perf_counter() - start
+    logger.info(f"Processed '{article.title}' as {article.topic}.")
+    return article
+
+def process_files(
+    filepaths,
+    topics,
+    openai_client,
+    concurrency=1,
+    cache=None,
+    classify_batch_size=0,
+    classifier="llm",
+    local_classifier=None,
+    classifier_threshold=0.2,
+    max_input_tokens=None,
+    summarization_config=None,
+    on_complete=None,
+    content_limits=None,
+    file_records=None,
+):
+    """
+    Process reading files, optionally in parallel on a bounded thread pool.
+
+    Results are always returned in the same order as `filepaths`, so the
+    generated post does not depend on which request finishes first.
+
+    Args:
+        filepaths (list): Paths to the reading files.
+        topics (list): Predefined list of topics. If None, GPT classifies freely.
+        openai_client: OpenAI client for making API calls.
+        concurrency (int): Maximum number of files processed at the same time.
+        cache (ResponseCache): Optional cache of previous model responses.
+        classify_batch_size (int): When greater than 1, classify this many articles per request.
+        classifier (str): Classifier engine, one of "llm", "local" or "hybrid". Unless it is
+            "llm" without batching, files are summarized and then classified in windows of
+            `classify_batch_size` x `concurrency` files.
+        local_classifier (LocalTopicClassifier): Local engine for "local" and "hybrid".
+        classifier_threshold (float): Minimum local score accepted by the "hybrid" engine.
+        max_input_tokens (int): Token budget of a single summarization request; longer
+            files are summarized in chunks.
+        summarization_config (PromptConfig): Summarization prompt of the run.
+        on_complete (callable): Called with (filepath, article) as soon as an article
+            is finished, e.g. to journal it.
+        content_limits (dict): (policy, max tokens) by path for the files the budget guard cut down.
+        file_records (dict): FileRecords by path, for the files pre-processed on worker processes.
+
+    Returns:
+        list: One ArticleRecord per file.
+    """
+    content_limits = content_limits or {}
+    file_records = file_records or {}
+    if classifier == "llm" and classify_batch_size <= 1:
+        def process(filepath):
+            article = process_file(
+                filepath,
+                topics,
+                openai_client,
+                cache,
+                max_input_tokens,
+                summarization_config,
+                content_limits.get(filepath),
+                file_records.get(filepath),
+            )
+            if on_complete is not None:
+                on_complete(filepath, article)
+            return article
+
+        return _ordered_map(process, filepaths, concurrency)
+
+    # Summaries are classified and reported window by window, so an interrupted
+    # run keeps every finished window in the journal
+    window = max(1, classify_batch_size) * max(1, concurrency)
+    articles = []
+    for start in range(0, len(filepaths), window):
+        window_paths = filepaths[start:start + window]
+        window_articles = _ordered_map(
+            lambda filepath: summarize_file(
+                filepath,
+                openai_client,
+                cache,
+                max_input_tokens,
+                summarization_config,
+                content_limits.get(filepath),
+                file_records.get(filepath),
+            ),
+            window_paths,
+            concurrency,
+        )
+        with timed("classify"):
+            labels = classify_articles(
+                [(article.title, article.summary) for article in window_articles],
+                topics,
+                openai_client,
+                engine=classifier,
+                local_classifier=local_classifier,
+                threshold=classifier_threshold,
+                batch_size=classify_batch_size,
+                cache=cache,
+                concurrency=concurrency,
+            )
+        for filepath, article, label in zip(window_paths, window_articles, labels):
+            article.topic = label
+            logger.info(f"Processed '{article.title}' as {label}.")
+            if on_complete is not None:
+                on_complete(filepath, article)
+        articles.extend(window_articles)
+    return articles
@@ -0,0 +1,299 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import logging
+import math
+
+from link_blogger.classifier import CLASSIFIER_MODEL, CLASSIFIER_SYSTEM_MESSAGE, build_classification_prompt
+from link_blogger.file_parser import read_metadata
+from link_blogger.routing import route_for
+from link_blogger.tokens import count_tokens, estimate_cost, split_into_chunks, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+BUDGET_POLICIES = ("truncate", "chunk", "skip")
+
+# Expected answer sizes, in tokens
+SUMMARY_TOKENS = 150
+LABEL_TOKENS = 5
+INTRODUCTION_TOKENS = 120
+
+MIN_CONTENT_TOKENS = 200
+
+@dataclass
+class FileEstimate:
+    """
+    Token estimate of one file and what the budget guard decided for it.
+
+    `action` is "summarize", "truncate" or "chunk" (content cut down to
+    `content_limit` tokens, at any point or at highlight boundaries) or "skip".
+    """
+
+    path: str
+    title: str
+    content_tokens: int
+    template_tokens: int
+    action: str = "summarize"
+    content_limit: int = None
+
+    @property
+    def effective_tokens(self):
+        if self.content_limit is not None:
+            return min(self.content_tokens, self.content_limit)
+        return self.content_tokens
+
+def _estimate_file(arguments):
+    filepath, summarization_config = arguments
+    metadata = read_metadata(filepath)
+    with open(filepath, "r", encoding="utf-8") as f:
+        content = f.read()
+    model = summarization_config.model
+    return FileEstimate(
+        path=filepath,
+        title=metadata["title"],
+        content_tokens=count_tokens(content, model),
+        template_tokens=count_tokens(summarization_config.system_message + summarization_config.render(content=""), model),
+    )
+
+def _summarize_estimate(content_tokens, template_tokens, max_input_tokens):
+    """
+    Estimate (requests, input tokens, output tokens) of summarizing a file,
+    following the map-reduce of `summarize_with_chatgpt` for long files.
+    """
+    if not max_input_tokens or content_tokens + template_tokens <= max_input_tokens:
+        return 1, content_tokens + template_tokens, SUMMARY_TOKENS
+    chunks = math.ceil(content_tokens / max(max_input_tokens - template_tokens, 1))
+    input_tokens = content_tokens + chunks * template_tokens + chunks * SUMMARY_TOKENS + template_tokens
+    return chunks + 1, input_tokens, (chunks + 1) * SUMMARY_TOKENS
+
+class RunPlan:
+    """
+    Pre-flight estimate of the requests, tokens and cost of each stage of a run.
+    """
+
+    def __init__(self, files, config, topics=None, max_input_tokens=None, intro_max_tokens=None, classifier="llm"):
+        """
+        Args:
+            files (list): FileEstimate per selected file.
+            config (AppConfig): Prompts and topics of the run.
+            topics (list): Predefined list of topics.
+            max_input_tokens (int): Token budget of a single summarization request.
+            intro_max_tokens (int): Token budget of the introduction prompt.
+            classifier (str): Classifier engine; "local" sends no classification request.
+        """
+        self.files = {estimate.path: estimate for estimate in files}
+        self.config = config
+        self.topics = topics
+        self.max_input_tokens = max_input_tokens
+        self.intro_max_tokens = intro_max_tokens
+        self.classifier = classifier
+        self.models = {
+            "summarize": route_for("summarize", config.summarization.model).models[0],
+            "classify": route_for("classify", CLASSIFIER_MODEL).models[0],
+            "intro": route_for("intro", config.introduction.model).models[0],
+        }
+        self._classify_template_tokens = count_tokens(
+            CLASSIFIER_SYSTEM_MESSAGE + build_classification_prompt("", "", topics), self.models["classify"]
+        )
+        self._intro_template_tokens = count_tokens(
+            config.introduction.system_message + config.introduction.render(topics="", article_context=""),
+            self.models["intro"],
+        )
+
+    def stages(self):
+        """
+        Estimate each stage.
+
+        Returns:
+            dict: {"requests", "input_tokens", "output_tokens", "cost_usd"} by stage.
+        """
+        stages = {stage: {"requests": 0, "input_tokens": 0, "output_tokens": 0} for stage in self.models}
+        kept = [estimate for estimate in self.files.values() if estimate.action != "skip"]
+        for estimate in kept:
+            requests, input_tokens, output_tokens = _summarize_estimate(
+                estimate.effective_tokens, estimate.template_tokens, self.max_input_tokens
+            )
+            stages["summarize"]["requests"] += requests
+            stages["summarize"]["input_tokens"] += input_tokens
+            stages["summarize"]["output_tokens"] += output_tokens
+            if self.classifier != "local":
+                stages["classify"]["requests"] += 1
+                stages["classify"]["input_tokens"] += self._classify_template_tokens + len(estimate.title) // 4 + SUMMARY_TOKENS
+                stages["classify"]["output_tokens"] += LABEL_TOKENS
+        if kept:
+            context_tokens = sum(len(estimate.title) // 4 + SUMMARY_TOKENS for estimate in kept)
+            stages["intro"]["requests"] = 1
+            stages["intro"]["input_tokens"] = self._intro_template_tokens + context_tokens
+            stages["intro"]["output_tokens"] = INTRODUCTION_TOKENS
+            if self.intro_max_tokens and stages["intro"]["input_tokens"] > self.intro_max_tokens:
+                # Per-topic digests read the whole context, then the introduction fits the budget
+                stages["intro"]["input_tokens"] = context_tokens + self.intro_max_tokens
+        for stage, values in stages.items():
+            values["cost_usd"] = estimate_cost(self.models[stage], values["input_tokens"], values["output_tokens"])
+        return stages
+
+    def total_tokens(self):
+        return sum(values["input_tokens"] + values["output_tokens"] for values in self.stages().values())
+
+    def total_cost(self):
+        return sum(values["cost_usd"] or 0.0 for values in self.stages().values())
+
+    def content_limits(self):
+        """
+        Return the (policy, max tokens) content limit of each truncated or chunked file.
+        """
+        return {
+            path: (estimate.action, estimate.content_limit)
+            for path, estimate in self.files.items()
+            if estimate.action in ("truncate", "chunk")
+        }
+
+    def skipped(self):
+        return [path for path, estimate in self.files.items() if estimate.action == "skip"]
+
+    def to_dict(self):
+        return {
+            "stages": self.stages(),
+            "total_tokens": self.total_tokens(),
+            "total_cost_usd": self.total_cost(),
+            "decisions": {
+                path: {"action": estimate.action, "content_tokens": estimate.content_tokens, "content_limit": estimate.content_limit}
+                for path, estimate in self.files.items()
+                if estimate.action != "summarize"
+            },
+        }
+
+def plan_run(filepaths, config, max_input_tokens=None, intro_max_tokens=None, classifier="llm", workers=1, chunk_size=64, file_records=None):
+    """
+    Tokenize the selected files locally and estimate the run.
+
+    Files with a pre-processing record are estimated from it without being read again.
+
+    Args:
+        filepaths (list): Paths to the reading files.
+        config (AppConfig): Prompts and topics of the run.
+        max_input_tokens (int): Token budget of a single summarization request.
+        intro_max_tokens (int): Token budget of the introduction prompt.
+        classifier (str): Classifier engine of the run.
+        workers (int): Number of processes tokenizing files.
+        chunk_size (int): Number of files per work unit sent to a process.
+        file_records (dict): FileRecords by path, see `preprocess_files`.
+
+    Returns:
+        RunPlan: The estimate.
+    """
+    file_records = file_records or {}
+    summarization = config.summarization
+    template_tokens = count_tokens(summarization.system_message + summarization.render(content=""), summarization.model)
+    known = {
+        filepath: FileEstimate(filepath, file_records[filepath].title, file_records[filepath].tokens, template_tokens)
+        for filepath in filepaths
+        if filepath in file_records
+    }
+    arguments = [(filepath, summarization) for filepath in filepaths if filepath not in known]
+    if workers > 1 and len(arguments) > chunk_size:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            estimated = list(executor.map(_estimate_file, arguments, chunksize=chunk_size))
+    else:
+        estimated = [_estimate_file(argument) for argument in arguments]
+    estimated = {estimate.path: estimate for estimate in estimated}
+    estimates = [known.get(filepath) or estimated[filepath] for filepath in filepaths]
+    return RunPlan(estimates, config, config.topics, max_input_tokens, intro_max_tokens, classifier)
+
+def apply_budget(plan, max_tokens=None, max_cost=None, policy="truncate"):
+    """
+    Make the plan fit the budget.
+
+    - "truncate" / "chunk": the largest files are cut down to a common token
+      limit, the highest one that fits (chunking keeps whole highlights);
+    - "skip": the largest files are left out.
+
+    When cutting files down to `MIN_CONTENT_TOKENS` is not enough, the largest
+    files are skipped as well.
+
+    Args:
+        plan (RunPlan): The estimate, updated in place.
+        max_tokens (int): Maximum total tokens, None for no limit.
+        max_cost (float): Maximum total cost in USD, None for no limit.
+        policy (str): One of BUDGET_POLICIES.
+
+    Returns:
+        bool: Whether anything had to change.
+    """
+    if policy not in BUDGET_POLICIES:
+        raise ValueError(f"Unknown budget policy '{policy}'. Choose one of: {', '.join(BUDGET_POLICIES)}.")
+
+    def over_budget():
+        return (max_tokens and plan.total_tokens() > max_tokens) or (max_cost and plan.total_cost() > max_cost)
+
+    if max_cost and any(values["cost_usd"] is None for values in plan.stages().values()):
+        logger.warning("Some models have no known price; their requests are not counted against --max_cost.")
+    if not over_budget():
+        return False
+
+    estimates = sorted(plan.files.values(), key=lambda estimate: estimate.content_tokens, reverse=True)
+    if policy in ("truncate", "chunk"):
+        def limit(cap):
+            for estimate in estimates:
+                over = estimate.content_tokens > cap
+                estimate.action = policy if over else "summarize"
+                estimate.content_limit = cap if over else None
+
+        low, high = MIN_CONTENT_TOKENS, estimates[0].content_tokens
+        limit(low)
+        if not over_budget():
+            while low < high:
+                middle = (low + high + 1) // 2
+                limit(middle)
+                if over_budget():
+                    high = middle - 1
+                else:
+                    low = middle
+            limit(low)
+
+    for estimate in estimates:
+        if not over_budget():
+            break
+        estimate.action = "skip"
+        estimate.content_limit = None
+    return True
+
+def fit_content(content, policy, max_tokens, model="gpt-4o"):
+    """
+    Cut content down to `max_tokens` tokens.
+
+    Args:
+        content (str): File content.
+        policy (str): "truncate" cuts at the token limit; "chunk" keeps whole highlights.
+        max_tokens (int): Token budget of the content.
+        model (str): Model whose tokenizer should be used.
+
+    Returns:
+        str: The content, unchanged if it already fits.
+    """
+    if policy != "chunk":
+        return truncate_to_tokens(content, max_tokens, model)
+    kept, tokens = [], 0
+    for chunk in split_into_chunks(content.splitlines(keepends=True), max(1, max_tokens // 4), model):
+        chunk_tokens = count_tokens(chunk, model)
+        if kept and tokens + chunk_tokens > max_tokens:
+            break
+        kept.append(chunk)
+        tokens += chunk_tokens
+    return truncate_to_tokens("".join(kept), max_tokens, model)
+
+def log_plan(plan):
+    """
+    Log the estimate of each stage and the budget decisions.
+    """
+    for stage, values in plan.stages().items():
+        cost = f"${values['cost_usd']:.4f}" if values["cost_usd"] is not None else "unknown cost"
+        logger.info(
+            f"Plan: {stage} with {plan.models[stage]}: {values['requests']} request(s), "
+            f"{values['input_tokens']} input and {values['output_tokens']} output tokens, {cost}."
+        )
+    logger.info(f"Plan: {plan.total_tokens()} tokens, ${plan.total_cost():.4f} in total.")
+    for path, estimate in plan.files.items():
+        if estimate.action == "skip":
+            logger.warning(f"Budget: skipping {path} ({estimate.content_tokens} tokens).")
+        elif estimate.action != "summarize":
+            logger.warning(f"Budget: {estimate.action} {path} from {estimate.content_tokens} to {estimate.content_limit} tokens.")
@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import io
+import logging
+from typing import NamedTuple
+
+from link_blogger.dedup import canonicalize_url, simhash
+from link_blogger.file_parser import iter_content, read_metadata
+from link_blogger.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+class FileRecord(NamedTuple):
+    """
+    Compact result of pre-processing a reading file; the content itself stays in the worker.
+    """
+    path: str
+    hash: str
+    title: str
+    url: str
+    tokens: int
+    simhash: int
+
+def preprocess_file(filepath, model="gpt-4o"):
+    """
+    Read a file once to hash it, parse its metadata, count its tokens and fingerprint it.
+
+    Args:
+        filepath (str): Path to the reading file.
+        model (str): Model whose tokenizer counts the tokens, the summarization model of the run.
+
+    Returns:
+        FileRecord: The file record.
+    """
+    with open(filepath, "rb") as f:
+        data = f.read()
+    content = data.decode("utf-8")
+    metadata = read_metadata(io.StringIO(content))
+    body = "".join(iter_content(io.StringIO(content), skip_frontmatter=True))
+    return FileRecord(
+        path=filepath,
+        hash=hashlib.sha256(data).hexdigest(),
+        title=metadata["title"],
+        url=metadata["url"],
+        tokens=count_tokens(content, model),
+        simhash=simhash(body),
+    )
+
+def _preprocess_chunk(arguments):
+    filepaths, model = arguments
+    return [preprocess_file(filepath, model) for filepath in filepaths]
+
+def preprocess_files(filepaths, workers=1, chunk_size=64, model="gpt-4o"):
+    """
+    Pre-process files, fanning the work out to `workers` processes when more than one.
+
+    Files are sent to the workers in chunks of `chunk_size` paths to keep the
+    inter-process traffic low; only the compact records come back. Pass only
+    the files `FileIndex.stale` returns so unchanged files are not read again.
+
+    Args:
+        filepaths (list): Paths to the reading files.
+        workers (int): Number of worker processes.
+        chunk_size (int): Number of files per work unit.
+        model (str): Model whose tokenizer counts the tokens.
+
+    Returns:
+        list: One FileRecord per file, in input order.
+    """
+    if workers <= 1 or len(filepaths) <= chunk_size:
+        return _preprocess_chunk((filepaths, model))
+    chunks = [(filepaths[i:i + chunk_size], model) for i in range(0, len(filepaths), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        records = [record for chunk in executor.map(_preprocess_chunk, chunks) for record in chunk]
+    logger.info(f"Pre-processed {len(records)} file(s) on {workers} processes.")
+    return records
+
+def fingerprints_from_records(records):
+    """
+    Return the dedup fingerprint (canonical URL, SimHash) of each record.
+    """
+    return {record.path: (canonicalize_url(record.url), record.simhash) for record in records}
@@ -0,0 +1,133 @@
+from collections import defaultdict
+
+FIELDS = (
+    "path",
+    "content_hash",
+    "title",
+    "url",
+    "summary",
+    "topic",
+    "requests",
+    "prompt_tokens",
+    "completion_tokens",
+    "parse_seconds",
+    "summarize_seconds",
+    "classify_seconds",
+    "related",
+)
+
+class ArticleRecord:
+    """
+    One article as it goes through the run: scanned, summarized, classified and written.
+
+    Records use `__slots__` and keep token usage, stage timings and related
+    readings as flat fields, so a run over thousands of files holds one small
+    object per article rather than a tree of dictionaries. Rendering is left to
+    the writers, which can sort and format records however they need.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        path=None,
+        content_hash=None,
+        title="Untitled Article",
+        url="#",
+        summary=None,
+        topic=None,
+        requests=0,
+        prompt_tokens=0,
+        completion_tokens=0,
+        parse_seconds=0.0,
+        summarize_seconds=0.0,
+        classify_seconds=0.0,
+        related=(),
+    ):
+        """
+        Args:
+            path (str): Path to the reading file.
+            content_hash (str): Hash of the file content, as kept by the file index.
+            title (str): Article title.
+            url (str): Article URL, "#" when it has none.
+            summary (str): Summary of the highlights.
+            topic (str): Topic the article was classified into.
+            requests (int): Number of summarization requests sent.
+            prompt_tokens (int): Prompt tokens of those requests.
+            completion_tokens (int): Completion tokens of those requests.
+            parse_seconds (float): Time spent reading the file.
+            summarize_seconds (float): Time spent summarizing it.
+            classify_seconds (float): Time spent classifying it.
+            related (tuple): (title, url) pairs of related past readings.
+        """
+        self.path = path
+        self.content_hash = content_hash
+        self.title = title
+        self.url = url
+        self.summary = summary
+        self.topic = topic
+        self.requests = requests
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.parse_seconds = parse_seconds
+        self.summarize_seconds = summarize_seconds
+        self.classify_seconds = classify_seconds
+        self.related = tuple(tuple(item) for item in related)
+
+    @property
+    def usage(self):
+        """
+        Token usage of the article, in the shape of `TokenUsage.to_dict`.
+        """
+        return {"requests": self.requests, "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens}
+
+    def set_usage(self, usage):
+        """
+        Copy the token counts of a `TokenUsage` or of its dictionary form.
+        """
+        if not isinstance(usage, dict):
+            usage = usage.to_dict()
+        self.requests = usage.get("requests", 0)
+        self.prompt_tokens = usage.get("prompt_tokens", 0)
+        self.completion_tokens = usage.get("completion_tokens", 0)
+
+    def to_row(self):
+        """
+        Serialize the record as a JSON-ready list of its fields, in `FIELDS` order.
+        """
+        return [getattr(self, field) if field != "related" else [list(item) for item in self.related] for field in FIELDS]
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Rebuild a record serialized with `to_row`.
+
+        Raises:
+            ValueError: If the row does not hold one value per field.
+        """
+        if len(row) != len(FIELDS):
+            raise ValueError(f"Expected {len(FIELDS)} article fields, got {len(row)}")
+        return cls(*row)
+
+    def __eq__(self, other):
+        if not isinstance(other, ArticleRecord):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    def __repr__(self):
+        return f"ArticleRecord(title={self.title!r}, url={self.url!r}, topic={self.topic!r})"
+
+def group_by_topic(article_details):
+    """
+    Group articles by topic, keeping first-seen topic order.
+
+    Args:
+        article_details (list): ArticleRecords as returned by `process_files`.
+
+    Returns:
+        dict: ArticleRecords grouped by topic.
+    """
+    grouped_summaries = defaultdict(list)
+    for article in article_details:
+        grouped_summaries[article.topic].append(article)
+    return grouped_summaries
@@ -0,0 +1,70 @@
+import logging
+
+from link_blogger import instrumentation
+from link_blogger.config import StageRoute
+from link_blogger.llm import chat_completion
+from link_blogger.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_routes = {}
+
+def configure(routes=None):
+    """
+    Set the model tiers used by `routed_completion`.
+
+    Args:
+        routes (dict): StageRoute by stage name, from `.conf/models.yaml`. Stages
+            without a route use the model of their prompt configuration.
+    """
+    global _routes
+    _routes = dict(routes or {})
+
+def route_for(stage, default_model):
+    """
+    Return the route of a stage, or a single-tier route on `default_model` if it has none.
+    """
+    return _routes.get(stage) or StageRoute(models=(default_model,))
+
+def routed_completion(openai_client, stage, default_model, messages, validate=None, usage=None, **kwargs):
+    """
+    Send a chat request to the cheapest model of the stage, escalating to the
+    next tier only when the answer is invalid.
+
+    An answer is invalid when it is empty, longer than the route's
+    `max_output_tokens`, or rejected by `validate`. The last tier's answer is
+    returned whatever its validity.
+
+    Args:
+        openai_client: OpenAI client for making API calls.
+        stage (str): Pipeline stage sending the request.
+        default_model (str): Model used when the stage has no route.
+        messages (list): Chat messages.
+        validate (callable): Optional check of the answer text.
+        usage (TokenUsage): Optional accumulator of the tokens used by every tier.
+        **kwargs: Extra arguments for `chat.completions.create`.
+
+    Returns:
+        str: The answer text.
+
+    Raises:
+        Exception: Whatever `chat_completion` raised.
+    """
+    route = route_for(stage, default_model)
+    for tier, model in enumerate(route.models):
+        completion = chat_completion(openai_client, model, messages, stage=stage, **kwargs)
+        if usage is not None:
+            usage.add(completion)
+        answer = completion.choices[0].message.content.strip()
+        if tier == len(route.models) - 1:
+            return answer
+        if not answer:
+            reason = "empty answer"
+        elif route.max_output_tokens and count_tokens(answer, model) > route.max_output_tokens:
+            reason = f"answer over {route.max_output_tokens} tokens"
+        elif validate is not None and not validate(answer):
+            reason = "invalid answer"
+        else:
+            return answer
+        instrumentation.increment(f"{stage}_escalations")
+        logger.info(f"Escalating {stage} from {model} to {route.models[tier + 1]}: {reason}.")
@@ -1,42 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import os
-from link_blogger.file_parser import load_yaml_config
+from link_blogger.cache import make_cache_key
+from link_blogger.config import DEFAULT_SUMMARIZATION_PROMPT, SUMMARIZATION_FIELDS, load_prompt_config
+from link_blogger.routing import route_for, routed_completion
+from link_blogger.tokens import count_tokens, split_into_chunks
 
-def summarize_with_chatgpt(content, openai_client):
+logger = logging.getLogger(__name__)
+
+def _summary_cache_key(user_message, config):
+    models = route_for("summarize", config.model).models
+    return make_cache_key("summary", *models, config.system_message, user_message)
+
+def _complete(user_message, config, openai_client, cache=None, usage=None):
+    """
+    Send a single summarization request, going through the cache if one is given.
+
+    Summaries over the route's `max_output_tokens` are escalated to the next model tier.
+
+    Raises:
+        Exception: Whatever the OpenAI client raised.
+    """
+    cache_key = None
+    if cache is not None:
+        cache_key = _summary_cache_key(user_message, config)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    summary = routed_completion(
+        openai_client,
+        "summarize",
+        config.model,
+        [
+            {"role": "system", "content": config.system_message},
+            {"role": "user", "content": user_message},
+        ],
+        usage=usage,
+    )
+
+    if cache_key is not None:
+        cache.set(cache_key, "summary", summary)
+    return summary
+
+MAX_REDUCE_DEPTH = 3
+
+SUMMARY_ERROR_PREFIX = "Error summarizing content"
+
+def is_failed_summary(summary):
+    """
+    Tell whether a summary is the placeholder returned when summarization failed.
+    """
+    return summary is None or summary.startswith(SUMMARY_ERROR_PREFIX)
+
+def _summarize_in_chunks(content, config, openai_client, max_input_tokens, cache=None, usage=None, concurrency=4, depth=0):
+    """
+    Map-reduce summarization: summarize chunks concurrently, then summarize the summaries.
+    """
+    template_tokens = count_tokens(config.render(content=""), config.model)
+    chunk_budget = max(max_input_tokens - template_tokens, 1)
+    chunks = list(split_into_chunks(content.splitlines(keepends=True), chunk_budget, config.model))
+    logger.info(f"Content exceeds {max_input_tokens} tokens, summarizing {len(chunks)} chunk(s).")
+
+    def summarize_chunk(chunk):
+        try:
+            return _complete(config.render(content=chunk), config, openai_client, cache, usage)
+        except Exception as e:
+            logger.warning(f"Error summarizing chunk: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks)))) as executor:
+        partial_summaries = [summary for summary in executor.map(summarize_chunk, chunks) if summary]
+    if not partial_summaries:
+        raise RuntimeError("every chunk failed to summarize")
+
+    combined = "\n\n".join(partial_summaries)
+    too_large = count_tokens(combined, config.model) + template_tokens > max_input_tokens
+    if len(chunks) > 1 and too_large and depth < MAX_REDUCE_DEPTH:
+        # Still too large: reduce the partial summaries hierarchically
+        return _summarize_in_chunks(combined, config, openai_client, max_input_tokens, cache, usage, concurrency, depth + 1)
+    return _complete(config.render(content=combined), config, openai_client, cache, usage)
+
+def summarize_with_chatgpt(content, openai_client, cache=None, max_input_tokens=None, usage=None, concurrency=4, config=None):
     """
     Summarize content using OpenAI.
 
+    Content longer than `max_input_tokens` is split at highlight boundaries; the
+    chunks are summarized concurrently and their summaries are combined into the
+    final one. Shorter content is summarized with a single request.
+
     Args:
         content (str): The content to summarize.
         openai_client: OpenAI client for making API calls.
+        cache (ResponseCache): Optional cache of previous summaries.
+        max_input_tokens (int): Token budget of a single request. None disables chunking.
+        usage (TokenUsage): Optional accumulator of the tokens used.
+        concurrency (int): Maximum number of chunk requests in flight.
+        config (PromptConfig): Summarization prompt, loaded from
+            `.conf/summarization_prompt.yaml` when not given.
 
     Returns:
         str: A summary of the content.
     """
-    # Default configuration
-    default_config = {
-        "model": "gpt-4o",
-        "system_message": "You are a helpful assistant.",
-        "user_message": (
-            "Summarize the following text in one paragraph, using less than 500 chars. "
-            "Provide the summary in English:\n\n{content}"
-        ),
-    }
-
-    # Load configuration
-    config_file = os.path.join(".conf", "summarization_prompt.yaml")
-    config = load_yaml_config(config_file, default_config)
+    if config is None:
+        config_file = os.path.join(".conf", "summarization_prompt.yaml")
+        config = load_prompt_config(config_file, DEFAULT_SUMMARIZATION_PROMPT, SUMMARIZATION_FIELDS)
 
     # Prepare prompt
-    user_message = config["user_message"].format(content=content)
+    user_message = config.render(content=content)
 
     try:
-        completion = openai_client.chat.completions.create(
-            model=config["model"],
-            messages=[
-                {"role": "system", "content": config["system_message"]},
-                {"role": "user", "content": user_message},
-            ],
-        )
-        return completion.choices[0].message.content.strip()
+        if max_input_tokens and count_tokens(user_message, config.model) > max_input_tokens:
+            return _summarize_in_chunks(content, config, openai_client, max_input_tokens, cache, usage, concurrency)
+        return _complete(user_message, config, openai_client, cache, usage)
     except Exception as e:
-        return f"Error summarizing content: {e}"
\ No newline at end of file
+        logger.error(f"{SUMMARY_ERROR_PREFIX}: {e}")
+        return f"{SUMMARY_ERROR_PREFIX}: {e}"
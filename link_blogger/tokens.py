@@ -0,0 +1,183 @@
+from functools import lru_cache
+import math
+import threading
+
+CHARS_PER_TOKEN = 4
+
+# USD per million (prompt, completion) tokens
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "o4-mini": (1.10, 4.40),
+    "gpt-5": (1.25, 10.00),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5-nano": (0.05, 0.40),
+}
+
+@lru_cache(maxsize=None)
+def _get_encoding(model):
+    # Imported on first use, so commands that never count tokens start faster
+    try:
+        import tiktoken
+    except ImportError:  # Optional dependency, fall back to a character heuristic
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
+
+def count_tokens(text, model="gpt-4o"):
+    """
+    Count the tokens of a text locally.
+
+    Uses tiktoken when it is installed, otherwise estimates one token every four characters.
+
+    Args:
+        text (str): Text to count.
+        model (str): Model whose tokenizer should be used.
+
+    Returns:
+        int: Number of tokens.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """
+    Estimate the price of a request from `MODEL_PRICES`.
+
+    Dated snapshots (e.g. `gpt-4o-2024-08-06`) use the price of their model.
+
+    Returns:
+        float: Cost in USD, or None if the model has no known price.
+    """
+    matches = [name for name in MODEL_PRICES if model == name or model.startswith(f"{name}-20")]
+    if not matches:
+        return None
+    prompt_price, completion_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+def truncate_to_tokens(text, max_tokens, model="gpt-4o"):
+    """
+    Cut a text down to at most `max_tokens` tokens.
+
+    Args:
+        text (str): Text to truncate.
+        max_tokens (int): Token budget.
+        model (str): Model whose tokenizer should be used.
+
+    Returns:
+        str: The text, unchanged if it already fits.
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+def _is_block_start(line):
+    stripped = line.lstrip()
+    return line[:1] not in (" ", "\t") and (stripped.startswith(("- ", "* ", "> ", "#")) or not stripped)
+
+def split_into_chunks(lines, max_tokens, model="gpt-4o"):
+    """
+    Group lines into chunks of at most `max_tokens`, splitting at highlight boundaries.
+
+    A new block starts at every top-level list item, quote, heading or blank line,
+    so a highlight and its nested notes stay in the same chunk. Blocks larger than
+    `max_tokens` on their own are split line by line, and single oversized lines
+    by characters.
+
+    Args:
+        lines (iterable): Lines of the content, e.g. from `iter_content`.
+        max_tokens (int): Token budget of each chunk.
+        model (str): Model whose tokenizer should be used.
+
+    Yields:
+        str: Chunks of content.
+    """
+    chunk, chunk_tokens = [], 0
+    block, block_tokens = [], 0
+
+    def pieces(block_lines, tokens):
+        if tokens <= max_tokens:
+            yield "".join(block_lines), tokens
+            return
+        for line in block_lines:
+            line_tokens = count_tokens(line, model)
+            if line_tokens <= max_tokens:
+                yield line, line_tokens
+                continue
+            width = max_tokens * CHARS_PER_TOKEN
+            for start in range(0, len(line), width):
+                piece = line[start:start + width]
+                yield piece, count_tokens(piece, model)
+
+    def flush_block():
+        nonlocal chunk, chunk_tokens
+        for piece, tokens in pieces(block, block_tokens):
+            if chunk and chunk_tokens + tokens > max_tokens:
+                text = "".join(chunk)
+                if text.strip():
+                    yield text
+                chunk, chunk_tokens = [], 0
+            chunk.append(piece)
+            chunk_tokens += tokens
+
+    for line in lines:
+        if block and _is_block_start(line):
+            yield from flush_block()
+            block, block_tokens = [], 0
+        block.append(line)
+        block_tokens += count_tokens(line, model)
+    if block:
+        yield from flush_block()
+    text = "".join(chunk)
+    if text.strip():
+        yield text
+
+class TokenUsage:
+    """
+    Thread-safe accumulator of the token usage reported by chat completions.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, completion):
+        """
+        Add the usage of a chat completion response.
+
+        Args:
+            completion: Response returned by `chat.completions.create`.
+        """
+        usage = getattr(completion, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0)
+        completion_tokens = getattr(usage, "completion_tokens", 0)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens if isinstance(prompt_tokens, int) else 0
+            self.completion_tokens += completion_tokens if isinstance(completion_tokens, int) else 0
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
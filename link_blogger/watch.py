@@ -0,0 +1,248 @@
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+
+from link_blogger import routing
+from link_blogger.dedup import deduplicate_files
+from link_blogger.file_parser import hash_file, scan_directory
+from link_blogger.markdown_writer import save_to_markdown
+from link_blogger.pipeline import process_file
+from link_blogger.records import group_by_topic
+
+logger = logging.getLogger(__name__)
+
+DRAFT_FILENAME = "draft_wrapped_up_readings.md"
+DRAFT_INTRODUCTION = "_Draft: the introduction is written when the post is generated._"
+
+class DirectoryWatcher:
+    """
+    Polls a directory with `os.scandir` and reports the files that appeared,
+    changed or left the `days` window since the previous poll.
+
+    Only the (mtime, size) of each entry is compared, so a poll does not read any file.
+    """
+
+    def __init__(self, directory, days=7, exclude_patterns=None, recursive=False):
+        """
+        Args:
+            directory (str): Path to the directory to watch.
+            days (int): Number of days to look back.
+            exclude_patterns (list): List of regex patterns to exclude files.
+            recursive (bool): Also watch nested folders.
+        """
+        self.directory = directory
+        self.days = days
+        self.exclude_patterns = exclude_patterns
+        self.recursive = recursive
+        self.state = {}
+
+    def poll(self):
+        """
+        Scan the directory once.
+
+        Returns:
+            tuple: (updated, removed) lists of file paths.
+        """
+        cutoff = (datetime.now() - timedelta(days=self.days)).timestamp()
+        state = {}
+        for entry in scan_directory(self.directory, self.exclude_patterns, self.recursive):
+            stat = entry.stat()
+            if stat.st_mtime >= cutoff:
+                state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        updated = [path for path, signature in state.items() if self.state.get(path) != signature]
+        removed = [path for path in self.state if path not in state]
+        self.state = state
+        return updated, removed
+
+class DraftBuilder:
+    """
+    Summarizes and classifies files on background workers and keeps the
+    articles of a rolling draft post.
+
+    A file queued again before its worker finishes is only processed once, with its latest content.
+    With a dedup index, only the most recent copy of each article is written to the draft.
+    """
+
+    def __init__(
+        self,
+        openai_client,
+        output_dir,
+        config_loader,
+        cache=None,
+        workers=2,
+        max_input_tokens=None,
+        classifier="llm",
+        local_classifier=None,
+        classifier_threshold=0.2,
+        dedup_index=None,
+        dedup_distance=3,
+    ):
+        """
+        Args:
+            openai_client: OpenAI client for making API calls.
+            output_dir (str): Directory to save the draft.
+            config_loader (ConfigLoader): Source of the current prompts and topics.
+            cache (ResponseCache): Optional cache of previous model responses.
+            workers (int): Number of worker threads.
+            max_input_tokens (int): Token budget of a single summarization request.
+            classifier (str): Classifier engine, one of "llm", "local" or "hybrid".
+            local_classifier (LocalTopicClassifier): Local engine for "local" and "hybrid".
+            classifier_threshold (float): Minimum local score accepted by the "hybrid" engine.
+            dedup_index (DedupIndex): Fingerprint index; None keeps every copy.
+            dedup_distance (int): Maximum SimHash Hamming distance of near duplicates.
+        """
+        self.openai_client = openai_client
+        self.output_dir = output_dir
+        self.config_loader = config_loader
+        self.cache = cache
+        self.max_input_tokens = max_input_tokens
+        self.classifier = classifier
+        self.local_classifier = local_classifier
+        self.classifier_threshold = classifier_threshold
+        self.dedup_index = dedup_index
+        self.dedup_distance = dedup_distance
+        self.articles = {}
+        self._versions = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, workers))]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, filepath):
+        """
+        Queue a new or changed file.
+        """
+        with self._lock:
+            version = self._versions.get(filepath, 0) + 1
+            self._versions[filepath] = version
+        self._queue.put((filepath, version))
+
+    def remove(self, filepath):
+        """
+        Drop a deleted file, or one that left the window, from the draft.
+        """
+        with self._lock:
+            self._versions.pop(filepath, None)
+            if self.articles.pop(filepath, None) is not None:
+                self._dirty = True
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                filepath, version = item
+                with self._lock:
+                    if self._versions.get(filepath) != version:
+                        continue  # Superseded or removed
+                try:
+                    config = self.config_loader.get()
+                    routing.configure(config.routes)
+                    content_hash = hash_file(filepath)
+                    article = process_file(
+                        filepath,
+                        config.topics,
+                        self.openai_client,
+                        cache=self.cache,
+                        max_input_tokens=self.max_input_tokens,
+                        summarization_config=config.summarization,
+                        classifier=self.classifier,
+                        local_classifier=self.local_classifier,
+                        classifier_threshold=self.classifier_threshold,
+                    )
+                    article.content_hash = content_hash
+                    if self.dedup_index is not None:
+                        with self._lock:
+                            self.dedup_index.fingerprint(filepath, content_hash)
+                except Exception as e:
+                    logger.error(f"Error processing {filepath}: {e}")
+                    continue
+                with self._lock:
+                    if self._versions.get(filepath) == version:
+                        self.articles[filepath] = article
+                        self._dirty = True
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """
+        Wait until every queued file has been processed.
+        """
+        self._queue.join()
+
+    def write_draft(self, force=False):
+        """
+        Save the draft post if an article was added, updated or removed since the last save.
+
+        Args:
+            force (bool): Save it even if nothing changed.
+
+        Returns:
+            bool: Whether the draft was written.
+        """
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            self._dirty = False
+            paths = sorted(self.articles)
+            if self.dedup_index is not None:
+                content_hashes = {path: self.articles[path].content_hash for path in paths}
+                try:
+                    paths, _ = deduplicate_files(paths, self.dedup_index, content_hashes, self.dedup_distance)
+                except OSError as e:
+                    # A file deleted since the last poll; it leaves the draft on the next one
+                    logger.warning(f"Could not deduplicate the draft: {e}")
+            articles = [self.articles[path] for path in paths]
+        save_to_markdown(group_by_topic(articles), DRAFT_INTRODUCTION, self.output_dir, filename=DRAFT_FILENAME)
+        logger.info(f"Draft updated with {len(articles)} article(s).")
+        return True
+
+    def stop(self):
+        """
+        Stop the workers once the queued files are processed.
+        """
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+def watch(watcher, builder, poll_interval=30.0, stop_event=None, max_polls=None):
+    """
+    Poll the directory, feed new and changed files to the builder and keep the draft up to date.
+
+    Runs until `stop_event` is set, `max_polls` polls were made or the process is interrupted.
+
+    Args:
+        watcher (DirectoryWatcher): Watched directory.
+        builder (DraftBuilder): Draft being maintained.
+        poll_interval (float): Seconds between two polls.
+        stop_event (threading.Event): Event stopping the loop.
+        max_polls (int): Number of polls before returning, None for no limit.
+    """
+    stop_event = stop_event or threading.Event()
+    polls = 0
+    try:
+        while not stop_event.is_set():
+            updated, removed = watcher.poll()
+            for filepath in removed:
+                builder.remove(filepath)
+            for filepath in updated:
+                builder.submit(filepath)
+            if updated or removed:
+                logger.info(f"{len(updated)} new or changed and {len(removed)} removed file(s).")
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                builder.join()
+                builder.write_draft()
+                return
+            builder.write_draft()
+            stop_event.wait(poll_interval)
+    except KeyboardInterrupt:
+        logger.info("Stopping the watcher...")
+    finally:
+        builder.stop()
+        builder.write_draft()
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from link_blogger.batch import LocalBatchBackend, parse_batch_output, process_files_in_batch, run_batch
+from link_blogger.cache import ResponseCache
+
+
+def _client(mocker):
+    def create(model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        response = mocker.MagicMock()
+        response.choices[0].message.content = "AI" if prompt.startswith("Classify") else f"Summary of {prompt[-7:]}"
+        response.usage.prompt_tokens = 50
+        response.usage.completion_tokens = 5
+        return response
+
+    client = mocker.MagicMock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+
+def _write_notes(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"note_{i}.md"
+        path.write_text(f"---\ntitle: Note {i}\nurl: https://example.com/{i}\n---\nnote {i}", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_process_files_in_batch_assembles_articles_and_caches_them(tmp_path, mocker):
+    client = _client(mocker)
+    paths = _write_notes(tmp_path, 3)
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    articles = process_files_in_batch(paths, ["AI", "Others"], LocalBatchBackend(client), str(tmp_path / "work"), cache=cache)
+
+    assert [article.title for article in articles] == ["Note 0", "Note 1", "Note 2"]
+    assert articles[1].summary == "Summary of \nnote 1"
+    assert {article.topic for article in articles} == {"AI"}
+    assert articles[0].usage == {"requests": 1, "prompt_tokens": 50, "completion_tokens": 5}
+    lines = (tmp_path / "work" / "batch_summaries.jsonl").read_text().splitlines()
+    assert [json.loads(line)["custom_id"] for line in lines] == ["summary-0", "summary-1", "summary-2"]
+    assert client.chat.completions.create.call_count == 6
+
+    # Everything is cached: nothing is submitted again
+    again = process_files_in_batch(paths, ["AI", "Others"], LocalBatchBackend(client), str(tmp_path / "work"), cache=cache)
+    assert [article.summary for article in again] == [article.summary for article in articles]
+    assert client.chat.completions.create.call_count == 6
+    cache.close()
+
+
+def test_run_batch_polls_until_completed(tmp_path, mocker):
+    backend = mocker.MagicMock()
+    backend.submit.return_value = "batch_1"
+    backend.status.side_effect = ["validating", "in_progress", "completed"]
+    backend.results.return_value = [
+        json.dumps({"custom_id": "a", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": " Hi "}}]}}}),
+        json.dumps({"custom_id": "b", "response": None, "error": {"message": "boom"}}),
+    ]
+    sleep = mocker.MagicMock()
+    answers = run_batch([{"custom_id": "a"}, {"custom_id": "b"}], backend, str(tmp_path / "batch.jsonl"), poll_interval=5, sleep=sleep)
+
+    assert answers["a"][0] == "Hi"
+    assert answers["b"][0] is None
+    assert sleep.call_count == 2
+
+    backend.status.side_effect = ["failed"]
+    with pytest.raises(RuntimeError):
+        run_batch([{"custom_id": "a"}], backend, str(tmp_path / "batch.jsonl"), sleep=sleep)
+
+
+def test_run_batch_resumes_an_interrupted_batch(tmp_path, mocker):
+    backend = mocker.MagicMock()
+    backend.submit.return_value = "batch_1"
+    backend.status.side_effect = KeyboardInterrupt
+    path = str(tmp_path / "batch.jsonl")
+    with pytest.raises(KeyboardInterrupt):
+        run_batch([{"custom_id": "a"}], backend, path)
+
+    backend.status.side_effect = ["in_progress", "completed"]
+    backend.results.return_value = []
+    run_batch([{"custom_id": "a"}], backend, path, sleep=mocker.MagicMock())
+    assert backend.submit.call_count == 1
+    assert not (tmp_path / "batch.batch.json").exists()
+
+    # Other requests are a new batch
+    backend.status.side_effect = ["completed"]
+    run_batch([{"custom_id": "b"}], backend, path)
+    assert backend.submit.call_count == 2
+
+
+def test_process_files_in_batch_does_not_classify_failed_summaries(tmp_path, mocker):
+    client = _client(mocker)
+    create = client.chat.completions.create.side_effect
+
+    def fail_first_summary(model, messages, **kwargs):
+        response = create(model, messages, **kwargs)
+        if messages[-1]["content"].endswith("note 0"):
+            response.choices[0].message.content = ""
+        return response
+
+    client.chat.completions.create.side_effect = fail_first_summary
+    paths = _write_notes(tmp_path, 2)
+    articles = process_files_in_batch(paths, ["AI", "Others"], LocalBatchBackend(client), str(tmp_path / "work"))
+
+    assert articles[0].summary.startswith("Error summarizing content")
+    assert articles[0].topic == "Others"
+    assert articles[1].topic == "AI"
+    assert client.chat.completions.create.call_count == 3  # Two summaries, one classification
+
+
+def test_parse_batch_output_skips_blank_lines():
+    assert parse_batch_output(["", "  "]) == {}
@@ -0,0 +1,40 @@
+from benchmarks.fake_openai_server import fake_answer, fake_embedding
+from benchmarks.run_benchmark import run_benchmark
+from benchmarks.startup import parse_importtime
+
+
+def test_fake_answer_classifies_into_given_topics():
+    request = {"messages": [{"role": "user", "content": "Classify the following article into one of the topics: AI, Economics.\n\nTitle: T"}]}
+    assert fake_answer(request) in ("AI", "Economics")
+
+
+def test_fake_embedding_is_close_for_shared_words():
+    assert fake_embedding("Caching in databases") == fake_embedding("databases in caching")
+    assert len(fake_embedding("anything")) == 64
+
+
+def test_parse_importtime_keeps_cumulative_times():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   yaml.error\n"
+        "import time:       500 |        600 | yaml\n"
+        "other output\n"
+    )
+    assert parse_importtime(stderr) == {"yaml.error": 100, "yaml": 600}
+    assert parse_importtime(stderr, top_level_only=True) == {"yaml": 600}
+
+
+def test_pipeline_benchmark_survives_rate_limits(tmp_path):
+    results = run_benchmark(
+        files=20,
+        rate_limit_rate=0.2,
+        pipeline_args=["--concurrency", "4", "--no-cache"],
+        workdir=str(tmp_path),
+    )
+    assert results["server"]["rate_limited"] > 0
+    assert results["summary_errors"] == 0
+    assert results["post"].count("- [") == 20
+    assert results["files_per_second"] > 0
+    assert set(results["stages"]) >= {"scan", "parse", "summarize", "classify", "intro", "write"}
+    assert results["peak_rss_mb"] > 0
+    assert (tmp_path / "run_report.json").exists()
@@ -0,0 +1,39 @@
+import time
+from link_blogger.cache import ResponseCache, make_cache_key
+
+
+def test_make_cache_key_depends_on_every_part():
+    key = make_cache_key("summary", "gpt-4o", "prompt")
+    assert key == make_cache_key("summary", "gpt-4o", "prompt")
+    assert key != make_cache_key("summary", "gpt-4o-mini", "prompt")
+    assert key != make_cache_key("classification", "gpt-4o", "prompt")
+
+
+def test_cache_roundtrip_and_refresh(tmp_path):
+    path = str(tmp_path / "cache" / "responses.sqlite3")
+    cache = ResponseCache(path)
+    cache.set("key", "summary", "A summary.")
+    assert cache.get("key") == "A summary."
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+    refreshing = ResponseCache(path, refresh=True)
+    assert refreshing.get("key") is None
+    refreshing.close()
+
+
+def test_cache_evicts_expired_and_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_bytes=10)
+    cache.set("old", "summary", "12345")
+    time.sleep(0.01)
+    cache.set("new", "summary", "67890")
+    cache.get("old")
+    cache.set("newest", "summary", "abcde")
+    assert cache.evict() == 1
+    assert cache.get("new") is None
+    assert cache.get("old") == "12345"
+
+    cache.max_age_days = 0
+    assert cache.evict() == 2
+    cache.close()
@@ -30,4 +30,119 @@ def test_classify_article_without_topics(mocker):
         ["AI", "Management"],  # No topics provided
         mock_openai,
     )
-    assert result == "AI"
\ No newline at end of file
+    assert result == "AI"
+
+def test_classify_article_does_not_cache_failures(mocker, tmp_path):
+    from link_blogger.cache import ResponseCache
+
+    mock_openai = mocker.MagicMock()
+    mock_openai.chat.completions.create.side_effect = [Exception("boom"), mocker.DEFAULT]
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "AI"
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+
+    assert classify_article_with_chatgpt("Title", "Summary", ["AI"], mock_openai, cache=cache) == "Others"
+    assert classify_article_with_chatgpt("Title", "Summary", ["AI"], mock_openai, cache=cache) == "AI"
+    assert classify_article_with_chatgpt("Title", "Summary", ["AI"], mock_openai, cache=cache) == "AI"
+    assert mock_openai.chat.completions.create.call_count == 2
+    cache.close()
+
+def test_classify_articles_in_batches(mocker):
+    from link_blogger.classifier import classify_articles_in_batches
+
+    mock_openai = mocker.MagicMock()
+    responses = [
+        '{"classifications": [{"id": 1, "topic": "AI"}, {"id": 2, "topic": "Cooking"}]}',
+        '{"classifications": []}',
+    ]
+    mock_openai.chat.completions.create.side_effect = [
+        mocker.MagicMock(choices=[mocker.MagicMock(message=mocker.MagicMock(content=content))])
+        for content in responses
+    ]
+    articles = [("AI news", "About AI."), ("Recipes", "About food."), ("Unknown", "Missing label.")]
+
+    labels = classify_articles_in_batches(articles, ["AI", "Management"], mock_openai, batch_size=2)
+
+    assert labels == ["AI", "Others", "Others"]
+    assert mock_openai.chat.completions.create.call_count == 2
+    _, kwargs = mock_openai.chat.completions.create.call_args_list[0]
+    assert kwargs["response_format"] == {"type": "json_object"}
+
+
+def test_classify_articles_in_batches_reuses_cache(mocker, tmp_path):
+    from link_blogger.cache import ResponseCache
+    from link_blogger.classifier import classify_articles_in_batches
+
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    mock_openai = mocker.MagicMock()
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "Management"
+    classify_article_with_chatgpt("Leading teams", "On management.", ["AI", "Management"], mock_openai, cache=cache)
+
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = (
+        '{"classifications": [{"id": 1, "topic": "AI"}]}'
+    )
+    labels = classify_articles_in_batches(
+        [("Leading teams", "On management."), ("AI news", "About AI.")],
+        ["AI", "Management"],
+        mock_openai,
+        cache=cache,
+    )
+
+    assert labels == ["Management", "AI"]
+    assert mock_openai.chat.completions.create.call_count == 2
+    cache.close()
+
+def test_local_topic_classifier_bootstraps_from_posts(tmp_path):
+    from link_blogger.classifier import LocalTopicClassifier
+
+    (tmp_path / "wrapped_up_readings_2025-01-10.md").write_text("""---
+title: Wrapped-up Readings 2025-01-10
+---
+
+Intro.
+
+## AI
+
+- [Transformers explained](https://example.com/a): Neural networks, attention and language models.
+- [Training LLMs](https://example.com/b): Large language models need GPUs and training data.
+
+## Management
+
+- [Leading teams](https://example.com/c): Managers, hiring, feedback and team culture.
+""")
+    classifier = LocalTopicClassifier.from_posts(str(tmp_path), ["AI", "Management"])
+    assert classifier.example_count == 3
+
+    predictions = classifier.predict(["New language models and attention tricks", "Giving feedback to your team"])
+    assert [label for label, _ in predictions] == ["AI", "Management"]
+    assert all(0 < score <= 1 for _, score in predictions)
+
+
+def test_classify_articles_hybrid_only_calls_llm_below_threshold(mocker):
+    from link_blogger.classifier import classify_articles
+
+    local = mocker.MagicMock()
+    local.predict.return_value = [("AI", 0.9), ("Management", 0.05)]
+    mock_openai = mocker.MagicMock()
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "Technology"
+
+    labels = classify_articles(
+        [("AI news", "About AI."), ("Gadgets", "About phones.")],
+        ["AI", "Management", "Technology"],
+        mock_openai,
+        engine="hybrid",
+        local_classifier=local,
+        threshold=0.5,
+    )
+
+    assert labels == ["AI", "Technology"]
+    assert mock_openai.chat.completions.create.call_count == 1
+
+    labels = classify_articles(
+        [("AI news", "About AI."), ("Gadgets", "About phones.")],
+        ["AI", "Management", "Technology"],
+        mock_openai,
+        engine="local",
+        local_classifier=local,
+    )
+    assert labels == ["AI", "Management"]
+    assert mock_openai.chat.completions.create.call_count == 1
@@ -0,0 +1,70 @@
+import os
+import pytest
+from link_blogger.config import (
+    ConfigError,
+    ConfigLoader,
+    PromptConfig,
+    SUMMARIZATION_FIELDS,
+    StageRoute,
+    load_config,
+    load_model_routes,
+)
+
+
+def test_prompt_config_renders_compiled_template():
+    config = PromptConfig.from_dict(
+        {"model": "gpt-4o", "system_message": "System.", "user_message": "Summarize {{this}}: {content}"},
+        SUMMARIZATION_FIELDS,
+    )
+    assert config.render(content="Some text") == "Summarize {this}: Some text"
+    assert config.render(content="{braces}") == "Summarize {this}: {braces}"
+
+
+def test_prompt_config_rejects_unknown_placeholders():
+    with pytest.raises(ConfigError, match="details"):
+        PromptConfig.from_dict(
+            {"model": "gpt-4o", "system_message": "System.", "user_message": "Intro: {details}"},
+            SUMMARIZATION_FIELDS,
+        )
+    with pytest.raises(ConfigError, match="user_message"):
+        PromptConfig.from_dict({"model": "gpt-4o", "system_message": "System."}, SUMMARIZATION_FIELDS)
+
+
+def test_load_config_uses_defaults_and_topics(tmp_path):
+    (tmp_path / "topics.conf").write_text("AI\n\nManagement\n")
+    config = load_config(str(tmp_path))
+    assert config.topics == ("AI", "Management")
+    assert config.summarization.model == "gpt-4o"
+    assert "{article_context}" in config.introduction.user_message
+    with pytest.raises(AttributeError):
+        config.topics = None
+
+
+def test_config_loader_reloads_changed_files(tmp_path):
+    topics_file = tmp_path / "topics.conf"
+    topics_file.write_text("AI\n")
+    loader = ConfigLoader(str(tmp_path))
+    first = loader.get()
+    assert loader.get() is first
+
+    topics_file.write_text("AI\nEconomics\n")
+    os.utime(topics_file, (0, topics_file.stat().st_mtime + 5))
+    assert loader.get().topics == ("AI", "Economics")
+
+    (tmp_path / "summarization_prompt.yaml").write_text("model: gpt-4o\nsystem_message: S\nuser_message: '{oops}'\n")
+    assert loader.get().topics == ("AI", "Economics")
+
+
+def test_load_model_routes(tmp_path):
+    assert load_model_routes(str(tmp_path / "models.yaml")) is None
+
+    path = tmp_path / "models.yaml"
+    path.write_text("summarize:\n  models: [gpt-4o-mini, gpt-4o]\n  max_output_tokens: 200\nintro: gpt-4o\n")
+    assert load_model_routes(str(path)) == {
+        "summarize": StageRoute(models=("gpt-4o-mini", "gpt-4o"), max_output_tokens=200),
+        "intro": StageRoute(models=("gpt-4o",)),
+    }
+
+    path.write_text("translate: gpt-4o\n")
+    with pytest.raises(ConfigError):
+        load_model_routes(str(path))
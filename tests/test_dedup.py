@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from link_blogger.dedup import (
+    SIMHASH_BANDS,
+    DedupIndex,
+    canonicalize_url,
+    deduplicate_files,
+    find_duplicate_clusters,
+    hamming_distance,
+    simhash,
+)
+
+TEXT = " ".join(f"highlight number {i} about distributed systems and caching" for i in range(40))
+
+
+def _write_note(path, url, body, mtime):
+    path.write_text(f"---\ntitle: {path.stem}\nurl: {url}\n---\n{body}\n", encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_canonicalize_url_drops_tracking_and_formatting():
+    assert canonicalize_url("http://www.Example.com/post/?utm_source=x&b=2&a=1&fbclid=y#part") == "https://example.com/post?a=1&b=2"
+    assert canonicalize_url("https://example.com/post") == "https://example.com/post"
+    assert canonicalize_url("#") is None
+    assert canonicalize_url("") is None
+
+
+def test_simhash_is_close_for_near_duplicates():
+    edited = TEXT + " one more highlight added later"
+    assert hamming_distance(simhash(TEXT), simhash(edited)) <= 3
+    assert hamming_distance(simhash(TEXT), simhash("an entirely different note on cooking pasta at home")) > 3
+
+
+def test_find_duplicate_clusters_by_url_and_content():
+    fingerprints = [("https://a.com/x", 0b1111), (None, 1 << 40), ("https://a.com/x", 1 << 63), (None, 0b1110)]
+    assert find_duplicate_clusters(fingerprints, max_distance=1) == [[0, 2, 3], [1]]
+    with pytest.raises(ValueError):
+        find_duplicate_clusters(fingerprints, max_distance=SIMHASH_BANDS)
+
+
+def test_deduplicate_files_keeps_latest_copy_and_reuses_index(tmp_path, mocker):
+    first = _write_note(tmp_path / "first.md", "https://www.example.com/a?utm_medium=rss", TEXT, 1000)
+    other = _write_note(tmp_path / "other.md", "https://example.com/b", "notes about gardening in the spring", 1500)
+    updated = _write_note(tmp_path / "updated.md", "https://example.com/a/", TEXT + " new highlight", 2000)
+    index = DedupIndex(str(tmp_path / "cache" / "dedup_index.json"))
+    hashes = {first: "h1", other: "h2", updated: "h3"}
+
+    kept, duplicates = deduplicate_files([first, other, updated], index, hashes)
+    assert kept == [updated, other]
+    assert duplicates == {updated: [first]}
+
+    index.save()
+    read_metadata = mocker.patch("link_blogger.dedup.read_metadata")
+    again, _ = deduplicate_files([first, other, updated], DedupIndex(index.path), hashes)
+    assert again == kept
+    read_metadata.assert_not_called()
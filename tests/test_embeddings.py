@@ -0,0 +1,106 @@
+import numpy as np
+
+from link_blogger.embeddings import (
+    EmbeddingIndex,
+    Embedder,
+    NeighborTopicClassifier,
+    article_id,
+    find_related,
+)
+from link_blogger.classifier import classify_articles
+from link_blogger.markdown_writer import format_entry
+from link_blogger.records import ArticleRecord
+
+
+def _unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _index(tmp_path):
+    index = EmbeddingIndex(str(tmp_path / "embeddings"))
+    records = [
+        {"id": "a", "title": "A", "url": "https://a.com", "topic": "AI"},
+        {"id": "b", "title": "B", "url": "https://b.com", "topic": "AI"},
+        {"id": "c", "title": "C", "url": "https://c.com", "topic": "Health"},
+    ]
+    index.add(records, np.stack([_unit(1, 0, 0), _unit(0.9, 0.1, 0), _unit(0, 0, 1)]))
+    return index
+
+
+def test_embedding_index_appends_and_reloads(tmp_path):
+    index = _index(tmp_path)
+    assert index.add([{"id": "a", "title": "A"}, {"id": "d", "title": "D", "url": "#", "topic": "AI"}], np.stack([_unit(1, 0, 0), _unit(0, 1, 0)])) == 1
+
+    reloaded = EmbeddingIndex(str(tmp_path / "embeddings"))
+    assert len(reloaded) == 4 and "d" in reloaded
+    assert isinstance(reloaded.vectors, np.memmap)
+    matches = reloaded.search(np.stack([_unit(1, 0.05, 0)]), k=2)[0]
+    assert [record["id"] for record, _ in matches] == ["a", "b"]
+    assert matches[0][1] > matches[1][1]
+
+    assert len(EmbeddingIndex(str(tmp_path / "embeddings"), model="other-model")) == 0
+
+
+def test_embedding_index_recovers_from_an_interrupted_add(tmp_path):
+    index = _index(tmp_path)
+    directory = tmp_path / "embeddings"
+    # Crash after the vectors of "d" were written, before its record
+    with open(directory / EmbeddingIndex.VECTORS_FILE, "ab") as f:
+        f.write(_unit(0, 1, 0).tobytes())
+    with open(directory / EmbeddingIndex.RECORDS_FILE, "a", encoding="utf-8") as f:
+        f.write('{"id": "d", "ti')
+
+    reloaded = EmbeddingIndex(str(directory))
+    assert len(reloaded) == 3
+    reloaded.add([{"id": "e", "title": "E"}], np.stack([_unit(1, 1, 0)]))
+
+    again = EmbeddingIndex(str(directory))
+    assert [record["id"] for record in again.records] == ["a", "b", "c", "e"]
+    assert np.allclose(again.vectors[3], _unit(1, 1, 0))
+
+
+def test_neighbor_classifier_and_related_readings(tmp_path, mocker):
+    index = _index(tmp_path)
+    embedder = mocker.MagicMock()
+    embedder.embed.return_value = np.stack([_unit(0, 0.1, 1), _unit(1, 0, 0.1)])
+    classifier = NeighborTopicClassifier(index, embedder, ["AI", "Health", "Others"], k=2)
+    assert classifier.example_count == 3
+    predictions = classifier.predict(["about health", "about AI"])
+    assert [topic for topic, _ in predictions] == ["Health", "AI"]
+
+    related = find_related(index, np.stack([_unit(1, 0, 0)]), k=3, min_score=0.5, exclude_ids={"a"})
+    assert related == [[{"title": "B", "url": "https://b.com"}]]
+    entry = format_entry(ArticleRecord(title="New", summary="S", related=[(item["title"], item["url"]) for item in related[0]]))
+    assert entry == "- [New](#): S\n  - Related past readings: [B](https://b.com)"
+
+
+def test_neighbor_classifier_falls_back_when_embedding_fails(tmp_path, mocker):
+    index = _index(tmp_path)
+    embedder = mocker.MagicMock()
+    embedder.embed.side_effect = RuntimeError("embeddings unavailable")
+    fallback = mocker.MagicMock()
+    fallback.predict.return_value = [("Health", 0.9)]
+    classifier = NeighborTopicClassifier(index, embedder, ["AI", "Health", "Others"], fallback=fallback)
+    assert classifier.predict(["about health"]) == [("Health", 0.9)]
+
+    classifier = NeighborTopicClassifier(index, embedder, ["AI", "Health", "Others"])
+    classify = mocker.patch("link_blogger.classifier.classify_article_with_chatgpt", return_value="AI")
+    labels = classify_articles([("Title", "Summary")], ["AI", "Health", "Others"], None, engine="local", local_classifier=classifier)
+    assert labels == ["AI"]
+    classify.assert_called_once()
+
+
+def test_embedder_batches_and_remembers_texts(mocker):
+    create_embeddings = mocker.patch(
+        "link_blogger.embeddings.create_embeddings",
+        side_effect=lambda client, model, texts: [[float(len(text)), 1.0] for text in texts],
+    )
+    embedder = Embedder(None, batch_size=2)
+    vectors = embedder.embed(["a", "bb", "ccc", "a"])
+    assert vectors.shape == (4, 2)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1)
+    embedder.embed(["bb"])
+    assert create_embeddings.call_count == 2
+    assert article_id(ArticleRecord(title="T", url="https://www.a.com/x/?utm_source=y")) == "https://a.com/x"
+    assert article_id(ArticleRecord(title="T")) == "title:T"
@@ -0,0 +1,24 @@
+import json
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+from link_blogger.feed_writer import save_feeds
+from link_blogger.records import ArticleRecord
+
+
+def test_save_feeds_renders_every_format(tmp_path):
+    articles = [
+        ArticleRecord(title="AI & <you>", url="https://example.com/a?x=1&y=2", summary="About AI.", topic="AI"),
+        ArticleRecord(title="No link", url="#", summary="Untitled.", topic="Others"),
+    ]
+    paths = save_feeds(articles, "Intro.", str(tmp_path), ["markdown", "json", "rss", "atom", "html"])
+
+    assert len(paths) == 4
+    by_suffix = {Path(path).name.split(".", 1)[1]: Path(path) for path in paths}
+    feed = json.loads(by_suffix["json"].read_text())
+    assert feed["items"][0]["url"] == "https://example.com/a?x=1&y=2"
+    assert "url" not in feed["items"][1]
+    rss = ElementTree.parse(by_suffix["rss.xml"]).getroot()
+    assert rss.find("channel/item/title").text == "AI & <you>"
+    atom = ElementTree.parse(by_suffix["atom.xml"]).getroot()
+    assert len(atom.findall("{http://www.w3.org/2005/Atom}entry")) == 2
+    assert "AI &amp; &lt;you&gt;" in by_suffix["html"].read_text()
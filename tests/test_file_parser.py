@@ -36,4 +36,131 @@ author: "Author Name"
 Some content here."""
     metadata = parse_metadata(content)
     assert metadata["title"] == "Untitled Article"  # Default value
-    assert metadata["url"] == "#"  # Default value
\ No newline at end of file
+    assert metadata["url"] == "#"  # Default value
+
+def test_get_recent_files_excludes_and_recurses(tmp_path):
+    (tmp_path / "note.md").touch()
+    (tmp_path / "000 index.md").touch()
+    (tmp_path / "book.pdf").touch()
+    nested = tmp_path / "Articles"
+    nested.mkdir()
+    (nested / "nested.md").touch()
+    hidden = tmp_path / ".obsidian"
+    hidden.mkdir()
+    (hidden / "workspace.md").touch()
+
+    top_level = get_recent_files(tmp_path, days=7, exclude_patterns=["^000", r"\.pdf$"])
+    assert [os.path.basename(path) for path in top_level] == ["note.md"]
+
+    everything = get_recent_files(tmp_path, days=7, exclude_patterns=["^000", r"\.pdf$"], recursive=True)
+    assert sorted(os.path.basename(path) for path in everything) == ["nested.md", "note.md"]
+
+
+def test_get_recent_files_does_not_follow_symlink_cycles(tmp_path):
+    nested = tmp_path / "Articles"
+    nested.mkdir()
+    (nested / "nested.md").touch()
+    (nested / "loop").symlink_to(tmp_path, target_is_directory=True)
+
+    everything = get_recent_files(tmp_path, days=7, recursive=True)
+    assert [os.path.basename(path) for path in everything] == ["nested.md"]
+
+def test_file_index_reports_new_and_changed_files(tmp_path):
+    from link_blogger.file_parser import FileIndex
+
+    first = tmp_path / "first.md"
+    second = tmp_path / "second.md"
+    first.write_text("one")
+    second.write_text("two")
+    index_path = str(tmp_path / "cache" / "file_index.json")
+
+    index = FileIndex(index_path)
+    assert index.update([str(first), str(second)]) == ([str(first), str(second)], [], [])
+    index.save()
+
+    second.write_text("two, edited")
+    os.utime(first, (first.stat().st_atime, first.stat().st_mtime + 5))  # Touched but not edited
+    index = FileIndex(index_path)
+    assert index.update([str(first), str(second)]) == ([], [str(second)], [str(first)])
+
+def test_read_metadata_streams_frontmatter_and_url(tmp_path):
+    from link_blogger.file_parser import iter_content, read_metadata
+
+    note = tmp_path / "note.md"
+    note.write_text("""---
+title: "Readwise: A Title With Colons"
+tags: [ai, llm]
+---
+# A Title
+
+## Metadata
+- Author: Someone
+- URL: https://example.com/article?id=1
+
+## Highlights
+- First highlight.
+- URL: https://example.com/not-this-one
+""")
+    metadata = read_metadata(str(note))
+    assert metadata["title"] == "Readwise: A Title With Colons"
+    assert metadata["tags"] == ["ai", "llm"]
+    assert metadata["url"] == "https://example.com/article?id=1"
+
+    body = list(iter_content(str(note), skip_frontmatter=True))
+    assert body[0] == "# A Title\n"
+    assert body[-1] == "- URL: https://example.com/not-this-one\n"
+
+def test_parse_metadata_with_invalid_yaml_frontmatter():
+    content = """---
+title: Notes: on YAML
+url: https://example.com
+---
+Some content here."""
+    metadata = parse_metadata(content)
+    assert metadata["title"] == "Notes: on YAML"
+    assert metadata["url"] == "https://example.com"
+
+
+def test_file_index_uses_precomputed_hashes(tmp_path, mocker):
+    from link_blogger.file_parser import FileIndex
+
+    note = tmp_path / "note.md"
+    note.write_text("content")
+    hash_file = mocker.patch("link_blogger.file_parser.hash_file")
+    index = FileIndex(str(tmp_path / "file_index.json"))
+    assert index.update([str(note)], hashes={str(note): "abc"}) == ([str(note)], [], [])
+    assert index.content_hash(str(note)) == "abc"
+    hash_file.assert_not_called()
+
+
+def test_file_index_reports_stale_files_without_reading_them(tmp_path, mocker):
+    from link_blogger.file_parser import FileIndex
+
+    first = tmp_path / "first.md"
+    second = tmp_path / "second.md"
+    first.write_text("first")
+    second.write_text("second")
+    index = FileIndex(str(tmp_path / "file_index.json"))
+    index.update([str(first), str(second)])
+
+    second.write_text("second, edited")
+    hash_file = mocker.patch("link_blogger.file_parser.hash_file")
+    assert index.stale([str(first), str(second)]) == [str(second)]
+    hash_file.assert_not_called()
+
+
+def test_file_index_saves_only_the_given_files(tmp_path):
+    from link_blogger.file_parser import FileIndex
+
+    first = tmp_path / "first.md"
+    second = tmp_path / "second.md"
+    first.write_text("first")
+    second.write_text("second")
+    index_path = str(tmp_path / "file_index.json")
+
+    index = FileIndex(index_path)
+    index.update([str(first), str(second)])
+    index.save([str(first)])
+
+    index = FileIndex(index_path)
+    assert index.update([str(first), str(second)]) == ([str(second)], [], [str(first)])
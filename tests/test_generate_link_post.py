@@ -1,10 +1,16 @@
+import os
 import pytest
 from pathlib import Path
 import subprocess
+import sys
 
-def test_generate_link_post_integration(tmp_path, mocker):
-    # Mock the OpenAI client
-    mock_openai = mocker.patch("generate_link_post.OpenAI")
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.startup import parse_importtime
+
+def test_generate_link_post_integration(tmp_path):
+    # Serve the OpenAI API locally; the script runs in a subprocess
+    server = FakeOpenAIServer().start()
+    env = dict(os.environ, OPENAI_API_KEY="test-key", OPENAI_BASE_URL=server.base_url)
 
     # Create sample files
     file_content = """---
@@ -12,24 +18,84 @@ title: "Sample Article"
 url: "https://example.com"
 ---
 Sample highlights."""
-    test_file = tmp_path / "sample.txt"
+    notes_dir = tmp_path / "notes"
+    notes_dir.mkdir()
+    test_file = notes_dir / "sample.txt"
     test_file.write_text(file_content)
 
     output_dir = tmp_path / "output"
 
     # Run the script
-    subprocess.run(
-        [
-            "python",
-            "generate_link_post.py",
-            str(tmp_path),
-            "--output_dir",
-            str(output_dir),
-        ],
-        check=True,
-    )
+    try:
+        subprocess.run(
+            [
+                sys.executable,
+                "generate_link_post.py",
+                str(notes_dir),
+                "--output_dir",
+                str(output_dir),
+                "--cache_dir",
+                str(tmp_path / "cache"),
+            ],
+            check=True,
+            env=env,
+            timeout=60,
+        )
+    finally:
+        server.stop()
 
     # Check output
     output_file = list(output_dir.iterdir())[0]
     assert output_file.exists()
-    assert "Sample Article" in output_file.read_text()
\ No newline at end of file
+    assert "Sample Article" in output_file.read_text()
+
+def test_dry_run_lists_files_without_api_key_or_sdk(tmp_path):
+    (tmp_path / "sample.md").write_text('---\ntitle: "Sample Article"\nurl: "https://example.com"\n---\nSample highlights.')
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "generate_link_post.py", str(tmp_path), "--dry-run", "--cache_dir", str(tmp_path / "cache")],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "Sample Article\thttps://example.com" in result.stdout
+    imports = parse_importtime(result.stderr)
+    assert "openai" not in imports and "tiktoken" not in imports
+    assert not (tmp_path / "cache" / "file_index.json").exists()
+
+def test_dry_run_does_not_hash_files(tmp_path, mocker):
+    from generate_link_post import build_parser, dry_run
+
+    (tmp_path / "sample.md").write_text('---\ntitle: "Sample Article"\n---\nSample highlights.')
+    hash_file = mocker.patch("link_blogger.file_parser.hash_file")
+    dry_run(build_parser().parse_args([str(tmp_path), "--dry-run", "--changed_only", "--cache_dir", str(tmp_path / "cache")]))
+    hash_file.assert_not_called()
+
+def test_dry_run_only_plans_with_a_budget(tmp_path, mocker):
+    from generate_link_post import build_parser, dry_run
+
+    (tmp_path / "sample.md").write_text('---\ntitle: "Sample Article"\n---\nSample highlights.')
+    plan_run = mocker.patch("generate_link_post.plan_run")
+    mocker.patch("generate_link_post.apply_budget")
+    mocker.patch("generate_link_post.log_plan")
+    dry_run(build_parser().parse_args([str(tmp_path), "--dry-run"]))
+    plan_run.assert_not_called()
+    dry_run(build_parser().parse_args([str(tmp_path), "--dry-run", "--max_cost", "1"]))
+    plan_run.assert_called_once()
+
+def test_batch_mode_rejects_options_it_cannot_honour():
+    from generate_link_post import build_parser, unsupported_batch_options
+
+    parser = build_parser()
+    assert unsupported_batch_options(parser.parse_args(["notes", "--batch"])) == []
+    args = parser.parse_args(["notes", "--batch", "--classifier", "local", "--embeddings", "--resume"])
+    assert unsupported_batch_options(args) == ["--classifier local", "--embeddings", "--resume"]
+
+def test_watch_mode_rejects_options_it_cannot_honour():
+    from generate_link_post import build_parser, unsupported_watch_options
+
+    parser = build_parser()
+    assert unsupported_watch_options(parser.parse_args(["notes", "--watch", "--classifier", "hybrid"])) == []
+    args = parser.parse_args(["notes", "--watch", "--formats", "markdown", "rss", "--max_cost", "1", "--resume"])
+    assert unsupported_watch_options(args) == ["--formats markdown rss", "--max_cost", "--resume"]
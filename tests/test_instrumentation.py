@@ -0,0 +1,65 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pstats
+from link_blogger import instrumentation
+from link_blogger.instrumentation import RunReport
+
+
+def test_run_report_summarizes_requests_and_stages(tmp_path, mocker):
+    report = RunReport()
+    with report.stage("scan"):
+        pass
+    completion = mocker.MagicMock()
+    completion.usage.prompt_tokens = 120
+    completion.usage.completion_tokens = 30
+    report.record_request("summarize", 0.2, completion)
+    report.record_request("summarize", 3.0, completion)
+    report.record_request("summarize", 90.0, error=Exception("429"))
+    report.record_cache(hits=3, misses=1)
+
+    data = report.to_dict()
+    summarize = data["requests"]["summarize"]
+    assert summarize["count"] == 3
+    assert summarize["errors"] == 1
+    assert summarize["p50_seconds"] == 3.0
+    assert summarize["histogram"]["<=0.25s"] == 1
+    assert summarize["histogram"][">60s"] == 1
+    assert data["tokens"] == {"prompt_tokens": 240, "completion_tokens": 60}
+    assert data["stages"]["scan"]["calls"] == 1
+    assert data["cache"]["hit_rate"] == 0.75
+
+    path = tmp_path / "reports" / "run.json"
+    report.write(str(path))
+    assert json.loads(path.read_text())["requests"]["summarize"]["count"] == 3
+
+
+def test_chat_completion_records_into_current_run(mocker):
+    from link_blogger.llm import chat_completion
+
+    report = instrumentation.start_run()
+    client = mocker.MagicMock()
+    client.chat.completions.create.return_value.usage.prompt_tokens = 10
+    client.chat.completions.create.return_value.usage.completion_tokens = 2
+    with instrumentation.timed("classify"):
+        chat_completion(client, "gpt-4o", [{"role": "user", "content": "Hi"}], stage="classify")
+
+    data = report.to_dict()
+    assert data["requests"]["classify"]["count"] == 1
+    assert data["requests"]["classify"]["prompt_tokens"] == 10
+    assert data["stages"]["classify"]["calls"] == 1
+    instrumentation._current = None
+
+
+def _count_in_worker(n):
+    return sum(range(n))
+
+
+def test_run_profiled_includes_worker_threads(tmp_path):
+    def run():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return list(executor.map(_count_in_worker, [1000] * 4))
+
+    path = tmp_path / "profiles" / "run.prof"
+    assert instrumentation.run_profiled(str(path), run) == [sum(range(1000))] * 4
+    calls = {function: stat[0] for (_, _, function), stat in pstats.Stats(str(path)).stats.items()}
+    assert calls["_count_in_worker"] == 4
@@ -0,0 +1,59 @@
+from link_blogger.journal import Journal, journal_key
+from link_blogger.records import ArticleRecord
+
+
+def test_journal_replays_finished_articles(tmp_path):
+    path = str(tmp_path / "cache" / "journal.jsonl")
+    journal = Journal(path, fsync_every=2)
+    journal.open()
+    journal.append("a", ArticleRecord("a.md", "h1", "A", summary="Sümmary", topic="AI", requests=1))
+    journal.append("b", ArticleRecord("b.md", "h2", "B", summary="B", topic="AI"))
+    journal.close()
+
+    # A crash in the middle of a write leaves a truncated line
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "c", "record": ["c.md", "h')
+
+    entries = Journal(path).load()
+    assert list(entries) == ["a", "b"]
+    assert entries["a"] == ArticleRecord("a.md", "h1", "A", summary="Sümmary", topic="AI", requests=1)
+
+
+def test_journal_starts_over_unless_resuming(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path)
+    journal.open()
+    journal.append("a", ArticleRecord(title="A"))
+    journal.close()
+
+    journal.open(resume=True)
+    journal.append("b", ArticleRecord(title="B"))
+    journal.close()
+    assert list(Journal(path).load()) == ["a", "b"]
+
+    journal.open()
+    journal.close()
+    assert Journal(path).load() == {}
+
+    journal.discard()
+    assert not (tmp_path / "journal.jsonl").exists()
+
+
+def test_journal_resumes_after_a_partial_line(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path)
+    journal.open()
+    journal.append("a", ArticleRecord(title="A"))
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "c", "record": ["c.md", "h')
+
+    journal.open(resume=True)
+    journal.append("b", ArticleRecord(title="B"))
+    journal.append("d", ArticleRecord(title="D"))
+    journal.close()
+    assert list(Journal(path).load()) == ["a", "b", "d"]
+
+
+def test_journal_key_depends_on_content(tmp_path):
+    assert journal_key("note.md", "abc") != journal_key("note.md", "abd")
@@ -0,0 +1,75 @@
+import pytest
+from link_blogger import llm
+from link_blogger.llm import RateLimiter, chat_completion, is_retryable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def test_rate_limiter_waits_for_requests_and_tokens():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire(100)
+    limiter.acquire(100)
+    assert clock.sleeps == []
+
+    limiter.acquire(100)  # Third request waits for half a minute of request allowance
+    assert clock.now == pytest.approx(30)
+
+    clock = FakeClock()
+    limiter = RateLimiter(tokens_per_minute=600, clock=clock, sleep=clock.sleep)
+    limiter.acquire(500)
+    limiter.acquire(300)  # Needs 200 more tokens than are left: 20 seconds of refill
+    assert clock.now == pytest.approx(20)
+
+
+def test_is_retryable():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(ValueError("boom"))
+
+
+def test_chat_completion_retries_rate_limits(mocker):
+    mocker.patch("link_blogger.llm.time.sleep")
+    llm.configure(max_retries=3, base_delay=0.01)
+    client = mocker.MagicMock()
+    client.chat.completions.create.side_effect = [StatusError(429), StatusError(500), "completion"]
+
+    assert chat_completion(client, "gpt-4o", [{"role": "user", "content": "Hi"}]) == "completion"
+    assert client.chat.completions.create.call_count == 3
+    llm.configure()
+
+
+def test_chat_completion_gives_up(mocker):
+    mocker.patch("link_blogger.llm.time.sleep")
+    llm.configure(max_retries=1, base_delay=0.01)
+    client = mocker.MagicMock()
+    client.chat.completions.create.side_effect = StatusError(429)
+
+    with pytest.raises(StatusError):
+        chat_completion(client, "gpt-4o", [{"role": "user", "content": "Hi"}])
+    assert client.chat.completions.create.call_count == 2
+
+    client.chat.completions.create.side_effect = StatusError(400)
+    with pytest.raises(StatusError):
+        chat_completion(client, "gpt-4o", [{"role": "user", "content": "Hi"}])
+    assert client.chat.completions.create.call_count == 3
+    llm.configure()
@@ -1,4 +1,5 @@
 from link_blogger.markdown_writer import generate_introduction_with_chatgpt, save_to_markdown
+from link_blogger.records import ArticleRecord
 from pathlib import Path
 import yaml
 
@@ -33,8 +34,8 @@ def test_generate_introduction_with_yaml_config(tmp_path, mocker):
 
     # Prepare test input
     article_details = [
-        {"title": "AI Innovations", "topic": "AI", "summary": "Advances in AI."},
-        {"title": "Management Tips", "topic": "Management", "summary": "Leadership insights."},
+        ArticleRecord(title="AI Innovations", topic="AI", summary="Advances in AI."),
+        ArticleRecord(title="Management Tips", topic="Management", summary="Leadership insights."),
     ]
 
     # Call the function
@@ -55,7 +56,7 @@ def test_generate_introduction_fallback(tmp_path, mocker):
 
     # Prepare test input
     article_details = [
-        {"title": "AI Innovations", "topic": "AI", "summary": "Advances in AI."},
+        ArticleRecord(title="AI Innovations", topic="AI", summary="Advances in AI."),
     ]
 
     # Call the function
@@ -64,4 +65,67 @@ def test_generate_introduction_fallback(tmp_path, mocker):
     # Assertions
     assert "AI" in result
     # Ensure result is non-empty
-    assert len(result) > 0
\ No newline at end of file
+    assert len(result) > 0
+
+def test_save_to_markdown_replaces_atomically(tmp_path):
+    output_dir = tmp_path / "output"
+    save_to_markdown({"AI": ["- First"]}, "Intro.", output_dir)
+    save_to_markdown({"AI": ["- Second"]}, "Intro.", output_dir)
+
+    files = list(output_dir.iterdir())
+    assert len(files) == 1
+    assert "- Second" in files[0].read_text()
+
+
+def test_generate_introduction_from_topic_digests(mocker):
+    from link_blogger.config import DEFAULT_INTRODUCTION_PROMPT, INTRODUCTION_FIELDS, PromptConfig
+    from link_blogger.tokens import count_tokens
+
+    mock_openai = mocker.MagicMock()
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "Digest or introduction."
+    config = PromptConfig.from_dict(DEFAULT_INTRODUCTION_PROMPT, INTRODUCTION_FIELDS)
+    article_details = [
+        ArticleRecord(title=f"Article {i}", topic=["AI", "Economics", "Management"][i % 3], summary="A long summary. " * 30)
+        for i in range(60)
+    ]
+
+    result = generate_introduction_with_chatgpt(article_details, mock_openai, config=config, max_prompt_tokens=1000)
+
+    assert result == "Digest or introduction."
+    calls = mock_openai.chat.completions.create.call_args_list
+    assert len(calls) == 4  # One digest per topic, then the introduction
+    for call in calls:
+        prompt = "".join(message["content"] for message in call.kwargs["messages"])
+        assert count_tokens(prompt) <= 1000
+    assert "Topic: Economics, Digest:" in calls[-1].kwargs["messages"][1]["content"]
+
+
+def test_generate_introduction_small_week_uses_single_call(mocker):
+    mock_openai = mocker.MagicMock()
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "Introduction."
+    article_details = [ArticleRecord(title="AI Innovations", topic="AI", summary="Advances in AI.")]
+
+    generate_introduction_with_chatgpt(article_details, mock_openai, max_prompt_tokens=1000)
+
+    assert mock_openai.chat.completions.create.call_count == 1
+
+
+def test_stream_writer_matches_save_to_markdown(tmp_path):
+    from link_blogger.markdown_writer import MarkdownStreamWriter
+    from link_blogger.records import group_by_topic
+
+    articles = [
+        ArticleRecord(title=f"Article {i}", url=f"https://example.com/{i}", summary=f"Summary {i}.", topic=topic)
+        for i, topic in enumerate(["AI", "Management", "AI", "Economics", "Management"])
+    ]
+    save_to_markdown(group_by_topic(articles), "Intro.", tmp_path / "expected")
+
+    writer = MarkdownStreamWriter(str(tmp_path / "streamed"))
+    for index in [3, 1, 0, 4, 2]:  # Articles finish out of order
+        writer.add(index, articles[index])
+    streamed_path = writer.finalize("Intro.")
+
+    expected = list((tmp_path / "expected").iterdir())[0].read_text()
+    assert Path(streamed_path).read_text() == expected
+    assert [path.name for path in (tmp_path / "streamed").iterdir()] == [Path(streamed_path).name]
+
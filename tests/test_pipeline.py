@@ -0,0 +1,114 @@
+import time
+from link_blogger.pipeline import process_file, process_files
+
+
+def _write_articles(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"article{i}.md"
+        path.write_text(f"""---
+title: "Article {i}"
+---
+- URL: https://example.com/{i}
+Highlight {i}.""")
+        paths.append(str(path))
+    return paths
+
+
+def test_process_files_keeps_input_order(tmp_path, mocker):
+    paths = _write_articles(tmp_path, 6)
+
+    def fake_summarize(content, openai_client, cache=None, **kwargs):
+        # Later files finish first to make sure ordering does not depend on timing
+        index = int(content.split("Highlight ")[1].rstrip("."))
+        time.sleep(0.01 * (6 - index))
+        return f"Summary {index}"
+
+    mocker.patch("link_blogger.pipeline.summarize_with_chatgpt", side_effect=fake_summarize)
+    mocker.patch(
+        "link_blogger.pipeline.classify_article_with_chatgpt",
+        side_effect=lambda title, summary, topics, client, cache=None: "AI" if int(title[-1]) % 2 else "Management",
+    )
+
+    sequential = process_files(paths, ["AI", "Management"], None, concurrency=1)
+    parallel = process_files(paths, ["AI", "Management"], None, concurrency=4)
+
+    assert [(article.title, article.summary, article.topic) for article in parallel] == [
+        (article.title, article.summary, article.topic) for article in sequential
+    ]
+    assert [article.title for article in parallel] == [f"Article {i}" for i in range(6)]
+    assert parallel[2].url == "https://example.com/2"
+    assert parallel[2].path == paths[2] and parallel[2].summarize_seconds > 0
+
+
+def test_process_files_with_batch_classification(tmp_path, mocker):
+    paths = _write_articles(tmp_path, 3)
+    mocker.patch(
+        "link_blogger.pipeline.summarize_with_chatgpt",
+        side_effect=lambda content, openai_client, **kwargs: "Summary",
+    )
+    batch = mocker.patch(
+        "link_blogger.pipeline.classify_articles",
+        return_value=["AI", "Management", "AI"],
+    )
+
+    articles = process_files(paths, ["AI", "Management"], None, classify_batch_size=10)
+
+    assert [article.topic for article in articles] == ["AI", "Management", "AI"]
+    assert batch.call_args.args[0] == [(f"Article {i}", "Summary") for i in range(3)]
+    assert batch.call_args.kwargs["batch_size"] == 10
+
+
+def test_process_files_reports_each_finished_article(tmp_path, mocker):
+    paths = _write_articles(tmp_path, 3)
+    mocker.patch(
+        "link_blogger.pipeline.summarize_with_chatgpt",
+        side_effect=lambda content, openai_client, **kwargs: "Summary",
+    )
+    mocker.patch(
+        "link_blogger.pipeline.classify_article_with_chatgpt",
+        side_effect=lambda title, summary, topics, client, cache=None: "AI",
+    )
+    finished = []
+
+    process_files(paths, ["AI"], None, concurrency=2, on_complete=lambda path, article: finished.append(path))
+
+    assert sorted(finished) == sorted(paths)
+
+
+def test_process_files_reports_batch_classified_articles_window_by_window(tmp_path, mocker):
+    paths = _write_articles(tmp_path, 5)
+    mocker.patch(
+        "link_blogger.pipeline.summarize_with_chatgpt",
+        side_effect=lambda content, openai_client, **kwargs: "Summary",
+    )
+    finished = []
+    reported_before_classify = []
+
+    def classify(articles, *args, **kwargs):
+        reported_before_classify.append(len(finished))
+        return ["AI"] * len(articles)
+
+    mocker.patch("link_blogger.pipeline.classify_articles", side_effect=classify)
+
+    articles = process_files(paths, ["AI"], None, classify_batch_size=2, on_complete=lambda path, article: finished.append(path))
+
+    assert reported_before_classify == [0, 2, 4]
+    assert finished == paths
+    assert [article.topic for article in articles] == ["AI"] * 5
+
+
+def test_process_file_uses_the_local_classifier(tmp_path, mocker):
+    paths = _write_articles(tmp_path, 1)
+    mocker.patch(
+        "link_blogger.pipeline.summarize_with_chatgpt",
+        side_effect=lambda content, openai_client, **kwargs: "Summary",
+    )
+    classify = mocker.patch("link_blogger.pipeline.classify_article_with_chatgpt")
+    local_classifier = mocker.MagicMock()
+    local_classifier.predict.return_value = [("Management", 0.9)]
+
+    article = process_file(paths[0], ["AI", "Management"], None, classifier="local", local_classifier=local_classifier)
+
+    assert article.topic == "Management"
+    classify.assert_not_called()
@@ -0,0 +1,71 @@
+import pytest
+
+from link_blogger.config import load_config
+from link_blogger.planner import apply_budget, fit_content, plan_run
+from link_blogger.preprocess import preprocess_file
+from link_blogger.tokens import count_tokens
+
+
+def _write_notes(tmp_path, sizes):
+    paths = []
+    for index, size in enumerate(sizes):
+        path = tmp_path / f"note_{index}.md"
+        highlights = "".join(f"- Highlight {line} about caching and latency.\n" for line in range(size))
+        path.write_text(f"---\ntitle: Note {index}\n---\n{highlights}", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_plan_estimates_every_stage(tmp_path):
+    paths = _write_notes(tmp_path, [5, 400])
+    config = load_config(str(tmp_path / "conf"))
+    plan = plan_run(paths, config, max_input_tokens=2000, intro_max_tokens=8000, workers=2, chunk_size=1)
+
+    stages = plan.stages()
+    assert stages["summarize"]["requests"] > 2  # The long note is summarized in chunks
+    assert stages["classify"]["requests"] == 2
+    assert stages["intro"]["requests"] == 1
+    assert stages["summarize"]["cost_usd"] > 0
+    assert plan.total_tokens() == sum(values["input_tokens"] + values["output_tokens"] for values in stages.values())
+    assert plan.files[paths[1]].content_tokens > plan.files[paths[0]].content_tokens
+
+
+def test_plan_reuses_preprocessing_records(tmp_path):
+    path = _write_notes(tmp_path, [5])[0]
+    record = preprocess_file(path)
+    missing = str(tmp_path / "not_on_disk.md")
+    plan = plan_run([path, missing], load_config(str(tmp_path / "conf")), file_records={missing: record._replace(path=missing)})
+
+    assert plan.files[missing].content_tokens == plan.files[path].content_tokens
+    assert plan.files[missing].title == "Note 0"
+
+
+@pytest.mark.parametrize("policy", ["truncate", "chunk"])
+def test_apply_budget_cuts_the_largest_files(tmp_path, policy):
+    paths = _write_notes(tmp_path, [5, 100, 400])
+    plan = plan_run(paths, load_config(str(tmp_path / "conf")))
+    budget = plan.total_tokens() - 2000
+
+    assert apply_budget(plan, max_tokens=budget, policy=policy)
+    assert plan.total_tokens() <= budget
+    assert plan.files[paths[2]].action == policy
+    assert plan.files[paths[0]].action == "summarize"
+    assert set(plan.content_limits()) <= {paths[1], paths[2]}
+    assert plan.to_dict()["decisions"][paths[2]]["action"] == policy
+
+
+def test_apply_budget_skips_largest_files(tmp_path):
+    paths = _write_notes(tmp_path, [5, 400])
+    plan = plan_run(paths, load_config(str(tmp_path / "conf")))
+    assert not apply_budget(plan, max_tokens=plan.total_tokens())
+
+    apply_budget(plan, max_cost=plan.total_cost() / 2, policy="skip")
+    assert plan.skipped() == [paths[1]]
+
+
+def test_fit_content_keeps_whole_highlights_when_chunking():
+    content = "".join(f"- Highlight {line} about caching and latency.\n" for line in range(50))
+    chunked = fit_content(content, "chunk", 100)
+    assert count_tokens(chunked) <= 100
+    assert chunked.endswith("latency.\n")
+    assert count_tokens(fit_content(content, "truncate", 100)) <= 100
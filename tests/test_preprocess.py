@@ -0,0 +1,30 @@
+from link_blogger.dedup import simhash
+from link_blogger.file_parser import hash_file
+from link_blogger.preprocess import FileRecord, fingerprints_from_records, preprocess_file, preprocess_files
+
+
+def _write_notes(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"note_{i}.md"
+        path.write_text(f"---\ntitle: Note {i}\n---\n- URL: https://www.example.com/{i}?utm_source=rss\nHighlight {i} about caching\n", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_preprocess_file_returns_a_compact_record(tmp_path):
+    path = _write_notes(tmp_path, 1)[0]
+    record = preprocess_file(path)
+    assert isinstance(record, FileRecord)
+    assert record.hash == hash_file(path)
+    assert (record.title, record.url) == ("Note 0", "https://www.example.com/0?utm_source=rss")
+    assert record.tokens > 0
+    assert record.simhash == simhash("- URL: https://www.example.com/0?utm_source=rss\nHighlight 0 about caching\n")
+    assert fingerprints_from_records([record]) == {path: ("https://example.com/0", record.simhash)}
+
+
+def test_preprocess_files_on_processes_keeps_input_order(tmp_path):
+    paths = _write_notes(tmp_path, 7)
+    records = preprocess_files(paths, workers=2, chunk_size=2)
+    assert records == preprocess_files(paths)
+    assert [record.path for record in records] == paths
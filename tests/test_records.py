@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from link_blogger.records import FIELDS, ArticleRecord, group_by_topic
+from link_blogger.tokens import TokenUsage
+
+
+def _record():
+    return ArticleRecord(
+        "notes/a.md",
+        "abc123",
+        "Title",
+        "https://example.com/a",
+        summary="Sümmary.",
+        topic="AI",
+        requests=2,
+        prompt_tokens=120,
+        completion_tokens=30,
+        summarize_seconds=1.5,
+        related=[("Past", "https://example.com/past")],
+    )
+
+
+def test_record_round_trips_through_rows():
+    record = _record()
+    row = json.loads(json.dumps(record.to_row()))
+    assert len(row) == len(FIELDS)
+    assert ArticleRecord.from_row(row) == record
+    assert record.usage == {"requests": 2, "prompt_tokens": 120, "completion_tokens": 30}
+    with pytest.raises(ValueError):
+        ArticleRecord.from_row(row[:-1])
+
+
+def test_record_has_no_instance_dictionary():
+    record = ArticleRecord()
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.tags = ["AI"]
+    usage = TokenUsage()
+    usage.requests = 3
+    record.set_usage(usage)
+    assert record.usage["requests"] == 3
+
+
+def test_group_by_topic_keeps_first_seen_order():
+    articles = [
+        ArticleRecord(title="A", url="#", summary="a", topic="AI"),
+        ArticleRecord(title="B", url="#", summary="b", topic="Management"),
+        ArticleRecord(title="C", url="#", summary="c", topic="AI"),
+    ]
+    grouped = group_by_topic(articles)
+    assert list(grouped) == ["AI", "Management"]
+    assert grouped["AI"] == [articles[0], articles[2]]
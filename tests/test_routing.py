@@ -0,0 +1,54 @@
+from link_blogger import instrumentation, routing
+from link_blogger.classifier import classify_article_with_chatgpt
+from link_blogger.config import StageRoute
+from link_blogger.tokens import TokenUsage
+
+
+def _client(mocker, *answers):
+    client = mocker.MagicMock()
+    responses = []
+    for answer in answers:
+        response = mocker.MagicMock()
+        response.choices[0].message.content = answer
+        response.usage.prompt_tokens = 100
+        response.usage.completion_tokens = 10
+        responses.append(response)
+    client.chat.completions.create.side_effect = responses
+    return client
+
+
+def test_routed_completion_uses_default_model_without_routes(mocker):
+    routing.configure(None)
+    client = _client(mocker, "Answer")
+    assert routing.routed_completion(client, "summarize", "gpt-4o", [{"role": "user", "content": "Hi"}]) == "Answer"
+    assert client.chat.completions.create.call_args.kwargs["model"] == "gpt-4o"
+
+
+def test_routed_completion_escalates_over_length_answers(mocker):
+    routing.configure({"summarize": StageRoute(models=("gpt-4o-mini", "gpt-4o"), max_output_tokens=5)})
+    report = instrumentation.start_run()
+    client = _client(mocker, "a summary that is much too long for the budget", "Short.")
+    usage = TokenUsage()
+    answer = routing.routed_completion(client, "summarize", "ignored", [{"role": "user", "content": "Hi"}], usage=usage)
+
+    assert answer == "Short."
+    assert [call.kwargs["model"] for call in client.chat.completions.create.call_args_list] == ["gpt-4o-mini", "gpt-4o"]
+    assert usage.requests == 2
+    data = report.to_dict()
+    assert data["counters"]["summarize_escalations"] == 1
+    models = data["requests"]["summarize"]["models"]
+    assert models["gpt-4o-mini"]["cost_usd"] == (100 * 0.15 + 10 * 0.60) / 1_000_000
+    assert data["cost_usd"] == models["gpt-4o-mini"]["cost_usd"] + models["gpt-4o"]["cost_usd"]
+    instrumentation._current = None
+    routing.configure(None)
+
+
+def test_classification_escalates_labels_outside_topics(mocker):
+    routing.configure({"classify": StageRoute(models=("gpt-4o-mini", "gpt-4o"))})
+    client = _client(mocker, "Gardening", "AI")
+    assert classify_article_with_chatgpt("Title", "Summary", ["AI", "Others"], client) == "AI"
+
+    client = _client(mocker, "AI")
+    assert classify_article_with_chatgpt("Title", "Summary", ["AI", "Others"], client) == "AI"
+    assert client.chat.completions.create.call_count == 1
+    routing.configure(None)
@@ -51,4 +51,58 @@ def test_summarize_fallback(tmp_path, mocker):
 
     # Assertions
     assert "This is a fallback summary." in result
-    assert mock_openai.chat.completions.create.called
\ No newline at end of file
+    assert mock_openai.chat.completions.create.called
+
+def test_summarize_uses_cache(tmp_path):
+    from link_blogger.cache import ResponseCache
+
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "Cached summary."
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+
+    first = summarize_with_chatgpt("Same content.", mock_openai, cache=cache)
+    second = summarize_with_chatgpt("Same content.", mock_openai, cache=cache)
+
+    assert first == second == "Cached summary."
+    assert mock_openai.chat.completions.create.call_count == 1
+    cache.close()
+
+
+def test_summarize_long_content_in_chunks(mocker):
+    from link_blogger.tokens import TokenUsage
+
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "Partial summary."
+    mock_openai.chat.completions.create.return_value.usage.prompt_tokens = 100
+    mock_openai.chat.completions.create.return_value.usage.completion_tokens = 10
+    mocker.patch("os.path.join", return_value="missing_prompt.yaml")
+    usage = TokenUsage()
+
+    content = "".join(f"- Highlight {i}: " + "words " * 40 + "\n" for i in range(30))
+    result = summarize_with_chatgpt(content, mock_openai, max_input_tokens=500, usage=usage)
+
+    calls = mock_openai.chat.completions.create.call_count
+    assert result == "Partial summary."
+    assert calls > 2
+    assert usage.requests == calls
+    assert usage.prompt_tokens == 100 * calls
+    # The last request reduces the partial summaries
+    last_prompt = mock_openai.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+    assert "Partial summary." in last_prompt
+
+
+def test_summarize_short_content_in_one_call(mocker):
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "Summary."
+    result = summarize_with_chatgpt("Short content.", mock_openai, max_input_tokens=500)
+    assert result == "Summary."
+    assert mock_openai.chat.completions.create.call_count == 1
+
+
+def test_failed_summary_is_recognized():
+    from link_blogger.summarizer import is_failed_summary
+
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create.side_effect = ValueError("rate limited")
+    assert is_failed_summary(summarize_with_chatgpt("Content.", mock_openai))
+    assert not is_failed_summary("A summary.")
@@ -0,0 +1,44 @@
+from link_blogger.tokens import TokenUsage, count_tokens, split_into_chunks
+
+
+def test_count_tokens_is_positive_for_text():
+    assert count_tokens("") == 0
+    assert count_tokens("Some words to count.") > 0
+
+
+def test_split_into_chunks_keeps_highlights_together():
+    lines = []
+    for i in range(20):
+        lines.append(f"- Highlight number {i} with some words in it.\n")
+        lines.append(f"    - Note on highlight {i}.\n")
+    chunks = list(split_into_chunks(lines, max_tokens=60))
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == "".join(lines)
+    for chunk in chunks:
+        assert count_tokens(chunk) <= 60
+        assert chunk.startswith("- Highlight")
+
+
+def test_split_into_chunks_splits_oversized_lines():
+    chunks = list(split_into_chunks(["x" * 1000 + "\n"], max_tokens=50))
+    assert len(chunks) > 1
+    assert "".join(chunks).strip() == "x" * 1000
+
+
+def test_token_usage_ignores_missing_usage(mocker):
+    usage = TokenUsage()
+    usage.add(mocker.MagicMock(usage=mocker.MagicMock(prompt_tokens=10, completion_tokens=3)))
+    usage.add(object())
+    assert usage.to_dict() == {"requests": 2, "prompt_tokens": 10, "completion_tokens": 3}
+    assert usage.total_tokens == 13
+
+
+def test_truncate_to_tokens():
+    from link_blogger.tokens import truncate_to_tokens
+
+    text = "word " * 500
+    assert truncate_to_tokens("short", 10) == "short"
+    truncated = truncate_to_tokens(text, 50)
+    assert count_tokens(truncated) <= 50
+    assert text.startswith(truncated)
@@ -0,0 +1,84 @@
+import os
+import threading
+
+from link_blogger.config import ConfigLoader
+from link_blogger.dedup import DedupIndex
+from link_blogger.records import ArticleRecord
+from link_blogger.watch import DRAFT_FILENAME, DirectoryWatcher, DraftBuilder, watch
+
+
+def _fake_process_file(filepath, topics, openai_client, **kwargs):
+    with open(filepath, encoding="utf-8") as f:
+        text = f.read().strip()
+    return ArticleRecord(filepath, title=os.path.basename(filepath), summary=text, topic="AI")
+
+
+def test_directory_watcher_reports_updates_and_removals(tmp_path):
+    note = tmp_path / "note.md"
+    note.write_text("first")
+    watcher = DirectoryWatcher(str(tmp_path))
+    assert watcher.poll() == ([str(note)], [])
+    assert watcher.poll() == ([], [])
+
+    note.write_text("first, edited")
+    assert watcher.poll() == ([str(note)], [])
+    note.unlink()
+    assert watcher.poll() == ([], [str(note)])
+
+
+def test_watch_keeps_the_draft_up_to_date(tmp_path, mocker):
+    mocker.patch("link_blogger.watch.process_file", side_effect=_fake_process_file)
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("Summary A")
+    output_dir = tmp_path / "out"
+    watcher = DirectoryWatcher(str(vault))
+
+    builder = DraftBuilder(None, str(output_dir), ConfigLoader(str(tmp_path / "conf")), workers=2)
+    watch(watcher, builder, max_polls=1)
+    draft = (output_dir / DRAFT_FILENAME).read_text()
+    assert "## AI" in draft and "Summary A" in draft
+
+    (vault / "a.md").unlink()
+    (vault / "b.md").write_text("Summary B")
+    builder = DraftBuilder(None, str(output_dir), ConfigLoader(str(tmp_path / "conf")), workers=2)
+    builder.articles = {str(vault / "a.md"): ArticleRecord(str(vault / "a.md"), title="a.md", summary="Summary A", topic="AI")}
+    watch(watcher, builder, max_polls=1)
+    draft = (output_dir / DRAFT_FILENAME).read_text()
+    assert "Summary B" in draft and "Summary A" not in draft
+
+
+def test_draft_builder_only_keeps_the_latest_version(tmp_path, mocker):
+    release = threading.Event()
+
+    def slow_process_file(filepath, *args, **kwargs):
+        release.wait(5)
+        return _fake_process_file(filepath, *args, **kwargs)
+
+    mocker.patch("link_blogger.watch.process_file", side_effect=slow_process_file)
+    note = tmp_path / "note.md"
+    note.write_text("old")
+    builder = DraftBuilder(None, str(tmp_path / "out"), ConfigLoader(str(tmp_path / "conf")), workers=1)
+    builder.submit(str(note))
+    note.write_text("new")
+    builder.submit(str(note))
+    release.set()
+    builder.join()
+    builder.stop()
+    assert builder.articles[str(note)].summary == "new"
+
+
+def test_draft_builder_skips_duplicate_notes(tmp_path, mocker):
+    mocker.patch("link_blogger.watch.process_file", side_effect=_fake_process_file)
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("- URL: https://example.com/article\nSummary A")
+    (vault / "b.md").write_text("- URL: https://example.com/article?utm_source=feed\nSummary B")
+    os.utime(vault / "a.md", (1, 1))
+    output_dir = tmp_path / "out"
+    dedup_index = DedupIndex(str(tmp_path / "dedup_index.json"))
+
+    builder = DraftBuilder(None, str(output_dir), ConfigLoader(str(tmp_path / "conf")), workers=2, dedup_index=dedup_index)
+    watch(DirectoryWatcher(str(vault), days=100000), builder, max_polls=1)
+    draft = (output_dir / DRAFT_FILENAME).read_text()
+    assert "Summary B" in draft and "Summary A" not in draft